@@ -10,6 +10,7 @@ import gui
 import gunsmith
 import locale
 import logging
+import logic
 import multiprocessing
 import objectdb
 import os
@@ -271,7 +272,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         sectorDialog.exec()
 
-        if sectorDialog.modified():
+        if sectorDialog.restartRequired():
             self._showRestartRequiredStatus()
             gui.MessageBoxEx.information(
                 parent=self,
@@ -378,10 +379,14 @@ def main() -> None:
         installMapsDir = os.path.join(installDir, 'data', 'map')
         overlayMapsDir = os.path.join(appDir, 'map')
         customMapsDir = os.path.join(appDir, 'custom_map')
+        cacheMapsDir = os.path.join(appDir, 'map_cache')
         multiverse.DataStore.setSectorDirs(
             installDir=installMapsDir,
             overlayDir=overlayMapsDir,
-            customDir=customMapsDir)
+            customDir=customMapsDir,
+            cacheDir=cacheMapsDir)
+        # Only load the milieu that are actually used rather than all of them
+        multiverse.WorldManager.setLazyLoading(True)
 
         gunsmith.WeaponStore.setWeaponDirs(
             userDir=os.path.join(appDir, 'weapons'),
@@ -427,6 +432,9 @@ def main() -> None:
             window = MainWindow()
             window.show()
             asyncEventLoop.run_forever()
+
+        # Stop any worker processes used for trade calculations
+        logic.TraderProcessPool.instance().shutdown()
     except Exception as ex:
         message = 'Failed to initialise application'
         logging.error(message, exc_info=ex)
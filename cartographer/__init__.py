@@ -12,4 +12,5 @@ from .worldcache import *
 from .gridcache import *
 from .starfieldcache import *
 from .stylesheet import *
+from .renderprofiler import *
 from .rendercontext import *
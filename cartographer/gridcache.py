@@ -12,6 +12,8 @@ class GridCache(object):
             ) -> None:
         self._graphics = graphics
         self._cache = common.LRUCache(capacity=capacity)
+        self._hitCount = 0
+        self._missCount = 0
 
     def grid(
             self,
@@ -21,7 +23,9 @@ class GridCache(object):
         key = (parsecWidth, parsecHeight)
         grid = self._cache.get(key)
         if grid:
+            self._hitCount += 1
             return grid
+        self._missCount += 1
 
         points = []
         for px in range(-GridCache._Slop, parsecWidth + GridCache._Slop):
@@ -53,5 +57,11 @@ class GridCache(object):
         self._cache[key] = grid
         return grid
 
+    def hitCount(self) -> int:
+        return self._hitCount
+
+    def missCount(self) -> int:
+        return self._missCount
+
     def clear(self) -> None:
         self._cache.clear()
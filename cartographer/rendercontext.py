@@ -37,6 +37,7 @@ class RenderContext(object):
 
     _GridCacheCapacity = 50
     _WorldCacheCapacity = 500
+    _SectorCacheMemoryBudget = 32 * 1024 * 1024 # Bytes
     _ParsecGridSlop = 1
 
     _DefaultAllegiances = set([
@@ -99,7 +100,8 @@ class RenderContext(object):
             milieu=self._milieu,
             universe=self._universe,
             graphics=self._graphics,
-            styleStore=self._styleStore)
+            styleStore=self._styleStore,
+            memoryBudget=RenderContext._SectorCacheMemoryBudget)
         self._worldCache = cartographer.WorldCache(
             milieu=self._milieu,
             universe=self._universe,
@@ -135,6 +137,8 @@ class RenderContext(object):
 
         self._parsecGrid: typing.Optional[cartographer.AbstractPointList] = None
 
+        self._profiler: typing.Optional[cartographer.RenderProfiler] = None
+
         self._createLayers()
         self._updateView()
 
@@ -204,7 +208,66 @@ class RenderContext(object):
         self._styleSheet.options = options
         self._updateLayerOrder()
 
+    def sectorCacheMemoryBudget(self) -> int:
+        return self._sectorCache.memoryBudget()
+
+    # Set the approximate bytes of memory the cached sector data can use.
+    # Reducing the budget evicts the least recently used data immediately
+    def setSectorCacheMemoryBudget(self, memoryBudget: int) -> None:
+        self._sectorCache.setMemoryBudget(memoryBudget=memoryBudget)
+
+    def profiler(self) -> typing.Optional[cartographer.RenderProfiler]:
+        return self._profiler
+
+    # Profiling is opt in as timing each layer and counting the primitives it
+    # draws has a small but measurable cost
+    def setProfiler(
+            self,
+            profiler: typing.Optional[cartographer.RenderProfiler]
+            ) -> None:
+        self._profiler = profiler
+
     def render(self) -> None:
+        if not self._profiler:
+            self._renderLayers(recorder=None)
+            return
+
+        # While the frame is being profiled the graphics are replaced with a
+        # wrapper that counts the primitives drawn. Frames that fail to render
+        # aren't added to the profiler
+        recorder = self._profiler.beginFrame(
+            graphics=self._graphics,
+            scale=self._scale,
+            style=self._styleSheet.style,
+            cacheCounters=self._cacheCounters)
+        graphics = self._graphics
+        self._graphics = recorder.graphics()
+        try:
+            self._renderLayers(recorder=recorder)
+        finally:
+            self._graphics = graphics
+        recorder.finish(sectorCacheStats=cartographer.RenderCacheStats(
+            entryCount=self._sectorCache.entryCount(),
+            memoryUsage=self._sectorCache.memoryUsage(),
+            memoryBudget=self._sectorCache.memoryBudget(),
+            evictionCount=self._sectorCache.evictionCount()))
+
+    def clearCaches(self) -> None:
+        self._sectorCache.clear()
+        self._worldCache.clear()
+        self._gridCache.clear()
+        self._starfieldCache.clear()
+
+    # Discard cached data for a sector that has changed in the universe
+    def clearSectorCaches(self, index: multiverse.SectorIndex) -> None:
+        self._sectorCache.clearSector(index=index)
+        self._worldCache.clearSector(index=index)
+        self._selector.invalidate()
+
+    def _renderLayers(
+            self,
+            recorder: typing.Optional[cartographer.RenderFrameRecorder]
+            ) -> None:
         with self._graphics.save():
             if self._outputClipRect:
                 self._graphics.intersectClipRect(self._outputClipRect)
@@ -214,15 +277,19 @@ class RenderContext(object):
             self._graphics.multiplyTransform(self._imageSpaceToWorldSpace)
 
             for layer in self._layers:
-                #with common.DebugTimer(string=str(layer.action)):
-                if True:
+                if recorder:
+                    recorder.beginLayer(layerId=layer.id)
+                    layer.action()
+                    recorder.endLayer()
+                else:
                     layer.action()
 
-    def clearCaches(self) -> None:
-        self._sectorCache.clear()
-        self._worldCache.clear()
-        self._gridCache.clear()
-        self._starfieldCache.clear()
+    def _cacheCounters(self) -> typing.Tuple[int, int]: # (Hits, Misses)
+        hits = self._sectorCache.hitCount() + self._worldCache.hitCount() + \
+            self._gridCache.hitCount() + self._starfieldCache.hitCount()
+        misses = self._sectorCache.missCount() + self._worldCache.missCount() + \
+            self._gridCache.missCount() + self._starfieldCache.missCount()
+        return (hits, misses)
 
     def _createLayers(self) -> None:
         self._layers: typing.List[RenderContext.LayerAction] = [
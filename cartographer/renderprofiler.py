@@ -0,0 +1,306 @@
+import cartographer
+import collections
+import json
+import threading
+import time
+import typing
+
+class RenderLayerProfile(object):
+    def __init__(
+            self,
+            layerId: cartographer.LayerId,
+            time: float, # Seconds
+            primitiveCount: int,
+            cacheHits: int,
+            cacheMisses: int
+            ) -> None:
+        self._layerId = layerId
+        self._time = time
+        self._primitiveCount = primitiveCount
+        self._cacheHits = cacheHits
+        self._cacheMisses = cacheMisses
+
+    def layerId(self) -> cartographer.LayerId:
+        return self._layerId
+
+    def time(self) -> float:
+        return self._time
+
+    def primitiveCount(self) -> int:
+        return self._primitiveCount
+
+    def cacheHits(self) -> int:
+        return self._cacheHits
+
+    def cacheMisses(self) -> int:
+        return self._cacheMisses
+
+# A snapshot of the state of a render cache at the end of a frame. The
+# eviction count is the total since the cache was created
+class RenderCacheStats(object):
+    def __init__(
+            self,
+            entryCount: int,
+            memoryUsage: int, # Bytes
+            memoryBudget: int, # Bytes
+            evictionCount: int
+            ) -> None:
+        self._entryCount = entryCount
+        self._memoryUsage = memoryUsage
+        self._memoryBudget = memoryBudget
+        self._evictionCount = evictionCount
+
+    def entryCount(self) -> int:
+        return self._entryCount
+
+    def memoryUsage(self) -> int:
+        return self._memoryUsage
+
+    def memoryBudget(self) -> int:
+        return self._memoryBudget
+
+    def evictionCount(self) -> int:
+        return self._evictionCount
+
+class RenderFrameProfile(object):
+    def __init__(
+            self,
+            timestamp: float, # Seconds since the epoch
+            scale: float, # Linear scale
+            style: cartographer.MapStyle,
+            time: float, # Seconds
+            layers: typing.Iterable[RenderLayerProfile],
+            sectorCacheStats: RenderCacheStats
+            ) -> None:
+        self._timestamp = timestamp
+        self._scale = scale
+        self._style = style
+        self._time = time
+        self._layers = list(layers)
+        self._sectorCacheStats = sectorCacheStats
+
+    def timestamp(self) -> float:
+        return self._timestamp
+
+    def scale(self) -> float:
+        return self._scale
+
+    def style(self) -> cartographer.MapStyle:
+        return self._style
+
+    def time(self) -> float:
+        return self._time
+
+    def layers(self) -> typing.Iterable[RenderLayerProfile]:
+        return list(self._layers)
+
+    def sectorCacheStats(self) -> RenderCacheStats:
+        return self._sectorCacheStats
+
+# Draw calls made while a frame is being profiled go through this wrapper so
+# the number of primitives each layer draws can be counted without the
+# graphics implementation needing to know about profiling. Everything else is
+# forwarded to the wrapped graphics unchanged.
+class _PrimitiveCountingGraphics(object):
+    _DrawMethodNames = [
+        'drawPoint',
+        'drawPoints',
+        'drawLine',
+        'drawLines',
+        'drawPath',
+        'drawRectangle',
+        'drawEllipse',
+        'drawArc',
+        'drawCurve',
+        'drawImage',
+        'drawImageAlpha',
+        'drawString'
+    ]
+
+    def __init__(
+            self,
+            graphics: cartographer.AbstractGraphics
+            ) -> None:
+        self._graphics = graphics
+        self.primitiveCount = 0
+        for name in _PrimitiveCountingGraphics._DrawMethodNames:
+            setattr(self, name, self._countingMethod(getattr(graphics, name)))
+
+    def _countingMethod(
+            self,
+            method: typing.Callable[..., None]
+            ) -> typing.Callable[..., None]:
+        def countingMethod(*args, **kwargs) -> None:
+            self.primitiveCount += 1
+            method(*args, **kwargs)
+        return countingMethod
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self._graphics, name)
+
+# A recorder is created for each frame that is rendered while profiling and
+# is only used by the thread rendering the frame. The frame is added to the
+# profiler when the recorder is finished.
+class RenderFrameRecorder(object):
+    def __init__(
+            self,
+            profiler: 'RenderProfiler',
+            graphics: cartographer.AbstractGraphics,
+            scale: float,
+            style: cartographer.MapStyle,
+            cacheCounters: typing.Callable[[], typing.Tuple[int, int]] # (Hits, Misses)
+            ) -> None:
+        self._profiler = profiler
+        self._graphics = _PrimitiveCountingGraphics(graphics=graphics)
+        self._scale = scale
+        self._style = style
+        self._cacheCounters = cacheCounters
+        self._layers: typing.List[RenderLayerProfile] = []
+        self._layerId: typing.Optional[cartographer.LayerId] = None
+        self._layerStartTime = None
+        self._layerStartPrimitives = None
+        self._layerStartHits = None
+        self._layerStartMisses = None
+        self._timestamp = time.time()
+        self._startTime = time.perf_counter()
+
+    # The graphics the frame should be drawn with so primitives are counted
+    def graphics(self) -> cartographer.AbstractGraphics:
+        return self._graphics
+
+    def beginLayer(self, layerId: cartographer.LayerId) -> None:
+        self._layerId = layerId
+        self._layerStartPrimitives = self._graphics.primitiveCount
+        self._layerStartHits, self._layerStartMisses = self._cacheCounters()
+        self._layerStartTime = time.perf_counter()
+
+    def endLayer(self) -> None:
+        layerTime = time.perf_counter() - self._layerStartTime
+        hits, misses = self._cacheCounters()
+        self._layers.append(RenderLayerProfile(
+            layerId=self._layerId,
+            time=layerTime,
+            primitiveCount=self._graphics.primitiveCount - self._layerStartPrimitives,
+            cacheHits=hits - self._layerStartHits,
+            cacheMisses=misses - self._layerStartMisses))
+        self._layerId = None
+
+    def finish(self, sectorCacheStats: RenderCacheStats) -> None:
+        self._profiler._addFrame(frame=RenderFrameProfile(
+            timestamp=self._timestamp,
+            scale=self._scale,
+            style=self._style,
+            time=time.perf_counter() - self._startTime,
+            layers=self._layers,
+            sectorCacheStats=sectorCacheStats))
+
+# The profiler keeps the most recent frames in a ring buffer so it can be
+# left enabled without its memory use growing. A single profiler can be
+# shared by render contexts on different threads.
+class RenderProfiler(object):
+    DefaultCapacity = 500 # Frames
+
+    _FormatVersion = 2
+
+    def __init__(
+            self,
+            capacity: int = DefaultCapacity
+            ) -> None:
+        if capacity <= 0:
+            raise ValueError('Render profiler capacity must be greater than 0')
+        self._lock = threading.Lock()
+        self._frames: typing.Deque[RenderFrameProfile] = collections.deque(maxlen=capacity)
+
+    def capacity(self) -> int:
+        return self._frames.maxlen
+
+    def frames(self) -> typing.List[RenderFrameProfile]:
+        with self._lock:
+            return list(self._frames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+
+    def beginFrame(
+            self,
+            graphics: cartographer.AbstractGraphics,
+            scale: float,
+            style: cartographer.MapStyle,
+            cacheCounters: typing.Callable[[], typing.Tuple[int, int]] # (Hits, Misses)
+            ) -> RenderFrameRecorder:
+        return RenderFrameRecorder(
+            profiler=self,
+            graphics=graphics,
+            scale=scale,
+            style=style,
+            cacheCounters=cacheCounters)
+
+    def save(self, filePath: str) -> None:
+        data = {
+            'version': RenderProfiler._FormatVersion,
+            'frames': [RenderProfiler._frameToDict(frame) for frame in self.frames()]}
+        with open(filePath, 'w', encoding='UTF8') as file:
+            json.dump(data, file, indent=4)
+
+    # Average the layers of the frames. Layers are returned in descending
+    # order of average time. Layers that weren't rendered in every frame are
+    # averaged over all the frames so the averages can be compared.
+    @staticmethod
+    def averageLayers(
+            frames: typing.Iterable[RenderFrameProfile]
+            ) -> typing.List[RenderLayerProfile]:
+        totals: typing.Dict[
+            cartographer.LayerId,
+            typing.List[float] # Time, Primitives, Hits, Misses
+            ] = {}
+        frameCount = 0
+        for frame in frames:
+            frameCount += 1
+            for layer in frame.layers():
+                total = totals.get(layer.layerId())
+                if not total:
+                    total = [0, 0, 0, 0]
+                    totals[layer.layerId()] = total
+                total[0] += layer.time()
+                total[1] += layer.primitiveCount()
+                total[2] += layer.cacheHits()
+                total[3] += layer.cacheMisses()
+
+        averages = []
+        for layerId, (layerTime, primitives, hits, misses) in totals.items():
+            averages.append(RenderLayerProfile(
+                layerId=layerId,
+                time=layerTime / frameCount,
+                primitiveCount=round(primitives / frameCount),
+                cacheHits=round(hits / frameCount),
+                cacheMisses=round(misses / frameCount)))
+        averages.sort(key=lambda layer: layer.time(), reverse=True)
+        return averages
+
+    def _addFrame(self, frame: RenderFrameProfile) -> None:
+        with self._lock:
+            self._frames.append(frame)
+
+    @staticmethod
+    def _frameToDict(frame: RenderFrameProfile) -> typing.Dict[str, typing.Any]:
+        return {
+            'timestamp': frame.timestamp(),
+            'scale': frame.scale(),
+            'style': frame.style().name,
+            'timeMs': frame.time() * 1000,
+            'sectorCache': RenderProfiler._cacheStatsToDict(frame.sectorCacheStats()),
+            'layers': [{
+                'layer': layer.layerId().name,
+                'timeMs': layer.time() * 1000,
+                'primitives': layer.primitiveCount(),
+                'cacheHits': layer.cacheHits(),
+                'cacheMisses': layer.cacheMisses()} for layer in frame.layers()]}
+
+    @staticmethod
+    def _cacheStatsToDict(stats: RenderCacheStats) -> typing.Dict[str, int]:
+        return {
+            'entries': stats.entryCount(),
+            'memoryUsage': stats.memoryUsage(),
+            'memoryBudget': stats.memoryBudget(),
+            'evictions': stats.evictionCount()}
@@ -1,4 +1,6 @@
 import cartographer
+import common
+import enum
 import math
 import multiverse
 import typing
@@ -63,7 +65,29 @@ class SectorLines(object):
     def allegiance(self) -> typing.Optional[str]:
         return self._allegiance
 
+# All the data cached for sectors is held in a single LRU cache that is bounded
+# by an estimate of the memory the data uses. This means the memory used
+# doesn't keep growing as the map is panned around, no matter how many sectors
+# are viewed. The estimates are based on the number of points in the data as
+# that's what the vast majority of the memory is used for.
 class SectorCache(object):
+    class _DataType(enum.Enum):
+        Worlds = 0
+        Borders = 1
+        Regions = 2
+        Routes = 3
+        Clip = 4
+
+    # Approximate bytes of memory used by each point of cached data, including
+    # the Qt objects the graphics create from the points when they're drawn.
+    # These were measured with tracemalloc across all M1105 sectors. The path
+    # and spline for an outline share the same points
+    _WorldPointBytes = 250
+    _OutlinePointBytes = 150
+    _RoutePointBytes = 260
+    _ClipPointBytes = 150
+    _EntryOverheadBytes = 512
+
     # This was moved from the style sheet as it never actually changes
     _RouteEndAdjust = 0.25
 
@@ -104,49 +128,54 @@ class SectorCache(object):
             milieu: multiverse.Milieu,
             universe: multiverse.Universe,
             graphics: cartographer.AbstractGraphics,
-            styleStore: cartographer.StyleStore
+            styleStore: cartographer.StyleStore,
+            memoryBudget: int # Bytes
             ) -> None:
         self._milieu = milieu
         self._universe = universe
         self._graphics = graphics
         self._styleStore = styleStore
-        self._worldsCache: typing.Dict[
-            multiverse.SectorIndex,
-            cartographer.AbstractPointList
-        ] = {}
-        self._borderCache: typing.Dict[
-            multiverse.SectorIndex,
-            typing.List[SectorPath]
-        ] = {}
-        self._regionCache: typing.Dict[
-            multiverse.SectorIndex,
-            typing.List[SectorPath]
-        ] = {}
-        self._routeCache: typing.Dict[
-            multiverse.SectorIndex,
-            typing.List[SectorLines]
-        ] = {}
-        self._clipCache: typing.Dict[
-            multiverse.SectorIndex,
-            cartographer.AbstractPath
-        ] = {}
+        self._cache = common.SizedLRUCache[
+            typing.Tuple[SectorCache._DataType, multiverse.SectorIndex],
+            typing.Union[
+                cartographer.AbstractPointList, # Worlds
+                typing.List[SectorPath], # Borders & regions
+                typing.List[SectorLines], # Routes
+                cartographer.AbstractPath]](maxSize=memoryBudget) # Clip
+        self._hitCount = 0
+        self._missCount = 0
 
     def setMilieu(self, milieu: multiverse.Milieu) -> None:
         if milieu is self._milieu:
             return
         self._milieu = milieu
-        self._worldsCache.clear()
-        self._borderCache.clear()
-        self._regionCache.clear()
-        self._routeCache.clear()
-        # NOTE: No need to clear clip cache as it's not dependant on milieu
-        #self._clipCache.clear()
+        # NOTE: No need to clear clip paths as they're not dependant on milieu
+        for key in self._cache.keys():
+            dataType, _ = key
+            if dataType is not SectorCache._DataType.Clip:
+                self._cache.remove(key)
+
+    def memoryBudget(self) -> int:
+        return self._cache.maxSize()
+
+    def setMemoryBudget(self, memoryBudget: int) -> None:
+        self._cache.setMaxSize(maxSize=memoryBudget)
+
+    # Estimated bytes of memory used by the cached data
+    def memoryUsage(self) -> int:
+        return self._cache.size()
+
+    def entryCount(self) -> int:
+        return len(self._cache)
+
+    def evictionCount(self) -> int:
+        return self._cache.evictionCount()
 
     def isotropicWorldPoints(
             self,
             index: multiverse.SectorIndex
             ) -> typing.Optional[cartographer.AbstractPointList]:
-        worlds = self._worldsCache.get(index)
+        worlds = self._lookup(dataType=SectorCache._DataType.Worlds, index=index)
         if worlds is not None:
             return worlds
 
@@ -167,14 +196,18 @@ class SectorCache(object):
                 y=centerY * multiverse.ParsecScaleY))
 
         worlds = self._graphics.createPointList(points=points)
-        self._worldsCache[index] = worlds
+        self._store(
+            dataType=SectorCache._DataType.Worlds,
+            index=index,
+            data=worlds,
+            size=len(points) * SectorCache._WorldPointBytes)
         return worlds
 
     def borderPaths(
             self,
             index: multiverse.SectorIndex
             ) -> typing.Optional[typing.List[SectorPath]]:
-        borders = self._borderCache.get(index)
+        borders = self._lookup(dataType=SectorCache._DataType.Borders, index=index)
         if borders is not None:
             return borders
 
@@ -186,16 +219,23 @@ class SectorCache(object):
             return None
 
         borders = []
+        pointCount = 0
         for border in sector.yieldBorders():
-            borders.append(self._createOutline(source=border))
-        self._borderCache[index] = borders
+            outline = self._createOutline(source=border)
+            borders.append(outline)
+            pointCount += len(outline.path().points())
+        self._store(
+            dataType=SectorCache._DataType.Borders,
+            index=index,
+            data=borders,
+            size=pointCount * SectorCache._OutlinePointBytes)
         return borders
 
     def regionPaths(
             self,
             index: multiverse.SectorIndex
             ) -> typing.Optional[typing.List[SectorPath]]:
-        regions = self._regionCache.get(index)
+        regions = self._lookup(dataType=SectorCache._DataType.Regions, index=index)
         if regions is not None:
             return regions
 
@@ -207,16 +247,23 @@ class SectorCache(object):
             return None
 
         regions = []
+        pointCount = 0
         for region in sector.yieldRegions():
-            regions.append(self._createOutline(source=region))
-        self._regionCache[index] = regions
+            outline = self._createOutline(source=region)
+            regions.append(outline)
+            pointCount += len(outline.path().points())
+        self._store(
+            dataType=SectorCache._DataType.Regions,
+            index=index,
+            data=regions,
+            size=pointCount * SectorCache._OutlinePointBytes)
         return regions
 
     def routeLines(
             self,
             index: multiverse.SectorIndex
             ) -> typing.Optional[typing.List[SectorLines]]:
-        routes = self._routeCache.get(index)
+        routes = self._lookup(dataType=SectorCache._DataType.Routes, index=index)
         if routes is not None:
             return routes
 
@@ -270,6 +317,7 @@ class SectorCache(object):
             routePoints.append(endPoint)
 
         routes = []
+        pointCount = 0
         for (colour, width, style, type, allegiance), points in routePointsMap.items():
             if style is multiverse.Route.Style.Solid:
                 style = cartographer.LineStyle.Solid
@@ -310,7 +358,12 @@ class SectorCache(object):
                 style=style,
                 type=type,
                 allegiance=allegiance))
-        self._routeCache[index] = routes
+            pointCount += len(points)
+        self._store(
+            dataType=SectorCache._DataType.Routes,
+            index=index,
+            data=routes,
+            size=pointCount * SectorCache._RoutePointBytes)
 
         return routes
 
@@ -318,8 +371,8 @@ class SectorCache(object):
             self,
             index: multiverse.SectorIndex
             ) -> cartographer.AbstractPath:
-        clipPath = self._clipCache.get(index)
-        if clipPath:
+        clipPath = self._lookup(dataType=SectorCache._DataType.Clip, index=index)
+        if clipPath is not None:
             return clipPath
 
         absoluteOriginX, absoluteOriginY = multiverse.relativeSpaceToAbsoluteSpace(
@@ -370,15 +423,57 @@ class SectorCache(object):
                     y=((absoluteOriginY + y) - 0.5) + offsetY))
 
         path = self._graphics.createPath(points=points, closed=True)
-        self._clipCache[index] = path
+        self._store(
+            dataType=SectorCache._DataType.Clip,
+            index=index,
+            data=path,
+            size=len(points) * SectorCache._ClipPointBytes)
         return path
 
+    # The number of lookups that were, or weren't, found in the cache since
+    # it was created
+    def hitCount(self) -> int:
+        return self._hitCount
+
+    def missCount(self) -> int:
+        return self._missCount
+
+    # Discard cached data for a sector that has changed. The clip path isn't
+    # discarded as it only depends on the sector position
+    def clearSector(self, index: multiverse.SectorIndex) -> None:
+        for dataType in SectorCache._DataType:
+            if dataType is SectorCache._DataType.Clip:
+                continue
+            key = (dataType, index)
+            if key in self._cache:
+                self._cache.remove(key)
+
     def clear(self) -> None:
-        self._worldsCache.clear()
-        self._borderCache.clear()
-        self._regionCache.clear()
-        self._routeCache.clear()
-        self._clipCache.clear()
+        self._cache.clear()
+
+    def _lookup(
+            self,
+            dataType: _DataType,
+            index: multiverse.SectorIndex
+            ) -> typing.Optional[typing.Any]:
+        data = self._cache.get((dataType, index))
+        if data is not None:
+            self._hitCount += 1
+        else:
+            self._missCount += 1
+        return data
+
+    def _store(
+            self,
+            dataType: _DataType,
+            index: multiverse.SectorIndex,
+            data: typing.Any,
+            size: int # Estimated bytes excluding entry overhead
+            ) -> None:
+        self._cache.put(
+            key=(dataType, index),
+            value=data,
+            size=size + SectorCache._EntryOverheadBytes)
 
     def _createOutline(
             self,
@@ -36,7 +36,7 @@ class RectSelector(object):
         if rect == self._rect:
             return
         self._rect = cartographer.RectangleF(rect)
-        self._invalidate()
+        self.invalidate()
 
     def milieu(self) -> multiverse.Milieu:
         return self._milieu
@@ -45,7 +45,7 @@ class RectSelector(object):
         if milieu is self._milieu:
             return
         self._milieu = milieu
-        self._invalidate()
+        self.invalidate()
 
     def sectorSlop(self) -> float:
         return self._sectorSlop
@@ -97,7 +97,7 @@ class RectSelector(object):
 
         return self._tightPlaceholderWorlds if tight else self._sloppyPlaceholderWorlds
 
-    def _invalidate(self) -> None:
+    def invalidate(self) -> None:
         self._tightSectors = self._sloppySectors = None
         self._tightWorlds = self._sloppyWorlds = None
         self._tightPlaceholderWorlds = self._sloppyPlaceholderWorlds = None
@@ -19,6 +19,8 @@ class StarfieldCache(object):
             typing.Tuple[int, int], # Sector x/y
             cartographer.AbstractPointList
         ] = {}
+        self._hitCount = 0
+        self._missCount = 0
 
     def chunkParsecs(self) -> int:
         return self._ChunkParsecSize
@@ -35,11 +37,20 @@ class StarfieldCache(object):
         indexY = chunkY % StarfieldCache._RepeatAfter
         key = (indexX, indexY)
         starfield = self._starfieldCache.get(key)
-        if not starfield:
+        if starfield:
+            self._hitCount += 1
+        else:
+            self._missCount += 1
             starfield = self._generateStarfield(indexX, indexY)
             self._starfieldCache[key] = starfield
         return starfield
 
+    def hitCount(self) -> int:
+        return self._hitCount
+
+    def missCount(self) -> int:
+        return self._missCount
+
     def _generateStarfield(
             self,
             indexX: int,
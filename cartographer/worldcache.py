@@ -353,6 +353,8 @@ class WorldCache(object):
         self._infoCache = common.LRUCache[
             multiverse.HexPosition,
             WorldInfo](capacity=capacity)
+        self._hitCount = 0
+        self._missCount = 0
 
     def setMilieu(self, milieu: multiverse.Milieu) -> None:
         if milieu is self._milieu:
@@ -368,7 +370,10 @@ class WorldCache(object):
             hex: multiverse.HexPosition
             ) -> WorldInfo:
         worldInfo = self._infoCache.get(hex)
-        if not worldInfo:
+        if worldInfo:
+            self._hitCount += 1
+        else:
+            self._missCount += 1
             world = self._universe.worldByPosition(
                 milieu=self._milieu,
                 hex=hex)
@@ -380,5 +385,17 @@ class WorldCache(object):
             self._infoCache[hex] = worldInfo
         return worldInfo
 
+    def hitCount(self) -> int:
+        return self._hitCount
+
+    def missCount(self) -> int:
+        return self._missCount
+
+    # Discard cached info for worlds in a sector that has changed
+    def clearSector(self, index: multiverse.SectorIndex) -> None:
+        for hex in self._infoCache.keys():
+            if hex.sectorIndex() == index:
+                self._infoCache.remove(hex)
+
     def clear(self) -> None:
         self._infoCache.clear()
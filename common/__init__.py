@@ -5,4 +5,5 @@ from .dice import *
 from .downloader import *
 from .stringfilter import *
 from .lrucache import *
+from .interntable import *
 from .colour import *
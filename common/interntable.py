@@ -0,0 +1,31 @@
+import typing
+
+K = typing.TypeVar('K')  # Key type
+V = typing.TypeVar('V')  # Value type
+
+# The intern table is used to share a single instance of an immutable value
+# between everything that uses an equivalent value (e.g. all worlds with the
+# same UWP string). Values are created the first time they're requested and
+# are held for the lifetime of the table.
+# This class is thread safe without the need for a lock. If two threads
+# request the same key at the same time they may both create a value, but
+# only the one added to the table first is ever returned.
+class InternTable(typing.Generic[K, V]):
+    def __init__(self) -> None:
+        self._mapping: typing.Dict[K, V] = {}
+
+    def get(
+            self,
+            key: K,
+            create: typing.Callable[[], V]
+            ) -> V:
+        value = self._mapping.get(key)
+        if value is None:
+            value = self._mapping.setdefault(key, create())
+        return value
+
+    def clear(self) -> None:
+        self._mapping.clear()
+
+    def __len__(self) -> int:
+        return len(self._mapping)
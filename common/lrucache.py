@@ -35,6 +35,12 @@ class LRUCache(typing.Generic[K, V]):
     def clear(self) -> None:
         self._mapping.clear()
 
+    def keys(self) -> typing.List[K]:
+        return list(self._mapping.keys())
+
+    def capacity(self) -> int:
+        return self._capacity
+
     def isFull(self) -> bool:
         return len(self._mapping) >= self._capacity
 
@@ -65,3 +71,77 @@ class LRUCache(typing.Generic[K, V]):
 
     def __delitem__(self, key: K) -> None:
         self.remove(key)
+
+# An LRU cache that is bounded by the total size of the values it holds rather
+# than the number of values. The size of each value is given when it's added
+# to the cache so it's up to the caller to decide what the size represents
+# (e.g. an estimate of the bytes of memory it uses). A value larger than the
+# maximum size is never cached.
+class SizedLRUCache(typing.Generic[K, V]):
+    def __init__(self, maxSize: int) -> None:
+        self._maxSize = maxSize
+        self._size = 0
+        self._evictionCount = 0
+        self._mapping: typing.OrderedDict[K, typing.Tuple[V, int]] = collections.OrderedDict()
+
+    def put(
+            self,
+            key: K,
+            value: V,
+            size: int
+            ) -> None:
+        current = self._mapping.pop(key, None)
+        if current is not None:
+            self._size -= current[1]
+        if size > self._maxSize:
+            return
+        self._mapping[key] = (value, size)
+        self._size += size
+        self._evict()
+
+    def get(self, key: K, default: T = None) -> typing.Union[V, T]:
+        entry = self._mapping.get(key)
+        if entry is None:
+            return default
+        self._mapping.move_to_end(key)
+        return entry[0]
+
+    def remove(self, key: K) -> None:
+        if key not in self._mapping:
+            raise KeyError(f'Key "{key}" is not in the cache')
+        _, size = self._mapping.pop(key)
+        self._size -= size
+
+    def clear(self) -> None:
+        self._mapping.clear()
+        self._size = 0
+
+    def keys(self) -> typing.List[K]:
+        return list(self._mapping.keys())
+
+    def size(self) -> int:
+        return self._size
+
+    def maxSize(self) -> int:
+        return self._maxSize
+
+    def setMaxSize(self, maxSize: int) -> None:
+        self._maxSize = maxSize
+        self._evict()
+
+    # The number of values that have been evicted to keep the cache within
+    # its maximum size. Values that are removed or cleared aren't counted
+    def evictionCount(self) -> int:
+        return self._evictionCount
+
+    def _evict(self) -> None:
+        while self._size > self._maxSize:
+            _, (_, size) = self._mapping.popitem(False)
+            self._size -= size
+            self._evictionCount += 1
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._mapping
+
+    def __len__(self) -> int:
+        return len(self._mapping)
@@ -1,6 +1,7 @@
 import cProfile
 import datetime
 import enum
+import gc
 import ipaddress
 import io
 import itertools
@@ -336,6 +337,29 @@ class DebugTimer():
         self._startTime = None
         return delta
 
+# Context manager that disables garbage collection for the duration of the
+# block. This is intended for code that creates a huge number of objects, as
+# otherwise the collector repeatedly scans them as they're created. If freeze
+# is True, all objects that exist when the block exits are moved to the
+# permanent generation so the collector ignores them from then on. This
+# should only be used when the objects created will live for the lifetime of
+# the app.
+class GarbageCollectionDisabled():
+    def __init__(self, freeze: bool = False):
+        self._freeze = freeze
+        self._wasEnabled = False
+
+    def __enter__(self) -> 'GarbageCollectionDisabled':
+        self._wasEnabled = gc.isenabled()
+        gc.disable()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self._freeze and type is None:
+            gc.freeze()
+        if self._wasEnabled:
+            gc.enable()
+
 class Profiler():
     def __init__(self, sortBy=pstats.SortKey.TIME):
         self._sortBy = sortBy
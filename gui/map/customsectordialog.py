@@ -750,6 +750,7 @@ class CustomSectorDialog(gui.DialogEx):
             parent=parent)
 
         self._modified = False
+        self._restartRequired = False
 
         self.showMaximizeButton()
 
@@ -772,6 +773,11 @@ class CustomSectorDialog(gui.DialogEx):
     def modified(self) -> bool:
         return self._modified
 
+    # Returns True if changes to custom sectors couldn't be applied to the
+    # loaded universe so will only be seen when the app is restarted
+    def restartRequired(self) -> bool:
+        return self._restartRequired
+
     def loadSettings(self) -> None:
         super().loadSettings()
 
@@ -967,6 +973,7 @@ class CustomSectorDialog(gui.DialogEx):
         assert(newSector != None)
 
         self._modified = True
+        self._reloadSector(sectorX=newSector.x(), sectorY=newSector.y())
         self._sectorTable.synchronise()
 
         # Select the sector that was just added
@@ -1002,8 +1009,28 @@ class CustomSectorDialog(gui.DialogEx):
             # the data store was left in after the error
 
         self._modified = True
+        self._reloadSector(sectorX=sector.x(), sectorY=sector.y())
         self._sectorTable.synchronise()
 
+    # Update the loaded universe with the current state of the sector at the
+    # specified position in the data store. If this fails the change will
+    # be picked up when the app is next started
+    def _reloadSector(
+            self,
+            sectorX: int,
+            sectorY: int
+            ) -> None:
+        try:
+            multiverse.WorldManager.instance().reloadSector(
+                milieu=app.Config.instance().value(option=app.ConfigOption.Milieu),
+                sectorX=sectorX,
+                sectorY=sectorY)
+        except Exception as ex:
+            logging.error(
+                f'Failed to update universe with changes to sector at {sectorX},{sectorY}',
+                exc_info=ex)
+            self._restartRequired = True
+
     def _mapStyleChanged(
             self,
             style: cartographer.MapStyle
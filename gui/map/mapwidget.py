@@ -6,8 +6,13 @@ import logic
 import logging
 import math
 import multiverse
+import os
+import sqlite3
+import sys
+import threading
 import typing
 import uuid
+import zlib
 from PyQt5 import QtWidgets, QtCore, QtGui
 
 class _MapOverlay(object):
@@ -730,6 +735,642 @@ class _MoveAnimationEasingCurve(QtCore.QEasingCurve):
             pd = tdec / ddec
             return r * (duration - dacc / 2 - ddec + tdec * (2 - pd) / 2)
 
+# The disk cache keeps rendered tiles between sessions so reopening the map
+# doesn't mean every tile has to be rendered again. Tiles are stored as zlib
+# compressed ARGB data in an sqlite database in the data store cache
+# directory. The universe and custom sector timestamps the tiles were
+# rendered with are stored in the database and, if they don't match the
+# current timestamps when the cache is opened, all the tiles are discarded.
+# When a sector changes while the app is running, only the tiles that overlap
+# it are discarded.
+#
+# The cache is used from multiple threads. Tiles are saved by the tile render
+# workers and loaded on the GUI thread. The epoch is incremented whenever
+# tiles are discarded, a tile is only saved if the epoch hasn't changed since
+# before it was rendered so a tile rendered from old data can't be saved
+# after the tiles it should have replaced were discarded.
+class _TileDiskCache(object):
+    _FileName = 'map_tiles.db'
+    # Increment this when the way tiles are stored changes
+    _FormatVersion = 1
+    _GenerationName = 'generation'
+    # When the cache is over its maximum size, the least recently used tiles
+    # are evicted until it's below this proportion of the maximum size. This
+    # stops every save having to evict tiles once the cache is full
+    _EvictionTargetRatio = 0.9
+
+    def __init__(
+            self,
+            maxSize: int # Bytes
+            ) -> None:
+        self._maxSize = maxSize
+        self._lock = threading.Lock()
+        self._connection: typing.Optional[sqlite3.Connection] = None
+        self._totalSize = 0
+        self._useCounter = 0
+        self._epoch = 0
+
+        _, _, _, cacheDir = multiverse.DataStore.sectorDirs()
+        if not cacheDir:
+            return # Caching is disabled
+
+        filePath = os.path.join(cacheDir, _TileDiskCache._FileName)
+        try:
+            os.makedirs(cacheDir, exist_ok=True)
+            self._open(filePath=filePath)
+        except Exception as ex:
+            logging.warning(
+                f'Failed to open map tile cache "{filePath}", it will be recreated',
+                exc_info=ex)
+            try:
+                self._close()
+                for suffix in ['', '-wal', '-shm']:
+                    if os.path.exists(filePath + suffix):
+                        os.remove(filePath + suffix)
+                self._open(filePath=filePath)
+            except Exception as ex:
+                logging.error(
+                    f'Failed to recreate map tile cache "{filePath}", tiles won\'t be cached to disk',
+                    exc_info=ex)
+                self._close()
+                return
+
+        # The world manager only holds a weak reference to the listener but
+        # the cache lives for the lifetime of the application
+        multiverse.WorldManager.instance().addSectorChangedListener(self._sectorChanged)
+
+    def epoch(self) -> int:
+        with self._lock:
+            return self._epoch
+
+    def loadTile(
+            self,
+            tileCacheKey: typing.Tuple[
+                int, # Tile X
+                int, # Tile Y
+                int, # Tile Scale (log)
+                multiverse.Universe,
+                multiverse.Milieu,
+                cartographer.MapStyle,
+                int] # Render options as an int
+            ) -> typing.Optional[QtGui.QImage]:
+        if not self._connection:
+            return None
+
+        tileX, tileY, tileScale, _, milieu, style, options = tileCacheKey
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    'SELECT rowid, width, height, data FROM tiles WHERE '
+                    'milieu = ? AND style = ? AND options = ? AND scale = ? AND x = ? AND y = ?;',
+                    (milieu.value, style.value, options, tileScale, tileX, tileY)).fetchone()
+                if not row:
+                    return None
+                rowId, width, height, data = row
+
+                self._useCounter += 1
+                self._connection.execute(
+                    'UPDATE tiles SET used = ? WHERE rowid = ?;',
+                    (self._useCounter, rowId))
+        except Exception as ex:
+            logging.warning('Failed to load tile from map tile cache', exc_info=ex)
+            return None
+
+        try:
+            data = zlib.decompress(data)
+            if not height or len(data) % height:
+                raise ValueError(f'Tile data length {len(data)} doesn\'t match height {height}')
+            # The image is copied so it doesn't reference the decompressed
+            # data after it goes out of scope
+            return QtGui.QImage(
+                data,
+                width,
+                height,
+                len(data) // height,
+                QtGui.QImage.Format.Format_ARGB32).copy()
+        except Exception as ex:
+            logging.warning('Discarding corrupt tile from map tile cache', exc_info=ex)
+            self._removeTile(rowId=rowId)
+            return None
+
+    def saveTile(
+            self,
+            epoch: int,
+            tileCacheKey: typing.Tuple[
+                int, # Tile X
+                int, # Tile Y
+                int, # Tile Scale (log)
+                multiverse.Universe,
+                multiverse.Milieu,
+                cartographer.MapStyle,
+                int], # Render options as an int
+            image: QtGui.QImage
+            ) -> None:
+        if not self._connection:
+            return
+
+        if image.format() != QtGui.QImage.Format.Format_ARGB32:
+            image = image.convertToFormat(QtGui.QImage.Format.Format_ARGB32)
+        data = zlib.compress(image.constBits().asstring(image.sizeInBytes()))
+
+        tileX, tileY, tileScale, _, milieu, style, options = tileCacheKey
+        with self._lock:
+            if epoch != self._epoch:
+                return # Tiles have been discarded since the tile was rendered
+
+            try:
+
+                row = self._connection.execute(
+                    'SELECT size FROM tiles WHERE '
+                    'milieu = ? AND style = ? AND options = ? AND scale = ? AND x = ? AND y = ?;',
+                    (milieu.value, style.value, options, tileScale, tileX, tileY)).fetchone()
+                replacedSize = row[0] if row else 0
+
+                self._useCounter += 1
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO tiles '
+                    '(milieu, style, options, scale, x, y, width, height, size, used, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);',
+                    (milieu.value, style.value, options, tileScale, tileX, tileY,
+                     image.width(), image.height(), len(data), self._useCounter, data))
+                self._totalSize += len(data) - replacedSize
+
+                if self._totalSize > self._maxSize:
+                    self._evictTiles()
+            except Exception as ex:
+                self._rollback()
+                logging.warning('Failed to save tile to map tile cache', exc_info=ex)
+
+    def clear(self) -> None:
+        if not self._connection:
+            return
+
+        with self._lock:
+            self._epoch += 1
+            try:
+                self._connection.execute('DELETE FROM tiles;')
+                self._totalSize = 0
+            except Exception as ex:
+                logging.warning('Failed to clear map tile cache', exc_info=ex)
+
+    def _open(self, filePath: str) -> None:
+        self._connection = sqlite3.connect(
+            filePath,
+            check_same_thread=False, # Access is serialised by the lock
+            isolation_level=None) # Autocommit, transactions are started explicitly
+        # Write ahead logging means tiles can be saved without the database
+        # being synced to disk every time
+        self._connection.execute('PRAGMA journal_mode = WAL;')
+        self._connection.execute('PRAGMA synchronous = NORMAL;')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);')
+
+        generation = self._generation()
+        row = self._connection.execute(
+            'SELECT value FROM metadata WHERE name = ?;',
+            (_TileDiskCache._GenerationName,)).fetchone()
+        if not row or row[0] != generation:
+            logging.info('Discarding out of date map tile cache')
+            self._connection.execute('BEGIN;')
+            self._connection.execute('DROP TABLE IF EXISTS tiles;')
+            self._connection.execute(
+                'INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?);',
+                (_TileDiskCache._GenerationName, generation))
+            self._connection.execute('COMMIT;')
+
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS tiles ('
+            'milieu TEXT, style TEXT, options INTEGER, scale INTEGER, x INTEGER, y INTEGER, '
+            'width INTEGER, height INTEGER, size INTEGER, used INTEGER, data BLOB, '
+            'PRIMARY KEY (milieu, style, options, scale, x, y));')
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS tiles_used ON tiles (used);')
+
+        self._totalSize, self._useCounter = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM tiles;').fetchone()
+
+    # This must be called with the lock held
+    def _rollback(self) -> None:
+        try:
+            if self._connection.in_transaction:
+                self._connection.rollback()
+        except Exception:
+            pass
+
+    def _close(self) -> None:
+        if self._connection:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+        self._connection = None
+
+    # The generation identifies the data tiles were rendered from. Tiles
+    # are stored in native byte order so that's included in case the cache
+    # directory is moved to a different machine
+    def _generation(self) -> str:
+        universeTimestamp = multiverse.DataStore.instance().universeTimestamp()
+        customTimestamp = multiverse.DataStore.instance().customSectorsTimestamp()
+        return '{version}|{byteOrder}|{universe}|{custom}'.format(
+            version=_TileDiskCache._FormatVersion,
+            byteOrder=sys.byteorder,
+            universe=universeTimestamp.isoformat() if universeTimestamp else '',
+            custom=customTimestamp.isoformat() if customTimestamp else '')
+
+    # This must be called with the lock held
+    def _evictTiles(self) -> None:
+        targetSize = int(self._maxSize * _TileDiskCache._EvictionTargetRatio)
+        evictRowIds = []
+        for rowId, size in self._connection.execute(
+                'SELECT rowid, size FROM tiles ORDER BY used;'):
+            if self._totalSize <= targetSize:
+                break
+            evictRowIds.append((rowId,))
+            self._totalSize -= size
+
+        self._connection.execute('BEGIN;')
+        self._connection.executemany('DELETE FROM tiles WHERE rowid = ?;', evictRowIds)
+        self._connection.execute('COMMIT;')
+
+    def _removeTile(self, rowId: int) -> None:
+        with self._lock:
+            try:
+                self._connection.execute('BEGIN;')
+                row = self._connection.execute(
+                    'SELECT size FROM tiles WHERE rowid = ?;',
+                    (rowId,)).fetchone()
+                if row:
+                    self._connection.execute('DELETE FROM tiles WHERE rowid = ?;', (rowId,))
+                    self._totalSize -= row[0]
+                self._connection.execute('COMMIT;')
+            except Exception as ex:
+                self._rollback()
+                logging.warning('Failed to remove tile from map tile cache', exc_info=ex)
+
+    # Only the tiles that overlap the changed sector are discarded. Sectors in
+    # the placeholder milieu can also be shown in any other milieu so, when
+    # one changes, overlapping tiles for all milieux are discarded. All the
+    # tiles that remain are then known to be current so the generation is
+    # updated. That isn't the case for other changes so the generation is
+    # left as it is and the remaining tiles are discarded when the cache is
+    # next opened.
+    def _sectorChanged(
+            self,
+            milieu: multiverse.Milieu,
+            index: multiverse.SectorIndex
+            ) -> None:
+        if not self._connection:
+            return
+
+        universe = multiverse.WorldManager.instance().universe()
+        isPlaceholder = universe is not None and milieu is universe.placeholderMilieu()
+
+        left, top, width, height = index.worldBounds()
+        left -= MapWidget._SectorChangeTileMargin
+        top -= MapWidget._SectorChangeTileMargin
+        right = left + width + (MapWidget._SectorChangeTileMargin * 2)
+        bottom = top + height + (MapWidget._SectorChangeTileMargin * 2)
+
+        with self._lock:
+            self._epoch += 1
+
+            try:
+                self._connection.execute('BEGIN;')
+                if isPlaceholder:
+                    tileSizes = self._connection.execute(
+                        'SELECT DISTINCT milieu, scale, width, height FROM tiles;').fetchall()
+                else:
+                    tileSizes = self._connection.execute(
+                        'SELECT DISTINCT milieu, scale, width, height FROM tiles WHERE milieu = ?;',
+                        (milieu.value,)).fetchall()
+                for tileMilieu, tileScale, tileWidth, tileHeight in tileSizes:
+                    linearScale = gui.logScaleToLinearScale(tileScale)
+                    worldTileWidth = tileWidth / (linearScale * multiverse.ParsecScaleX)
+                    worldTileHeight = tileHeight / (linearScale * multiverse.ParsecScaleY)
+                    self._connection.execute(
+                        'DELETE FROM tiles WHERE milieu = ? AND scale = ? AND width = ? AND height = ? '
+                        'AND x BETWEEN ? AND ? AND y BETWEEN ? AND ?;',
+                        (tileMilieu, tileScale, tileWidth, tileHeight,
+                         math.floor(left / worldTileWidth), math.ceil(right / worldTileWidth) - 1,
+                         math.floor(top / worldTileHeight), math.ceil(bottom / worldTileHeight) - 1))
+
+                if isPlaceholder:
+                    # The remaining tiles are still valid so the generation
+                    # is updated to the current timestamps, otherwise they
+                    # would all be discarded the next time the cache is opened
+                    self._connection.execute(
+                        'INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?);',
+                        (_TileDiskCache._GenerationName, self._generation()))
+                self._connection.execute('COMMIT;')
+
+                self._totalSize = self._connection.execute(
+                    'SELECT COALESCE(SUM(size), 0) FROM tiles;').fetchone()[0]
+            except Exception as ex:
+                self._rollback()
+                logging.warning('Failed to discard changed tiles from map tile cache', exc_info=ex)
+
+                # Fall back to discarding all tiles so tiles rendered from
+                # the old sector data can't be loaded
+                try:
+                    self._connection.execute('DELETE FROM tiles;')
+                    self._totalSize = 0
+                except Exception as ex:
+                    logging.warning('Failed to clear map tile cache', exc_info=ex)
+
+# A request for a tile to be rendered by the tile render pool. The owner is
+# the handle of the widget that made the request. If a disk cache is set the
+# tile is saved to it once it's rendered
+class _TileRenderRequest(object):
+    def __init__(
+            self,
+            owner: str,
+            tileCacheKey: typing.Tuple[
+                int, # Tile X
+                int, # Tile Y
+                int, # Tile Scale (log)
+                multiverse.Universe,
+                multiverse.Milieu,
+                cartographer.MapStyle,
+                int], # Render options as an int
+            imageStore: cartographer.ImageStore,
+            styleStore: cartographer.StyleStore,
+            vectorStore: cartographer.VectorStore,
+            labelStore: cartographer.LabelStore,
+            diskCache: typing.Optional[_TileDiskCache] = None,
+            profiler: typing.Optional[cartographer.RenderProfiler] = None
+            ) -> None:
+        self.owner = owner
+        self.tileCacheKey = tileCacheKey
+        self.diskCache = diskCache
+        self.profiler = profiler
+        self.imageStore = imageStore
+        self.styleStore = styleStore
+        self.vectorStore = vectorStore
+        self.labelStore = labelStore
+
+# The worker renders tiles with its own render context and graphics so it
+# never shares any mutable render state with the GUI thread or other workers.
+# The stores it's given are only read after they're created so they can be
+# shared with the widget that made the request. The render context is reused
+# between requests that use the same universe and stores so the sector and
+# world caches it builds up aren't lost every time a tile is rendered.
+class _TileRenderWorker(QtCore.QThread):
+    # Signals MUST be defined at the class level (i.e. static). Qt does magic
+    # when the super() is called to create per-instance interfaces to the
+    # signals
+    _renderedSignal = QtCore.pyqtSignal([object, int, object])
+
+    def __init__(
+            self,
+            pool: '_TileRenderPool',
+            parent: typing.Optional[QtCore.QObject] = None
+            ) -> None:
+        super().__init__(parent=parent)
+        self._pool = pool
+
+        # The graphics object is created on the GUI thread and font support
+        # is checked up front as QFontDatabase lookups aren't something that
+        # should be happening on worker threads
+        self._graphics = gui.MapGraphics()
+        self._graphics.supportsWingdings()
+
+        self._renderer: typing.Optional[cartographer.RenderContext] = None
+        self._rendererSources: typing.Optional[typing.Tuple[
+            multiverse.Universe,
+            cartographer.ImageStore,
+            cartographer.StyleStore,
+            cartographer.VectorStore,
+            cartographer.LabelStore]] = None
+
+        # These are only accessed while holding the pools lock
+        self.clearCachesPending = False
+        self.changedSectors: typing.List[typing.Tuple[
+            multiverse.Milieu,
+            multiverse.SectorIndex]] = []
+
+    def run(self) -> None:
+        while True:
+            task = self._pool._takeRequest(worker=self)
+            if not task:
+                return # Pool is shutting down
+            request, epoch, clearCaches, changedSectors = task
+
+            if clearCaches:
+                self._renderer = None
+                self._rendererSources = None
+
+            # The disk cache epoch must be read before rendering starts so the
+            # tile isn't saved if the sector data changes while it's rendering
+            diskCacheEpoch = request.diskCache.epoch() if request.diskCache else None
+
+            image = None
+            try:
+                renderer = self._prepareRenderer(request=request)
+                renderer.setProfiler(profiler=request.profiler)
+                for milieu, index in changedSectors:
+                    if milieu is renderer.milieu():
+                        renderer.clearSectorCaches(index=index)
+
+                tileX, tileY, tileScale = request.tileCacheKey[:3]
+                image = MapWidget._renderTileImage(
+                    renderer=renderer,
+                    graphics=self._graphics,
+                    tileX=tileX,
+                    tileY=tileY,
+                    tileScale=tileScale,
+                    image=None)
+                if request.diskCache:
+                    request.diskCache.saveTile(
+                        epoch=diskCacheEpoch,
+                        tileCacheKey=request.tileCacheKey,
+                        image=image)
+            except Exception as ex:
+                logging.error('Failed to render map tile', exc_info=ex)
+                # Discard the render context in case the failure left it in a
+                # bad state
+                self._renderer = None
+                self._rendererSources = None
+
+            self._renderedSignal[object, int, object].emit(request, epoch, image)
+
+    def _prepareRenderer(
+            self,
+            request: _TileRenderRequest
+            ) -> cartographer.RenderContext:
+        _, _, _, universe, milieu, style, options = request.tileCacheKey
+        options = cartographer.RenderOptions(options)
+        sources = (
+            universe,
+            request.imageStore,
+            request.styleStore,
+            request.vectorStore,
+            request.labelStore)
+
+        needsNewRenderer = self._rendererSources is None or \
+            any(current is not new for current, new in zip(self._rendererSources, sources))
+        if needsNewRenderer:
+            self._renderer = cartographer.RenderContext(
+                universe=universe,
+                graphics=self._graphics,
+                worldCenterX=0,
+                worldCenterY=0,
+                scale=gui.logScaleToLinearScale(request.tileCacheKey[2]),
+                outputPixelX=MapWidget._TileSize,
+                outputPixelY=MapWidget._TileSize,
+                milieu=milieu,
+                style=style,
+                options=options,
+                imageStore=request.imageStore,
+                styleStore=request.styleStore,
+                vectorStore=request.vectorStore,
+                labelStore=request.labelStore)
+            self._rendererSources = sources
+        else:
+            self._renderer.setMilieu(milieu=milieu)
+            if style is not self._renderer.style():
+                self._renderer.setStyle(style=style)
+            if options != self._renderer.options():
+                self._renderer.setOptions(options=options)
+        return self._renderer
+
+# The pool is shared by all map widgets. Widgets submit the tiles they need
+# and the pool renders them on worker threads, adding finished tiles to the
+# shared tile cache on the GUI thread. Each submission replaces any requests
+# from the same widget that haven't been started, so when the view moves the
+# tiles that are no longer needed are dropped rather than rendered.
+#
+# The epoch is incremented whenever the universe data a tile could have been
+# rendered from changes. Tiles are tagged with the epoch when a worker starts
+# rendering them and any that finish after it's changed are thrown away
+# rather than being added to the cache.
+class _TileRenderPool(QtCore.QObject):
+    tileRendered = QtCore.pyqtSignal(object) # Tile cache key
+
+    def __init__(
+            self,
+            tileCache: common.LRUCache,
+            workerCount: int,
+            parent: typing.Optional[QtCore.QObject] = None
+            ) -> None:
+        super().__init__(parent=parent)
+        self._tileCache = tileCache
+        self._condition = threading.Condition()
+        self._pending: typing.List[_TileRenderRequest] = []
+        self._inFlight: typing.Set[typing.Tuple] = set()
+        self._epoch = 0
+        self._stopping = False
+
+        self._workers: typing.List[_TileRenderWorker] = []
+        for _ in range(workerCount):
+            worker = _TileRenderWorker(pool=self)
+            worker._renderedSignal[object, int, object].connect(self._handleRendered)
+            self._workers.append(worker)
+            worker.start()
+
+        # Wait for thread to finish to prevent "QThread: Destroyed while
+        # thread is still running"
+        application = QtWidgets.QApplication.instance()
+        if application:
+            application.aboutToQuit.connect(self.shutdown)
+
+        # The world manager only holds a weak reference to the listener but
+        # the pool lives for the lifetime of the application
+        multiverse.WorldManager.instance().addSectorChangedListener(self._sectorChanged)
+
+    def submit(
+            self,
+            owner: str,
+            requests: typing.Iterable[_TileRenderRequest]
+            ) -> None:
+        with self._condition:
+            self._pending = [request for request in self._pending if request.owner != owner]
+            pendingKeys = set(request.tileCacheKey for request in self._pending)
+            for request in requests:
+                if request.tileCacheKey in self._inFlight or \
+                        request.tileCacheKey in pendingKeys:
+                    continue
+                self._pending.append(request)
+                pendingKeys.add(request.tileCacheKey)
+            if self._pending:
+                self._condition.notify_all()
+
+    # Drop any requests from the owner that haven't been started. Tiles that
+    # are currently being rendered are still added to the cache when they
+    # finish
+    def cancel(self, owner: str) -> None:
+        with self._condition:
+            self._pending = [request for request in self._pending if request.owner != owner]
+
+    # Discard all render contexts along with any tiles currently being
+    # rendered. Used when the cached data the workers have built up can't be
+    # trusted
+    def clearCaches(self) -> None:
+        with self._condition:
+            self._epoch += 1
+            for worker in self._workers:
+                worker.clearCachesPending = True
+                worker.changedSectors.clear()
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._pending.clear()
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.wait()
+
+    def _takeRequest(
+            self,
+            worker: _TileRenderWorker
+            ) -> typing.Optional[typing.Tuple[
+                _TileRenderRequest,
+                int, # Epoch
+                bool, # Clear caches
+                typing.List[typing.Tuple[multiverse.Milieu, multiverse.SectorIndex]]]]:
+        with self._condition:
+            while not self._pending and not self._stopping:
+                self._condition.wait()
+            if self._stopping:
+                return None
+
+            request = self._pending.pop(0)
+            self._inFlight.add(request.tileCacheKey)
+
+            clearCaches = worker.clearCachesPending
+            changedSectors = worker.changedSectors
+            worker.clearCachesPending = False
+            worker.changedSectors = []
+
+            return (request, self._epoch, clearCaches, changedSectors)
+
+    def _handleRendered(
+            self,
+            request: _TileRenderRequest,
+            epoch: int,
+            image: typing.Optional[QtGui.QImage]
+            ) -> None:
+        with self._condition:
+            self._inFlight.discard(request.tileCacheKey)
+            isStale = epoch != self._epoch
+
+        # If the render failed the tile will be requested again the next time
+        # a widget that needs it is drawn
+        if image is None or isStale:
+            return
+
+        self._tileCache[request.tileCacheKey] = image
+        self.tileRendered.emit(request.tileCacheKey)
+
+    def _sectorChanged(
+            self,
+            milieu: multiverse.Milieu,
+            index: multiverse.SectorIndex
+            ) -> None:
+        with self._condition:
+            self._epoch += 1
+            for worker in self._workers:
+                worker.changedSectors.append((milieu, index))
+
 class MapWidget(QtWidgets.QWidget):
     centerChanged = QtCore.pyqtSignal(QtCore.QPointF)
     scaleChanged = QtCore.pyqtSignal(gui.MapScale)
@@ -755,8 +1396,17 @@ class MapWidget(QtWidgets.QWidget):
 
     _TileSize = 256 # Pixels
     _TileCacheSize = 1000 # Number of tiles
+    _TileDiskCacheSize = 256 * 1024 * 1024 # Bytes
     _TileRenderTimerMs = 1
+    # Tile rendering is mostly Python and PyQt doesn't release the GIL while
+    # painting so additional workers don't render any faster. They just
+    # compete with the GUI thread for the GIL and make it less responsive
+    _TileRenderWorkerCount = 1
     _LookaheadBorderTiles = 2
+    # When a sector changes, cached tiles within this distance of it are
+    # discarded as well as ones covering it. This allows for labels and
+    # other features that overhang the edge of the sector
+    _SectorChangeTileMargin = 2 # Parsecs
 
     _CheckerboardColourA = '#000000'
     _CheckerboardColourB = '#404040'
@@ -772,6 +1422,12 @@ class MapWidget(QtWidgets.QWidget):
     _ScaleLineTickHeight = 10
     _ScaleLineWidth = 2
 
+    _RenderProfileFontFamily = 'Courier New'
+    _RenderProfileFontSize = 9
+    _RenderProfileIndent = 10
+    _RenderProfileMaxLayers = 12
+    _RenderProfileBackgroundColour = '#C0000000'
+
     # Number of pixels of movement we allow between the left mouse button down and up events for
     # the action to be counted as a click. I found that forcing no movement caused clicks to be
     # missed
@@ -819,6 +1475,17 @@ class MapWidget(QtWidgets.QWidget):
     # a move.
     _sharedEasingCurveMaxCount = 4
 
+    # The tile render pool is shared by all instances of the widget so the
+    # number of render threads doesn't grow with the number of map windows
+    # that are open. It's created when the first widget is created
+    _sharedTileRenderPool: typing.Optional[_TileRenderPool] = None
+
+    # Tiles are only loaded from and saved to the disk cache when the widget
+    # is displaying the world manager universe. Other universes (e.g. the
+    # one used to preview a custom sector) aren't covered by the data store
+    # timestamps the disk cache uses to check if tiles are out of date
+    _sharedTileDiskCache: typing.Optional[_TileDiskCache] = None
+
     def __init__(
             self,
             universe: multiverse.Universe,
@@ -836,6 +1503,15 @@ class MapWidget(QtWidgets.QWidget):
             for _ in range(MapWidget._sharedEasingCurveMaxCount):
                 MapWidget._sharedEasingCurves.append(_MoveAnimationEasingCurve())
 
+        if MapWidget._sharedTileDiskCache is None:
+            MapWidget._sharedTileDiskCache = _TileDiskCache(
+                maxSize=MapWidget._TileDiskCacheSize)
+
+        if MapWidget._sharedTileRenderPool is None:
+            MapWidget._sharedTileRenderPool = _TileRenderPool(
+                tileCache=MapWidget._sharedTileCache,
+                workerCount=MapWidget._TileRenderWorkerCount)
+
         self._universe = universe
         self._milieu = milieu
         self._style = style
@@ -863,6 +1539,7 @@ class MapWidget(QtWidgets.QWidget):
         self._vectorStore = cartographer.VectorStore(graphics=self._mapGraphics)
         self._labelStore = cartographer.LabelStore(universe=self._universe)
         self._styleStore = cartographer.StyleStore()
+        self._renderProfiler: typing.Optional[cartographer.RenderProfiler] = None
         self._renderer = self._newRenderer()
 
         self._worldDragAnchor: typing.Optional[QtCore.QPointF] = None
@@ -883,6 +1560,8 @@ class MapWidget(QtWidgets.QWidget):
             int, # Tile Y
             int # Tile Scale (linear)
             ]] = []
+        self._tileRenderOwner = str(uuid.uuid4())
+        MapWidget._sharedTileRenderPool.tileRendered.connect(self._handleTileRendered)
         self._forceAtomicRedraw = False
 
         self._placeholderTile = MapWidget._createPlaceholderTile()
@@ -904,6 +1583,14 @@ class MapWidget(QtWidgets.QWidget):
             QtCore.Qt.PenStyle.SolidLine,
             QtCore.Qt.PenCapStyle.FlatCap)
 
+        # The style hint means a monospaced font is still used if the family
+        # isn't installed. It's needed to keep the columns of the profile
+        # table aligned
+        self._renderProfileFont = QtGui.QFont(
+            MapWidget._RenderProfileFontFamily,
+            MapWidget._RenderProfileFontSize)
+        self._renderProfileFont.setStyleHint(QtGui.QFont.StyleHint.TypeWriter)
+
         # This is a staging buffer used when generating an overlay in order
         # to get a consistent alpha blend level when the overlay consists
         # of multiple overlapping primitives. The idea is that the overlay
@@ -969,6 +1656,10 @@ class MapWidget(QtWidgets.QWidget):
         self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
         self.setMouseTracking(True)
 
+        # The world manager only holds a weak reference to the listener so
+        # there is no need to remove it when the widget is destroyed
+        multiverse.WorldManager.instance().addSectorChangedListener(self._sectorChanged)
+
         self._updateView()
 
     def universe(self) -> multiverse.Universe:
@@ -1206,8 +1897,33 @@ class MapWidget(QtWidgets.QWidget):
     def fullRedraw(self) -> None:
         if self._renderer:
             self._renderer.clearCaches()
+        MapWidget._sharedTileRenderPool.clearCaches()
+        MapWidget._sharedTileDiskCache.clear()
         self._clearTileCache()
 
+    def isRenderProfiling(self) -> bool:
+        return self._renderProfiler is not None
+
+    # When enabled, the time taken to render each layer is recorded along
+    # with the primitives it drew and the render cache lookups it made. A
+    # summary of the recorded frames is drawn over the map. Tiles that are
+    # already cached aren't rendered again so, to profile the current view,
+    # a full redraw is needed after profiling is enabled.
+    def setRenderProfiling(self, enabled: bool) -> None:
+        if enabled == self.isRenderProfiling():
+            return
+        self._renderProfiler = cartographer.RenderProfiler() if enabled else None
+        if self._renderer:
+            self._renderer.setProfiler(profiler=self._renderProfiler)
+        # Requests waiting in the render pool still have the old profiler
+        MapWidget._sharedTileRenderPool.cancel(owner=self._tileRenderOwner)
+        self.update()
+
+    def saveRenderProfile(self, filePath: str) -> None:
+        if not self._renderProfiler:
+            raise RuntimeError('Render profiling is not enabled')
+        self._renderProfiler.save(filePath=filePath)
+
     def hexAt(
             self,
             pos: typing.Union[QtCore.QPoint, QtCore.QPointF]
@@ -1609,9 +2325,12 @@ class MapWidget(QtWidgets.QWidget):
 
             # Start the timer to trigger loading of missing tiles. It's
             # important to re-check the tile queue as it may have had
-            # lookahead tiles added
+            # lookahead tiles added. If nothing is needed, any requests still
+            # waiting in the render pool were made with old settings
             if self._tileRenderQueue:
                 self._tileRenderTimer.start()
+            else:
+                MapWidget._sharedTileRenderPool.cancel(owner=self._tileRenderOwner)
 
         if self._offscreenRenderImage is not None:
             painter = QtGui.QPainter()
@@ -1663,6 +2382,8 @@ class MapWidget(QtWidgets.QWidget):
             self._drawOverlays(painter)
             self._drawScale(painter)
             self._drawDirections(painter)
+            if self._renderProfiler:
+                self._drawRenderProfile(painter)
 
     def _drawMap(
             self,
@@ -1845,6 +2566,61 @@ class MapWidget(QtWidgets.QWidget):
                         QtCore.Qt.AlignmentFlag.AlignCenter,
                         text)
 
+    # Draw a table of the layers that took the longest to render averaged
+    # over the frames the profiler has recorded
+    def _drawRenderProfile(
+            self,
+            painter: QtGui.QPainter
+            ) -> None:
+        frames = self._renderProfiler.frames()
+        if frames:
+            frameTime = sum(frame.time() for frame in frames) / len(frames)
+            # Frames can come from different render contexts (e.g. tile
+            # render workers) so the cache stats are only for the render
+            # context that rendered the most recent frame
+            sectorCacheStats = frames[-1].sectorCacheStats()
+            lines = [
+                f'Render profile: {len(frames)} frames, {frameTime * 1000:.1f}ms average',
+                'Sector cache: {} entries, {:.1f}/{:.1f}MiB, {} evictions'.format(
+                    sectorCacheStats.entryCount(),
+                    sectorCacheStats.memoryUsage() / (1024 * 1024),
+                    sectorCacheStats.memoryBudget() / (1024 * 1024),
+                    sectorCacheStats.evictionCount()),
+                '{:<32} {:>8} {:>7} {:>6} {:>6}'.format('Layer', 'ms', 'Prims', 'Hits', 'Misses')]
+            layers = cartographer.RenderProfiler.averageLayers(frames=frames)
+            for layer in layers[:MapWidget._RenderProfileMaxLayers]:
+                lines.append('{:<32} {:>8.2f} {:>7} {:>6} {:>6}'.format(
+                    layer.layerId().name,
+                    layer.time() * 1000,
+                    layer.primitiveCount(),
+                    layer.cacheHits(),
+                    layer.cacheMisses()))
+        else:
+            lines = ['Render profile: No frames recorded']
+
+        fontMetrics = QtGui.QFontMetricsF(self._renderProfileFont)
+        lineHeight = fontMetrics.lineSpacing()
+        textWidth = max(fontMetrics.horizontalAdvance(line) for line in lines)
+        indent = MapWidget._RenderProfileIndent
+
+        with gui.PainterStateGuard(painter):
+            painter.setPen(QtCore.Qt.PenStyle.NoPen)
+            painter.setBrush(QtGui.QColor(MapWidget._RenderProfileBackgroundColour))
+            painter.drawRect(QtCore.QRectF(
+                indent,
+                indent,
+                textWidth + (indent * 2),
+                (lineHeight * len(lines)) + (indent * 2)))
+
+            painter.setFont(self._renderProfileFont)
+            painter.setPen(QtGui.QColor(common.HtmlColours.White))
+            for index, line in enumerate(lines):
+                painter.drawText(
+                    QtCore.QPointF(
+                        indent * 2,
+                        (indent * 2) + (lineHeight * index) + fontMetrics.ascent()),
+                    line)
+
     def _handleLeftClickEvent(
             self,
             hex: typing.Optional[multiverse.HexPosition]
@@ -1913,12 +2689,14 @@ class MapWidget(QtWidgets.QWidget):
         absoluteX = int(round(worldPos.x() + 0.5))
         absoluteY = int(round(worldPos.y() + (0.5 if (absoluteX % 2 == 0) else 0)))
 
-        return multiverse.HexPosition(
+        # This is called for every mouse move so the interned instance is used
+        # to avoid creating a new hex each time the cursor moves within a hex
+        return multiverse.HexPosition.intern(
             absoluteX=absoluteX,
             absoluteY=absoluteY)
 
     def _newRenderer(self) -> cartographer.RenderContext:
-        return cartographer.RenderContext(
+        renderer = cartographer.RenderContext(
             universe=self._universe,
             graphics=self._mapGraphics,
             worldCenterX=self._viewCenter.x(),
@@ -1933,6 +2711,8 @@ class MapWidget(QtWidgets.QWidget):
             styleStore=self._styleStore,
             vectorStore=self._vectorStore,
             labelStore=self._labelStore)
+        renderer.setProfiler(profiler=self._renderProfiler)
+        return renderer
 
     def _updateView(
             self,
@@ -1972,6 +2752,7 @@ class MapWidget(QtWidgets.QWidget):
         # that is triggered will refill the queue if needed
         self._tileRenderQueue.clear()
         self._tileRenderTimer.stop()
+        MapWidget._sharedTileRenderPool.cancel(owner=self._tileRenderOwner)
 
         self._forceAtomicRedraw = forceAtomicRedraw
 
@@ -2219,15 +3000,16 @@ class MapWidget(QtWidgets.QWidget):
             tileScale: int, # Log scale rounded down,
             createMissing: bool
             ) -> typing.Optional[QtGui.QImage]:
-        tileCacheKey = (
-            tileX,
-            tileY,
-            tileScale,
-            self._universe,
-            self._milieu,
-            self._renderer.style(),
-            int(self._renderer.options()))
+        tileCacheKey = self._tileCacheKey(
+            tileX=tileX,
+            tileY=tileY,
+            tileScale=tileScale)
         image = self._sharedTileCache.get(tileCacheKey)
+        diskCache = self._tileDiskCache()
+        if not image and diskCache:
+            image = diskCache.loadTile(tileCacheKey=tileCacheKey)
+            if image:
+                self._sharedTileCache[tileCacheKey] = image
         if not image:
             if not createMissing:
                 # Add the tile to the queue of tiles to be created in the background
@@ -2240,8 +3022,14 @@ class MapWidget(QtWidgets.QWidget):
                 if self._sharedTileCache.isFull():
                     # Reuse oldest cached tile
                     _, image = self._sharedTileCache.pop()
+                diskCacheEpoch = diskCache.epoch() if diskCache else None
                 image = self._renderTile(tileX, tileY, tileScale, image)
                 self._sharedTileCache[tileCacheKey] = image
+                if diskCache:
+                    diskCache.saveTile(
+                        epoch=diskCacheEpoch,
+                        tileCacheKey=tileCacheKey,
+                        image=image)
         return image
 
     def _gatherPlaceholderTiles(
@@ -2362,12 +3150,86 @@ class MapWidget(QtWidgets.QWidget):
 
         return placeholders
 
+    # Called by the world manager when a sector in its universe changes. Only
+    # the cached tiles that overlap the sector are discarded so the rest of
+    # the map doesn't need to be redrawn
+    def _sectorChanged(
+            self,
+            milieu: multiverse.Milieu,
+            index: multiverse.SectorIndex
+            ) -> None:
+        universe = multiverse.WorldManager.instance().universe()
+
+        left, top, width, height = index.worldBounds()
+        left -= MapWidget._SectorChangeTileMargin
+        top -= MapWidget._SectorChangeTileMargin
+        right = left + width + (MapWidget._SectorChangeTileMargin * 2)
+        bottom = top + height + (MapWidget._SectorChangeTileMargin * 2)
+
+        # The tile cache is shared by all map widgets so this will also
+        # discard tiles for widgets showing a different milieu. That's not an
+        # issue as each widget discards the same tiles
+        for tileCacheKey in self._sharedTileCache.keys():
+            tileX, tileY, tileScale, tileUniverse, tileMilieu, _, _ = tileCacheKey
+            if tileUniverse is not universe or tileMilieu is not milieu:
+                continue
+
+            linearScale = gui.logScaleToLinearScale(tileScale)
+            worldTileWidth = MapWidget._TileSize / (linearScale * multiverse.ParsecScaleX)
+            worldTileHeight = MapWidget._TileSize / (linearScale * multiverse.ParsecScaleY)
+            worldTileLeft = tileX * worldTileWidth
+            worldTileTop = tileY * worldTileHeight
+            if worldTileLeft < right and (worldTileLeft + worldTileWidth) > left and \
+                    worldTileTop < bottom and (worldTileTop + worldTileHeight) > top:
+                self._sharedTileCache.remove(tileCacheKey)
+
+        if self._universe is not universe or self._milieu is not milieu:
+            return
+
+        if self._renderer:
+            self._renderer.clearSectorCaches(index=index)
+
+        # Clear the main as it may have changed
+        self._mainsOverlay.setMain(main=None)
+
+        self.update() # Force redraw
+
     def _clearTileCache(self) -> None:
         self._sharedTileCache.clear()
         self._tileRenderQueue.clear()
         self._tileRenderTimer.stop()
+        MapWidget._sharedTileRenderPool.cancel(owner=self._tileRenderOwner)
         self.update() # Force redraw
 
+    def _tileCacheKey(
+            self,
+            tileX: int,
+            tileY: int,
+            tileScale: int # Log scale rounded down
+            ) -> typing.Tuple[
+                int, # Tile X
+                int, # Tile Y
+                int, # Tile Scale (log)
+                multiverse.Universe,
+                multiverse.Milieu,
+                cartographer.MapStyle,
+                int]: # MapOptions as an int
+        return (
+            tileX,
+            tileY,
+            tileScale,
+            self._universe,
+            self._milieu,
+            # Use the settings for the renderer that is going to render the
+            # tile to make sure the key is accurate
+            self._renderer.style(),
+            int(self._renderer.options()))
+
+    def _tileDiskCache(self) -> typing.Optional[_TileDiskCache]:
+        if self._universe is not multiverse.WorldManager.instance().universe():
+            return None
+        return MapWidget._sharedTileDiskCache
+
     def _renderTile(
             self,
             tileX: int,
@@ -2375,6 +3237,25 @@ class MapWidget(QtWidgets.QWidget):
             tileScale: int, # Log scale rounded down
             image: typing.Optional[QtGui.QImage]
             ) -> QtGui.QImage:
+        return MapWidget._renderTileImage(
+            renderer=self._renderer,
+            graphics=self._mapGraphics,
+            tileX=tileX,
+            tileY=tileY,
+            tileScale=tileScale,
+            image=image)
+
+    # This is used by the tile render workers as well as the widget so it
+    # must only use the renderer and graphics it's passed
+    @staticmethod
+    def _renderTileImage(
+            renderer: cartographer.RenderContext,
+            graphics: gui.MapGraphics,
+            tileX: int,
+            tileY: int,
+            tileScale: int, # Log scale rounded down
+            image: typing.Optional[QtGui.QImage]
+            ) -> QtGui.QImage:
         tileScale = gui.logScaleToLinearScale(tileScale)
         scaleX = (tileScale * multiverse.ParsecScaleX)
         scaleY = (tileScale * multiverse.ParsecScaleY)
@@ -2392,44 +3273,60 @@ class MapWidget(QtWidgets.QWidget):
         painter = QtGui.QPainter()
         painter.begin(image)
         try:
-            self._mapGraphics.setPainter(painter=painter)
-            self._renderer.setView(
+            graphics.setPainter(painter=painter)
+            renderer.setView(
                 worldCenterX=worldTileCenterX,
                 worldCenterY=worldTileCenterY,
                 scale=tileScale,
                 outputPixelWidth=MapWidget._TileSize,
                 outputPixelHeight=MapWidget._TileSize)
-            self._renderer.render()
+            renderer.render()
         finally:
-            self._mapGraphics.setPainter(painter=None)
+            graphics.setPainter(painter=None)
             painter.end()
 
         return image
 
+    # Hand the queued tiles over to the render pool. The queue is in the
+    # order the tiles should be rendered so the pool keeps that order
     def _handleRenderTileTimer(self) -> None:
-        tileX, tileY, tileScale = self._tileRenderQueue.pop(0)
-        image = None
-        if self._sharedTileCache.isFull():
-            # Reuse oldest cached tile
-            _, image = self._sharedTileCache.pop()
-        tileCacheKey = (
-            tileX,
-            tileY,
-            tileScale,
-            self._universe,
-            self._milieu,
-            # Use the settings for the renderer that is going to render the
-            # tile to make sure the key is accurate
-            self._renderer.style(),
-            int(self._renderer.options()))
-        self._sharedTileCache[tileCacheKey] = self._renderTile(
-            tileX=tileX,
-            tileY=tileY,
-            tileScale=tileScale,
-            image=image)
-        if self._tileRenderQueue:
-            self._tileRenderTimer.start()
-        self.update()
+        diskCache = self._tileDiskCache()
+        requests = []
+        for tileX, tileY, tileScale in self._tileRenderQueue:
+            requests.append(_TileRenderRequest(
+                owner=self._tileRenderOwner,
+                tileCacheKey=self._tileCacheKey(
+                    tileX=tileX,
+                    tileY=tileY,
+                    tileScale=tileScale),
+                imageStore=self._imageStore,
+                styleStore=self._styleStore,
+                vectorStore=self._vectorStore,
+                labelStore=self._labelStore,
+                diskCache=diskCache,
+                profiler=self._renderProfiler))
+        self._tileRenderQueue.clear()
+        MapWidget._sharedTileRenderPool.submit(
+            owner=self._tileRenderOwner,
+            requests=requests)
+
+    def _handleTileRendered(
+            self,
+            tileCacheKey: typing.Tuple[
+                int, # Tile X
+                int, # Tile Y
+                int, # Tile Scale (log)
+                multiverse.Universe,
+                multiverse.Milieu,
+                cartographer.MapStyle,
+                int] # MapOptions as an int
+            ) -> None:
+        # Only redraw if the tile could be one this widget is displaying
+        _, _, _, universe, milieu, style, options = tileCacheKey
+        if universe is self._universe and milieu is self._milieu and \
+                style is self._renderer.style() and \
+                options == int(self._renderer.options()):
+            self.update()
 
     def _handleKeyboardMovementTimer(self) -> None:
         deltaX, deltaY = self._keyboardMovementTracker.direction()
@@ -1935,6 +1935,25 @@ class MapWidgetEx(QtWidgets.QWidget):
                 text=message,
                 exception=ex)
 
+    def promptSaveRenderProfile(self) -> None:
+        path, _ = gui.FileDialogEx.getSaveFileName(
+            parent=self,
+            caption='Save Render Profile',
+            filter=f'{gui.JSONFileFilter};;{gui.AllFileFilter}',
+            defaultFileName='render_profile.json')
+        if not path:
+            return # User cancelled
+
+        try:
+            self._mapWidget.saveRenderProfile(filePath=path)
+        except Exception as ex:
+            message = f'An exception occurred while saving the render profile to "{path}"'
+            logging.error(msg=message, exc_info=ex)
+            gui.MessageBoxEx.critical(
+                parent=self,
+                text=message,
+                exception=ex)
+
     def menuAction(
             self,
             id: enum.Enum
@@ -2013,6 +2032,17 @@ class MapWidgetEx(QtWidgets.QWidget):
             elif event.key() == QtCore.Qt.Key.Key_W:
                 self._infoButton.toggle()
                 return
+        elif event.modifiers() == (QtCore.Qt.KeyboardModifier.ControlModifier | QtCore.Qt.KeyboardModifier.ShiftModifier):
+            if event.key() == QtCore.Qt.Key.Key_P:
+                self._mapWidget.setRenderProfiling(
+                    enabled=not self._mapWidget.isRenderProfiling())
+                event.accept()
+                return
+            elif event.key() == QtCore.Qt.Key.Key_S:
+                if self._mapWidget.isRenderProfiling():
+                    self.promptSaveRenderProfile()
+                event.accept()
+                return
 
         super().keyPressEvent(event)
 
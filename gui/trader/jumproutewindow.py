@@ -4,6 +4,7 @@ import common
 import enum
 import gui
 import jobs
+import json
 import logging
 import logic
 import os
@@ -101,6 +102,39 @@ class _HexFilter(logic.HexFilterInterface):
         self._rules = traveller.Rules(rules)
         self._tagging = logic.WorldTagging(tagging)
 
+        # The filter can't be modified after it's created so the cache key is
+        # generated up front. World filters are keyed by their serialised form
+        # as they don't support comparison. The rules and tagging only affect
+        # the result if there are avoid filters
+        self._cacheKey = None
+        try:
+            avoidFiltersKey = None
+            rulesKey = None
+            taggingKey = None
+            if self._avoidFilter:
+                avoidFiltersKey = (
+                    avoidFilterLogic,
+                    tuple(json.dumps(logic.serialiseWorldFilter(worldFilter=avoidFilter), sort_keys=True)
+                          for avoidFilter in avoidFilters))
+                rulesKey = (
+                    self._rules.system(),
+                    tuple(self._rules.starPortFuelType(code) for code in 'ABCDE'))
+                taggingKey = frozenset(
+                    (taggingProperty, frozenset(levels.items()))
+                    for taggingProperty, levels in self._tagging.config().items())
+            self._cacheKey = (
+                type(self),
+                frozenset(self._avoidHexes) if self._avoidHexes else None,
+                avoidFiltersKey,
+                rulesKey,
+                taggingKey)
+        except Exception as ex:
+            # Routes calculated with the filter just won't be cached
+            logging.warning('Failed to generate cache key for jump route hex filter', exc_info=ex)
+
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return self._cacheKey
+
     # IMPORTANT: This will be called from the route planner job thread
     def match(
             self,
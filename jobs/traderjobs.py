@@ -313,7 +313,8 @@ class MultiWorldTraderJob(TraderJobBase):
                 includePurchaseWorldBerthing=self._includePurchaseWorldBerthing,
                 includeSaleWorldBerthing=self._includeSaleWorldBerthing,
                 includeLogisticsCosts=self._includeLogisticsCosts,
-                includeUnprofitableTrades=self._includeUnprofitableTrades)
+                includeUnprofitableTrades=self._includeUnprofitableTrades,
+                processPool=logic.TraderProcessPool.instance())
 
             self._emitTradeOptions()
             self._emitTradeInfo()
@@ -7,10 +7,12 @@ from .cargorecord import *
 from .jumproute import *
 from .refuelling import *
 from .routeplanner import *
+from .routecache import *
 from .routecosting import *
 from .logistics import *
 from .tradeoption import *
 from .trader import *
+from .traderpool import *
 from .cargomanifest import *
 from .simulator import *
 from .hexoutlines import *
@@ -21,19 +21,25 @@ class JumpRoute(object):
             self._hexes.append(hex)
             self._flags.append(flags)
 
+        # The parsecs travelled to reach each node are calculated up front so
+        # the parsecs for a node can be looked up without walking the route.
+        # Routes are short so this is done in pure Python as it's quicker
+        # than setting up numpy arrays
+        self._nodeParsecs: typing.List[int] = [0]
         self._totalParsecs = 0
         self._minJumpRating = 0
 
         if len(self._hexes) > 1:
-            fromHex = self._hexes[0]
+            fromPos = self._hexes[0].absolute()
             for index in range(1, len(self._hexes)):
-                toHex = self._hexes[index]
-                parsecs = fromHex.parsecsTo(toHex)
+                toPos = self._hexes[index].absolute()
+                parsecs = multiverse.absoluteHexDistance(fromPos, toPos)
 
                 self._totalParsecs += parsecs
+                self._nodeParsecs.append(self._totalParsecs)
                 if parsecs > self._minJumpRating:
                     self._minJumpRating = parsecs
-                fromHex = toHex
+                fromPos = toPos
 
     def jumpCount(self) -> int:
         return len(self._hexes) - 1
@@ -66,14 +72,9 @@ class JumpRoute(object):
         return self._minJumpRating
 
     def nodeParsecs(self, index: int) -> int:
-        parsecs = 0
-        for current in range(0, self.jumpCount()):
-            if current >= index:
-                break
-            fromHex = self._hexes[current]
-            toHex = self._hexes[current + 1]
-            parsecs += fromHex.parsecsTo(toHex)
-        return parsecs
+        if index <= 0:
+            return 0
+        return self._nodeParsecs[min(index, len(self._nodeParsecs) - 1)]
 
     def totalParsecs(self) -> int:
         return self._totalParsecs
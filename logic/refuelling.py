@@ -79,6 +79,17 @@ class PitStopCostCalculator(object):
         self._rules = rules
         self._worldFuelTypes = {}
 
+    # Returns a hashable value that uniquely identifies the configuration of
+    # the calculator. This is used as part of the key when caching routes.
+    def cacheKey(self) -> typing.Hashable:
+        return (
+            self._refuellingStrategy,
+            self._useFuelCaches,
+            self._anomalyFuelCost.value() if self._anomalyFuelCost else None,
+            self._anomalyBerthingCost.value() if self._anomalyBerthingCost else None,
+            self._rules.system(),
+            tuple(self._rules.starPortFuelType(code) for code in 'ABCDE'))
+
     def refuellingType(
             self,
             world: multiverse.World
@@ -613,6 +624,51 @@ def calculateRefuellingPlan(
     parsecsWithoutRefuelling = math.floor(shipFuelCapacity / shipFuelPerParsec)
     assert(parsecsWithoutRefuelling > 0)
 
+    # Plans that use a dice roller can't be cached as the rolled costs will
+    # vary between calls
+    cacheKey = None
+    if not diceRoller:
+        cacheKey = logic.RouteCache.createRefuellingPlanKey(
+            milieu=milieu,
+            jumpRoute=jumpRoute,
+            shipTonnage=shipTonnage,
+            shipFuelCapacity=shipFuelCapacity,
+            shipStartingFuel=shipStartingFuel,
+            shipFuelPerParsec=shipFuelPerParsec,
+            pitCostCalculator=pitCostCalculator,
+            includeRefuellingCosts=includeRefuellingCosts)
+        if cacheKey is not None:
+            isCached, refuellingPlan = logic.RouteCache.instance().lookup(key=cacheKey)
+            if isCached:
+                return refuellingPlan
+
+    refuellingPlan = _calculateRefuellingPlan(
+        milieu=milieu,
+        jumpRoute=jumpRoute,
+        shipFuelCapacity=shipFuelCapacity,
+        shipStartingFuel=shipStartingFuel,
+        shipFuelPerParsec=shipFuelPerParsec,
+        parsecsWithoutRefuelling=parsecsWithoutRefuelling,
+        pitCostCalculator=pitCostCalculator,
+        includeRefuellingCosts=includeRefuellingCosts,
+        diceRoller=diceRoller)
+
+    if cacheKey is not None:
+        logic.RouteCache.instance().store(key=cacheKey, route=refuellingPlan)
+
+    return refuellingPlan
+
+def _calculateRefuellingPlan(
+        milieu: multiverse.Milieu,
+        jumpRoute: logic.JumpRoute,
+        shipFuelCapacity: int,
+        shipStartingFuel: float,
+        shipFuelPerParsec: float,
+        parsecsWithoutRefuelling: int,
+        pitCostCalculator: PitStopCostCalculator,
+        includeRefuellingCosts: bool,
+        diceRoller: typing.Optional[common.DiceRoller]
+        ) -> typing.Optional[RefuellingPlan]:
     calculationContext = _processRoute(
         milieu=milieu,
         jumpRoute=jumpRoute,
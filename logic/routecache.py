@@ -0,0 +1,190 @@
+import common
+import logic
+import multiverse
+import threading
+import typing
+
+# The route cache holds routes that have previously been calculated so they
+# can be reused when the same route is requested again with the same ship and
+# calculator settings (e.g. the trader calculating routes between the same
+# worlds for each trade good or the user repeatedly opening the same route).
+# Routes are only cached if the jump cost calculator, pit stop calculator and
+# hex filter can generate a cache key describing their configuration. The
+# cache is cleared if the universe is reloaded.
+# As well as routes, the fact there is no route for a given set of parameters
+# is cached as this can be expensive to determine. The refuelling plans for
+# routes are cached in the same way as they're recalculated each time the
+# logistics for a route are calculated.
+# This class is thread safe.
+class RouteCache(object):
+    _DefaultCapacity = 2000
+
+    _instance = None # Singleton instance
+    _lock = threading.Lock()
+
+    def __init__(self) -> None:
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def instance(cls):
+        if not cls._instance:
+            with cls._lock:
+                # Recheck instance as another thread could have created it between the
+                # first check and the lock
+                if not cls._instance:
+                    cls._instance = cls.__new__(cls)
+                    cls._instance._cache = common.LRUCache(capacity=RouteCache._DefaultCapacity)
+                    cls._instance._universeVersion = None
+                    cls._instance._hitCount = 0
+                    cls._instance._missCount = 0
+        return cls._instance
+
+    # Create the key used to cache a route. None is returned if the route
+    # can't be cached as one of the calculators or the filter doesn't provide
+    # a cache key.
+    # The ship parameters should be the values used for the route calculation
+    # after any defaults have been applied (e.g. the fuel per parsec
+    # calculated from the ship tonnage)
+    @staticmethod
+    def createKey(
+            routingType: logic.RoutingType,
+            milieu: multiverse.Milieu,
+            hexSequence: typing.Sequence[multiverse.HexPosition],
+            shipJumpRating: int,
+            shipFuelCapacity: int,
+            shipCurrentFuel: float,
+            shipFuelPerParsec: float,
+            jumpCostCalculator: logic.JumpCostCalculatorInterface,
+            pitCostCalculator: typing.Optional[logic.PitStopCostCalculator],
+            hexFilter: typing.Optional[logic.HexFilterInterface],
+            berthingIndices: typing.Optional[typing.Collection[int]]
+            ) -> typing.Optional[typing.Hashable]:
+        jumpCostKey = jumpCostCalculator.cacheKey()
+        if jumpCostKey is None:
+            return None
+
+        pitCostKey = None
+        if pitCostCalculator:
+            pitCostKey = pitCostCalculator.cacheKey()
+            if pitCostKey is None:
+                return None
+
+        hexFilterKey = None
+        if hexFilter:
+            hexFilterKey = hexFilter.cacheKey()
+            if hexFilterKey is None:
+                return None
+
+        return (
+            routingType,
+            milieu,
+            tuple(hex.absolute() for hex in hexSequence),
+            shipJumpRating,
+            shipFuelCapacity,
+            # Current fuel doesn't affect basic routing as the ship is
+            # assumed to be able to refuel anywhere
+            shipCurrentFuel if routingType is not logic.RoutingType.Basic else None,
+            shipFuelPerParsec,
+            jumpCostKey,
+            pitCostKey,
+            hexFilterKey,
+            frozenset(berthingIndices) if berthingIndices else None)
+
+    # Create the key used to cache the refuelling plan for a route. None is
+    # returned if the plan can't be cached as the pit stop calculator doesn't
+    # provide a cache key.
+    # As with createKey, the ship parameters should be the values used for the
+    # calculation after any defaults have been applied
+    @staticmethod
+    def createRefuellingPlanKey(
+            milieu: multiverse.Milieu,
+            jumpRoute: logic.JumpRoute,
+            shipTonnage: int,
+            shipFuelCapacity: int,
+            shipStartingFuel: float,
+            shipFuelPerParsec: float,
+            pitCostCalculator: logic.PitStopCostCalculator,
+            includeRefuellingCosts: bool
+            ) -> typing.Optional[typing.Hashable]:
+        pitCostKey = pitCostCalculator.cacheKey()
+        if pitCostKey is None:
+            return None
+
+        return (
+            logic.RefuellingPlan, # Prevent clashes with route keys
+            milieu,
+            tuple((jumpRoute.nodeAt(index).absolute(), jumpRoute.mandatoryBerthing(index))
+                  for index in range(jumpRoute.nodeCount())),
+            shipTonnage,
+            shipFuelCapacity,
+            shipStartingFuel,
+            shipFuelPerParsec,
+            pitCostKey,
+            includeRefuellingCosts)
+
+    # Returns a tuple of a bool indicating if the key was found and the cached
+    # route or refuelling plan. The value will be None if it's cached that
+    # there is no route or plan.
+    def lookup(
+            self,
+            key: typing.Hashable
+            ) -> typing.Tuple[bool, typing.Optional[typing.Union[logic.JumpRoute, logic.RefuellingPlan]]]:
+        with self._lock:
+            self._checkUniverseVersion()
+            if key in self._cache:
+                self._hitCount += 1
+                return (True, self._cache[key])
+            self._missCount += 1
+            return (False, None)
+
+    def store(
+            self,
+            key: typing.Hashable,
+            route: typing.Optional[typing.Union[logic.JumpRoute, logic.RefuellingPlan]]
+            ) -> None:
+        with self._lock:
+            self._checkUniverseVersion()
+            self._cache[key] = route
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def capacity(self) -> int:
+        with self._lock:
+            return self._cache.capacity()
+
+    def setCapacity(self, capacity: int) -> None:
+        with self._lock:
+            # LRUCache only supports increasing the capacity so a new cache is
+            # created with the most recently used routes if it's reduced
+            cache = common.LRUCache(capacity=capacity)
+            while len(self._cache) > 0:
+                key, route = self._cache.pop()
+                cache[key] = route
+            self._cache = cache
+
+    def hitCount(self) -> int:
+        with self._lock:
+            return self._hitCount
+
+    def missCount(self) -> int:
+        with self._lock:
+            return self._missCount
+
+    def resetCounters(self) -> None:
+        with self._lock:
+            self._hitCount = 0
+            self._missCount = 0
+
+    # Clear the cache if the universe has changed since routes were cached.
+    # This must be called with the lock held
+    def _checkUniverseVersion(self) -> None:
+        universeVersion = multiverse.WorldManager.instance().universeVersion()
+        if universeVersion != self._universeVersion:
+            self._cache.clear()
+            self._universeVersion = universeVersion
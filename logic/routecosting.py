@@ -45,9 +45,19 @@ class ShortestTimeCostCalculator(logic.JumpCostCalculatorInterface):
 
     def estimate(
             self,
-            parsecsToFinish: int
+            parsecsToFinish: int,
+            jumpsToFinish: typing.Optional[int] = None
             ) -> float:
-        return parsecsToFinish / self._shipJumpRating
+        estimate = parsecsToFinish / self._shipJumpRating
+        if jumpsToFinish != None:
+            estimate = max(estimate, jumpsToFinish)
+        return estimate
+
+    def isSymmetric(self) -> bool:
+        return True
+
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return (type(self), self._shipJumpRating)
 
 # This cost function finds the route that covers the shortest distance but not necessarily the
 # fewest number of jumps. The shortest distance route is important as uses the least fuel (although
@@ -84,10 +94,17 @@ class ShortestDistanceCostCalculator(logic.JumpCostCalculatorInterface):
 
     def estimate(
             self,
-            parsecsToFinish: int
+            parsecsToFinish: int,
+            jumpsToFinish: typing.Optional[int] = None
             ) -> float:
         return parsecsToFinish
 
+    def isSymmetric(self) -> bool:
+        return True
+
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return (type(self),)
+
 # This cost function finds the route with the lowest cost. It tracks the amount of fuel in the ship
 # and the last world that fuel could have been taken on.
 class CheapestRouteCostCalculator(logic.JumpCostCalculatorInterface):
@@ -267,9 +284,29 @@ class CheapestRouteCostCalculator(logic.JumpCostCalculatorInterface):
 
     def estimate(
             self,
-            parsecsToFinish: int
+            parsecsToFinish: int,
+            jumpsToFinish: typing.Optional[int] = None
             ) -> float:
-        return (parsecsToFinish / self._shipJumpRating) * self._perJumpOverheads
+        minJumps = parsecsToFinish / self._shipJumpRating
+        if jumpsToFinish != None:
+            minJumps = max(minJumps, jumpsToFinish)
+        return minJumps * self._perJumpOverheads
+
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        pitCostKey = None
+        if self._pitCostCalculator:
+            pitCostKey = self._pitCostCalculator.cacheKey()
+            if pitCostKey is None:
+                return None
+        return (
+            type(self),
+            self._shipTonnage,
+            self._shipFuelCapacity,
+            self._shipCurrentFuel,
+            self._shipFuelPerParsec,
+            self._shipJumpRating,
+            self._perJumpOverheads,
+            pitCostKey)
 
 # This cost function is used to find the shortest time route while trying to
 # follow X-Boat routes. It's classed as strict as it only gives preference to
@@ -311,9 +348,16 @@ class StrictXBoatCostCalculator(logic.JumpCostCalculatorInterface):
 
     def estimate(
             self,
-            parsecsToFinish: int
+            parsecsToFinish: int,
+            jumpsToFinish: typing.Optional[int] = None
             ) -> float:
-        return parsecsToFinish / self._shipJumpRating
+        estimate = parsecsToFinish / self._shipJumpRating
+        if jumpsToFinish != None:
+            estimate = max(estimate, jumpsToFinish)
+        return estimate
+
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return (type(self), self._milieu, self._shipJumpRating)
 
 # This cost function is used to find the shortest time route while trying to
 # follow X-Boat routes. It's classed as loose as it gives preference to any
@@ -353,6 +397,13 @@ class LooseXBoatCostCalculator(logic.JumpCostCalculatorInterface):
 
     def estimate(
             self,
-            parsecsToFinish: int
+            parsecsToFinish: int,
+            jumpsToFinish: typing.Optional[int] = None
             ) -> float:
-        return parsecsToFinish / self._shipJumpRating
+        estimate = parsecsToFinish / self._shipJumpRating
+        if jumpsToFinish != None:
+            estimate = max(estimate, jumpsToFinish)
+        return estimate
+
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return (type(self), self._milieu, self._shipJumpRating)
@@ -13,14 +13,29 @@ class RoutingType(enum.Enum):
     FuelBased = 'Fuel Based'
     DeadSpace = 'Dead Space'
 
+# Nodes are stored in the open queue as tuples of the form
+# (fScore, -fuelParsecs, node). This means heapq can order nodes using native
+# tuple comparison rather than calling a Python comparison function for every
+# comparison it makes. The node object itself only holds the state required to
+# continue the search from it and to rebuild the route once the finish is
+# reached.
 class _RouteNode(object):
+    __slots__ = (
+        '_targetIndex',
+        '_hex',
+        '_world',
+        '_gScore',
+        '_isFuelWorld',
+        '_fuelParsecs',
+        '_costContext',
+        '_parent')
+
     def __init__(
             self,
             targetIndex: int,
             hex: multiverse.HexPosition,
             world: typing.Optional[multiverse.World],
             gScore: float,
-            fScore: float,
             isFuelWorld: bool,
             fuelParsecs: int,
             costContext: typing.Any,
@@ -30,7 +45,6 @@ class _RouteNode(object):
         self._hex = hex
         self._world = world
         self._gScore = gScore
-        self._fScore = fScore
         self._isFuelWorld = isFuelWorld
         self._fuelParsecs = fuelParsecs
         self._costContext = costContext
@@ -48,9 +62,6 @@ class _RouteNode(object):
     def gScore(self) -> float:
         return self._gScore
 
-    def fScore(self) -> float:
-        return self._fScore
-
     def isFuelWorld(self) -> bool:
         return self._isFuelWorld
 
@@ -65,20 +76,26 @@ class _RouteNode(object):
     def parent(self) -> '_RouteNode':
         return self._parent
 
+    # Create the entry used to store the node in the open queue.
+    # NOTE: Ordering here is VERY important for fuel based routing to work. The
+    # fScore (known cost so far + estimated cost remaining) is the primary key.
+    # If they are equal then the max fuel that the ship could have in it's
+    # tank when reaching this world is used (negated so more fuel is ordered
+    # first). In the case that fScore and remaining fuel are equal, the nodes
+    # have the same priority so the comparison falls through to the nodes
+    # themselves (see __lt__).
+    def queueEntry(
+            self,
+            fScore: float
+            ) -> typing.Tuple[float, int, '_RouteNode']:
+        return (fScore, -self._fuelParsecs, self)
+
+    # This is only used when the fScore and fuel parsecs of two queue entries
+    # are equal. Nodes with the same priority are never less than each other
+    # so heapq processes them in the same order it would if it was comparing
+    # the priorities directly.
     def __lt__(self, other: '_RouteNode') -> bool:
-        # NOTE: This function is used for ordering of nodes by the potential
-        # it's really a "better than" function rather than a "less than" one.
-        # Ordering here is VERY important for fuel based routing to work. The
-        # fScore (known cost so far + estimated cost remaining) is the primary
-        # key. If they are equal then the max fuel that the ship could have in
-        # it's tank when reaching this world is used. In the case that fScore
-        # and remaining fuel are equal, the nodes have the same priority
-        if self._fScore < other._fScore:
-            return True
-        elif self._fScore > other._fScore:
-            return False
-
-        return self._fuelParsecs > other._fuelParsecs
+        return False
 
 class JumpCostCalculatorInterface(object):
     def initialise(
@@ -105,13 +122,31 @@ class JumpCostCalculatorInterface(object):
 
     # Estimate the cost of travelling remaining distance to the target. For
     # the algorithm to work it's important that the estimated cost never
-    # exceeds the actual cost
+    # exceeds the actual cost. The parsecs to finish is the min distance the
+    # route could possibly be, it's not necessarily the straight line distance.
+    # If the min number of jumps is known it's passed as jumps to finish,
+    # this will be None if it's not known.
     def estimate(
             self,
-            parsecsToFinish: int
+            parsecsToFinish: int,
+            jumpsToFinish: typing.Optional[int] = None
             ) -> float:
         raise RuntimeError(f'{type(self)} is derived from JumpCostCalculatorInterface so must implement estimate')
 
+    # Returns True if the cost of a jump is the same in both directions and
+    # doesn't depend on the route taken to reach the world the jump is from
+    # (i.e. the cost context isn't used). This allows the planner to search
+    # from both ends of a route at the same time.
+    def isSymmetric(self) -> bool:
+        return False
+
+    # Returns a hashable value that uniquely identifies the type and
+    # configuration of the calculator. Two calculators with the same key must
+    # calculate the same costs. This is used as part of the key when caching
+    # routes, None means routes calculated with the calculator can't be cached.
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return None
+
 class HexFilterInterface(object):
     def match(
             self,
@@ -120,7 +155,18 @@ class HexFilterInterface(object):
             ) -> float:
         raise RuntimeError(f'{type(self)} is derived from HexFilterInterface so must implement match')
 
+    # Returns a hashable value that uniquely identifies the type and
+    # configuration of the filter. See JumpCostCalculatorInterface.cacheKey.
+    def cacheKey(self) -> typing.Optional[typing.Hashable]:
+        return None
+
 class RoutePlanner(object):
+    def __init__(
+            self,
+            useRouteCache: bool = True # Use the shared route cache to avoid recalculating routes
+            ) -> None:
+        self._routeCache = logic.RouteCache.instance() if useRouteCache else None
+
     def calculateDirectRoute(
             self,
             routingType: RoutingType,
@@ -224,6 +270,411 @@ class RoutePlanner(object):
             progressCallback=progressCallback,
             isCancelledCallback=isCancelledCallback)
 
+    # Calculate direct routes from a single start hex to multiple finish hexes.
+    # The returned list has an entry for each of the finish hexes (in the same
+    # order). An entry will be None if there is no route to that hex. If the
+    # operation is cancelled None is returned rather than a list.
+    # Only basic routing uses a single search for all the finish hexes, fuel
+    # based and dead space routing perform a search per finish hex.
+    def calculateRoutesToMany(
+            self,
+            routingType: RoutingType,
+            milieu: multiverse.Milieu,
+            startHex: multiverse.HexPosition,
+            finishHexes: typing.Sequence[multiverse.HexPosition],
+            shipTonnage: typing.Union[int, common.ScalarCalculation],
+            shipJumpRating: typing.Union[int, common.ScalarCalculation],
+            shipFuelCapacity: typing.Union[int, common.ScalarCalculation],
+            shipCurrentFuel: typing.Union[float, common.ScalarCalculation],
+            jumpCostCalculator: JumpCostCalculatorInterface,
+            pitCostCalculator: typing.Optional[logic.PitStopCostCalculator] = None, # None disables fuel based route calculation
+            shipFuelPerParsec: typing.Optional[typing.Union[float, common.ScalarCalculation]] = None,
+            hexFilter: typing.Optional[HexFilterInterface] = None,
+            mandatoryStartBerthing: bool = False,
+            mandatoryFinishBerthing: bool = False,
+            progressCallback: typing.Optional[typing.Callable[[int, bool], typing.Any]] = None,
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]] = None
+            ) -> typing.Optional[typing.List[typing.Optional[logic.JumpRoute]]]:
+        if (routingType is not RoutingType.Basic) and (not pitCostCalculator):
+            raise ValueError(f'{routingType.value} routing requires a pit stop cost calculator')
+
+        if isinstance(shipJumpRating, common.ScalarCalculation):
+            shipJumpRating = shipJumpRating.value()
+
+        if isinstance(shipFuelCapacity, common.ScalarCalculation):
+            shipFuelCapacity = shipFuelCapacity.value()
+
+        if isinstance(shipCurrentFuel, common.ScalarCalculation):
+            shipCurrentFuel = shipCurrentFuel.value()
+
+        if not shipFuelPerParsec:
+            shipFuelPerParsec = traveller.calculateFuelRequiredForJump(
+                jumpDistance=1,
+                shipTonnage=shipTonnage)
+        if isinstance(shipFuelPerParsec, common.ScalarCalculation):
+            shipFuelPerParsec = shipFuelPerParsec.value()
+
+        shipParsecsWithoutRefuelling = math.floor(shipFuelCapacity / shipFuelPerParsec)
+        if shipParsecsWithoutRefuelling < 1:
+            raise ValueError('Ship\'s fuel capacity doesn\'t allow for jump-1')
+
+        routes: typing.List[typing.Optional[logic.JumpRoute]] = [None] * len(finishHexes)
+
+        # Map finish hexes to the indices they appear at in the finish list. A
+        # list is used as the same hex may appear multiple times
+        pendingTargets: typing.Dict[multiverse.HexPosition, typing.List[int]] = {}
+        for index, finishHex in enumerate(finishHexes):
+            if finishHex == startHex:
+                # Handle the trivial case where the start and finish are the same
+                # hex. This mimics the behaviour of calculateDirectRoute
+                startFlags = 0
+                if mandatoryStartBerthing or mandatoryFinishBerthing:
+                    startFlags |= logic.JumpRoute.NodeFlags.MandatoryBerthing
+                routes[index] = logic.JumpRoute(nodes=[(startHex, startFlags)])
+                continue
+
+            indices = pendingTargets.get(finishHex)
+            if indices is None:
+                indices = []
+                pendingTargets[finishHex] = indices
+            indices.append(index)
+
+        if not pendingTargets:
+            if progressCallback:
+                progressCallback(0, True) # Search is finished
+            return routes
+
+        if routingType is not RoutingType.Basic:
+            # Fuel aware routing only keeps the best score and best remaining
+            # fuel for each hex, the route that reaches a hex first closes it
+            # for all later routes. This means the route found to a given hex
+            # depends on the order hexes are expanded in, so a single expansion
+            # towards multiple targets can find different (and sometimes more
+            # expensive) routes than a search to each target individually. To
+            # keep the results consistent a separate search is performed for
+            # each target
+            for finishHex, indices in pendingTargets.items():
+                route = self.calculateDirectRoute(
+                    routingType=routingType,
+                    milieu=milieu,
+                    startHex=startHex,
+                    finishHex=finishHex,
+                    shipTonnage=shipTonnage,
+                    shipJumpRating=shipJumpRating,
+                    shipFuelCapacity=shipFuelCapacity,
+                    shipCurrentFuel=shipCurrentFuel,
+                    jumpCostCalculator=jumpCostCalculator,
+                    pitCostCalculator=pitCostCalculator,
+                    shipFuelPerParsec=shipFuelPerParsec,
+                    hexFilter=hexFilter,
+                    mandatoryStartBerthing=mandatoryStartBerthing,
+                    mandatoryFinishBerthing=mandatoryFinishBerthing,
+                    isCancelledCallback=isCancelledCallback)
+                if isCancelledCallback and isCancelledCallback():
+                    return None
+                for index in indices:
+                    routes[index] = route
+
+            if progressCallback:
+                progressCallback(0, True) # Search is finished
+            return routes
+
+        berthingIndices = set()
+        if mandatoryStartBerthing:
+            berthingIndices.add(0)
+        if mandatoryFinishBerthing:
+            berthingIndices.add(1)
+
+        # Routes to each finish hex are cached as if they were calculated as
+        # direct routes. Any that are already in the cache don't need to be
+        # searched for
+        cacheKeys: typing.Dict[multiverse.HexPosition, typing.Hashable] = {}
+        if self._routeCache:
+            for finishHex in list(pendingTargets.keys()):
+                cacheKey = logic.RouteCache.createKey(
+                    routingType=routingType,
+                    milieu=milieu,
+                    hexSequence=[startHex, finishHex],
+                    shipJumpRating=shipJumpRating,
+                    shipFuelCapacity=shipFuelCapacity,
+                    shipCurrentFuel=shipCurrentFuel,
+                    shipFuelPerParsec=shipFuelPerParsec,
+                    jumpCostCalculator=jumpCostCalculator,
+                    pitCostCalculator=pitCostCalculator,
+                    hexFilter=hexFilter,
+                    berthingIndices=berthingIndices)
+                if cacheKey is None:
+                    break # The calculators or filter don't support caching
+
+                isCached, route = self._routeCache.lookup(key=cacheKey)
+                if isCached:
+                    for index in pendingTargets.pop(finishHex):
+                        routes[index] = route
+                else:
+                    cacheKeys[finishHex] = cacheKey
+
+            if not pendingTargets:
+                if progressCallback:
+                    progressCallback(0, True) # Search is finished
+                return routes
+
+        # Take a local reference to the WorldManager singleton to avoid repeated calls to instance()
+        worldManager = multiverse.WorldManager.instance()
+
+        # Get the jump graph for the ship's jump rating once up front rather
+        # than repeatedly probing the hexes around each world that's processed.
+        # This will be None if the jump rating is to large for a jump graph
+        jumpGraph = worldManager.jumpGraph(milieu=milieu, radius=shipJumpRating)
+
+        # Drop finish hexes that are known to be unreachable with the ship's
+        # jump rating. If they weren't dropped the search would have to visit
+        # every hex that can be reached from the start hex before it could
+        # give up on them. Landmark tables only cover worlds so they can't be
+        # used for dead space routing
+        if routingType is not RoutingType.DeadSpace:
+            landmarkTable = worldManager.landmarkTable(milieu=milieu, radius=shipJumpRating)
+            if landmarkTable:
+                for finishHex in list(pendingTargets.keys()):
+                    if not landmarkTable.isReachable(startHex, finishHex):
+                        del pendingTargets[finishHex]
+                        cacheKey = cacheKeys.get(finishHex)
+                        if cacheKey is not None:
+                            self._routeCache.store(key=cacheKey, route=None)
+
+                if not pendingTargets:
+                    if progressCallback:
+                        progressCallback(0, True) # Search is finished
+                    return routes
+
+        startWorld = worldManager.worldByPosition(milieu=milieu, hex=startHex)
+
+        # See _calculateRoute for why the max capacity is used
+        isCurrentFuelWorld = False
+        maxStartingFuel = shipFuelCapacity
+
+        # As there are multiple finish hexes there is no single target to estimate
+        # the remaining cost to. Rather than use an estimate this search is a plain
+        # uniform cost (Dijkstra) expansion from the start hex, all nodes have an
+        # fScore equal to their gScore. This means the first time a finish hex is
+        # taken from the open queue, the route to it is the lowest cost route. The
+        # search stops as soon as routes to all finish hexes have been found.
+        openQueue: typing.List[typing.Tuple[float, int, _RouteNode]] = []
+        closedSet: typing.Set[multiverse.HexPosition] = set()
+        hexData: typing.Dict[
+            multiverse.HexPosition,
+            typing.Tuple[
+                float, # Best gScore for a route reaching this hex
+                int, # Best remaining fuel for a route reaching this hex
+                float # Estimated cost to finish, not used as there is no estimate
+            ]] = {}
+        filterResultCache: typing.Dict[multiverse.HexPosition, bool] = {}
+        targetHexes = set(pendingTargets.keys())
+
+        fuelParsecs = math.floor(maxStartingFuel / shipFuelPerParsec)
+        startNode = _RouteNode(
+            targetIndex=1,
+            hex=startHex,
+            world=startWorld,
+            gScore=0,
+            isFuelWorld=isCurrentFuelWorld,
+            fuelParsecs=fuelParsecs,
+            costContext=jumpCostCalculator.initialise(
+                startHex=startHex,
+                startWorld=startWorld),
+            parent=None)
+        heapq.heappush(openQueue, startNode.queueEntry(fScore=0))
+        hexData[startHex] = (0, fuelParsecs, 0)
+
+        closedRoutes = 0
+        while openQueue:
+            if isCancelledCallback and isCancelledCallback():
+                return None
+
+            currentNode: _RouteNode = heapq.heappop(openQueue)[2]
+            currentHex = currentNode.hex()
+            closedSet.add(currentHex)
+
+            indices = pendingTargets.pop(currentHex, None)
+            if indices is not None:
+                # This is the first time this finish hex has been reached so
+                # this is the lowest cost route to it
+                route = self._finaliseRoute(
+                    finishNode=currentNode,
+                    hexSequence=[startHex, currentHex],
+                    berthingIndices=berthingIndices,
+                    progressCount=closedRoutes,
+                    progressCallback=None)
+                for index in indices:
+                    routes[index] = route
+
+                cacheKey = cacheKeys.get(currentHex)
+                if cacheKey is not None:
+                    self._routeCache.store(key=cacheKey, route=route)
+
+                if not pendingTargets:
+                    break # Routes to all finish hexes have been found
+
+            if progressCallback:
+                progressCallback(closedRoutes, False) # Search isn't finished
+
+            potentialsIterator = self._yieldPotentialHexes(
+                routingType=routingType,
+                milieu=milieu,
+                currentNode=currentNode,
+                targetHexes=targetHexes,
+                shipJumpRating=shipJumpRating,
+                shipParsecsWithoutRefuelling=shipParsecsWithoutRefuelling,
+                closedSet=closedSet,
+                hexData=hexData,
+                worldManager=worldManager,
+                jumpGraph=jumpGraph,
+                pitCostCalculator=pitCostCalculator,
+                hexFilter=hexFilter,
+                filterResultCache=filterResultCache)
+            currentWorld = currentNode.world()
+            currentGScore = currentNode.gScore()
+            currentCostContext = currentNode.costContext()
+            possibleRoutes = 0
+            addedRoutes = 0
+            for potential in potentialsIterator:
+                nearbyHex = potential[0]
+                nearbyWorld = potential[1]
+                nearbyParsecs = potential[2]
+                isNearbyFuelWorld = potential[3]
+                nearbyHexBestScore = potential[4]
+                nearbyHexBestFuelParsecs = potential[5]
+                fuelParsecs = potential[7]
+                possibleRoutes += 1
+
+                jumpCost, costContext = jumpCostCalculator.calculate(
+                    currentHex=currentHex,
+                    currentWorld=currentWorld,
+                    nextHex=nearbyHex,
+                    nextWorld=nearbyWorld,
+                    jumpParsecs=nearbyParsecs,
+                    costContext=currentCostContext)
+                if jumpCost == None:
+                    continue
+
+                tentativeScore = currentGScore + jumpCost
+                isBetter = (nearbyHexBestScore == None) or \
+                    (tentativeScore < nearbyHexBestScore) or \
+                    (fuelParsecs > nearbyHexBestFuelParsecs)
+
+                if isBetter:
+                    nearbyHexBestScore = tentativeScore \
+                        if nearbyHexBestScore == None else \
+                        min(tentativeScore, nearbyHexBestScore)
+
+                    nearbyHexBestFuelParsecs = fuelParsecs \
+                        if nearbyHexBestFuelParsecs == None else \
+                        max(fuelParsecs, nearbyHexBestFuelParsecs)
+
+                    hexData[nearbyHex] = (nearbyHexBestScore, nearbyHexBestFuelParsecs, 0)
+
+                    newNode = _RouteNode(
+                        targetIndex=1,
+                        hex=nearbyHex,
+                        world=nearbyWorld,
+                        gScore=tentativeScore,
+                        isFuelWorld=isNearbyFuelWorld,
+                        fuelParsecs=fuelParsecs,
+                        costContext=costContext,
+                        parent=currentNode)
+                    heapq.heappush(openQueue, newNode.queueEntry(fScore=tentativeScore))
+                    addedRoutes += 1
+
+            closedRoutes += possibleRoutes - addedRoutes
+
+        # Any finish hexes that are still pending couldn't be reached
+        for finishHex in pendingTargets.keys():
+            cacheKey = cacheKeys.get(finishHex)
+            if cacheKey is not None:
+                self._routeCache.store(key=cacheKey, route=None)
+
+        if progressCallback:
+            progressCallback(closedRoutes, True) # Search is finished
+
+        return routes
+
+    # Calculate a route, using the route cache if possible. Routes are only
+    # added to the cache if the search completed (i.e. wasn't cancelled).
+    def _calculateRoute(
+            self,
+            routingType: RoutingType,
+            milieu: multiverse.Milieu,
+            hexSequence: typing.Sequence[multiverse.HexPosition], # This code assumes sequences of the same hex have already been removed
+            shipTonnage: typing.Union[int, common.ScalarCalculation],
+            shipJumpRating: typing.Union[int, common.ScalarCalculation],
+            shipFuelCapacity: typing.Union[int, common.ScalarCalculation],
+            shipCurrentFuel: typing.Union[float, common.ScalarCalculation],
+            jumpCostCalculator: JumpCostCalculatorInterface,
+            pitCostCalculator: typing.Optional[logic.PitStopCostCalculator] = None, # Required for fuel based and dead space routing
+            shipFuelPerParsec: typing.Optional[typing.Union[float, common.ScalarCalculation]] = None,
+            hexFilter: typing.Optional[HexFilterInterface] = None,
+            berthingIndices: typing.Optional[typing.Collection[int]] = None, # This is a collection of indices into the hex sequence where berthing is mandatory
+            progressCallback: typing.Optional[typing.Callable[[int, bool], typing.Any]] = None,
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]] = None
+            ) -> typing.Optional[logic.JumpRoute]:
+        if isinstance(shipJumpRating, common.ScalarCalculation):
+            shipJumpRating = shipJumpRating.value()
+
+        if isinstance(shipFuelCapacity, common.ScalarCalculation):
+            shipFuelCapacity = shipFuelCapacity.value()
+
+        if isinstance(shipCurrentFuel, common.ScalarCalculation):
+            shipCurrentFuel = shipCurrentFuel.value()
+
+        if not shipFuelPerParsec:
+            shipFuelPerParsec = traveller.calculateFuelRequiredForJump(
+                jumpDistance=1,
+                shipTonnage=shipTonnage)
+        if isinstance(shipFuelPerParsec, common.ScalarCalculation):
+            shipFuelPerParsec = shipFuelPerParsec.value()
+
+        cacheKey = None
+        if self._routeCache and len(hexSequence) > 1:
+            cacheKey = logic.RouteCache.createKey(
+                routingType=routingType,
+                milieu=milieu,
+                hexSequence=hexSequence,
+                shipJumpRating=shipJumpRating,
+                shipFuelCapacity=shipFuelCapacity,
+                shipCurrentFuel=shipCurrentFuel,
+                shipFuelPerParsec=shipFuelPerParsec,
+                jumpCostCalculator=jumpCostCalculator,
+                pitCostCalculator=pitCostCalculator,
+                hexFilter=hexFilter,
+                berthingIndices=berthingIndices)
+            if cacheKey is not None:
+                isCached, route = self._routeCache.lookup(key=cacheKey)
+                if isCached:
+                    if progressCallback:
+                        progressCallback(0, True) # Search is finished
+                    return route
+
+        route = self._searchRoute(
+            routingType=routingType,
+            milieu=milieu,
+            hexSequence=hexSequence,
+            shipTonnage=shipTonnage,
+            shipJumpRating=shipJumpRating,
+            shipFuelCapacity=shipFuelCapacity,
+            shipCurrentFuel=shipCurrentFuel,
+            shipFuelPerParsec=shipFuelPerParsec,
+            jumpCostCalculator=jumpCostCalculator,
+            pitCostCalculator=pitCostCalculator,
+            hexFilter=hexFilter,
+            berthingIndices=berthingIndices,
+            progressCallback=progressCallback,
+            isCancelledCallback=isCancelledCallback)
+
+        if cacheKey is not None and \
+                not (isCancelledCallback and isCancelledCallback()):
+            self._routeCache.store(key=cacheKey, route=route)
+
+        return route
+
     # Reimplementation of code from Traveller Map source code (FindPath in PathFinder.cs). This in
     # turn was based on code from AI for Game Developers, Bourg & Seemann, O'Reilly Media, Inc.,
     # July 2004.
@@ -233,7 +684,7 @@ class RoutePlanner(object):
     # specified refuelling strategy. Not that this on it's own doesn't make any claims about how
     # cost effective the route will be (compared to other possible routes), that will be determined
     # by the supplied jump cost calculator.
-    def _calculateRoute(
+    def _searchRoute(
             self,
             routingType: RoutingType,
             milieu: multiverse.Milieu,
@@ -278,6 +729,19 @@ class RoutePlanner(object):
         # Take a local reference to the WorldManager singleton to avoid repeated calls to instance()
         worldManager = multiverse.WorldManager.instance()
 
+        # Get the jump graph for the ship's jump rating once up front rather
+        # than repeatedly probing the hexes around each world that's processed.
+        # This will be None if the jump rating is to large for a jump graph
+        jumpGraph = worldManager.jumpGraph(milieu=milieu, radius=shipJumpRating)
+
+        # The landmark table gives a far better estimate of the remaining cost
+        # than the straight line distance, especially for routes that need to
+        # go around rifts. It only covers worlds so it can't be used for dead
+        # space routing
+        landmarkTable = None
+        if routingType is not RoutingType.DeadSpace:
+            landmarkTable = worldManager.landmarkTable(milieu=milieu, radius=shipJumpRating)
+
         sequenceLength = len(hexSequence)
         finishWorldIndex = sequenceLength - 1
 
@@ -357,7 +821,33 @@ class RoutePlanner(object):
                         nodes=[(startHex, startFlags),
                                (finishHex, finishFlags)])
 
-        openQueue: typing.List[_RouteNode] = []
+        if landmarkTable:
+            for index in range(sequenceLength - 1):
+                if not landmarkTable.isReachable(hexSequence[index], hexSequence[index + 1]):
+                    return None # No route found
+
+            if (routingType is RoutingType.Basic) and jumpCostCalculator.isSymmetric():
+                # Basic routing with a symmetric cost calculator is a plain
+                # shortest path search so searching from both ends at the same
+                # time can be used. This requires all hexes in the sequence to
+                # be worlds as the search only moves between worlds.
+                isWorldSequence = True
+                for hex in hexSequence:
+                    if jumpGraph.worldIndex(hex) is None:
+                        isWorldSequence = False
+                        break
+                if isWorldSequence:
+                    return self._calculateBidirectionalRoute(
+                        hexSequence=hexSequence,
+                        jumpGraph=jumpGraph,
+                        landmarkTable=landmarkTable,
+                        jumpCostCalculator=jumpCostCalculator,
+                        hexFilter=hexFilter,
+                        berthingIndices=berthingIndices,
+                        progressCallback=progressCallback,
+                        isCancelledCallback=isCancelledCallback)
+
+        openQueue: typing.List[typing.Tuple[float, int, _RouteNode]] = []
         targetStates: typing.List[
             typing.Tuple[
                 typing.Set[multiverse.HexPosition], # Closed hexes
@@ -366,29 +856,33 @@ class RoutePlanner(object):
                     typing.Tuple[
                         float, # Best gScore for a route reaching this hex
                         int, # Best remaining fuel for a route reaching this hex
-                        int # Parsecs from hex to target (note target not necessarily finish)
+                        float # Estimated cost from hex to finish (going via target and all remaining waypoints)
                     ]],
-                int # Min parsecs from target to finish (going via all waypoints)
+                int, # Min parsecs from target to finish (going via all waypoints)
+                typing.Optional[int] # Min jumps from target to finish (going via all waypoints)
                 ]] = []
         filterResultCache: typing.Set[
             multiverse.HexPosition, # Hex position
             bool # Cached filter result
             ] = {}
 
-        minRouteParsecs = 0
-        for index in range(sequenceLength - 1):
-            currentHex = hexSequence[index]
-            targetHex = hexSequence[index + 1]
-            minRouteParsecs += currentHex.parsecsTo(targetHex)
-
-        startToCurrentParsecs = 0
-        for index in range(sequenceLength):
-            targetStates.append((set(), dict(), minRouteParsecs - startToCurrentParsecs))
-
-            if index != finishWorldIndex:
-                currentHex = hexSequence[index]
-                targetHex = hexSequence[index + 1]
-                startToCurrentParsecs += currentHex.parsecsTo(targetHex)
+        # Work backwards through the sequence to calculate the min distance
+        # from each target to the finish
+        targetToFinishMinParsecs = 0
+        targetToFinishMinJumps = 0 if landmarkTable else None
+        for index in range(finishWorldIndex, -1, -1):
+            targetStates.append((set(), dict(), targetToFinishMinParsecs, targetToFinishMinJumps))
+
+            if index > 0:
+                currentHex = hexSequence[index - 1]
+                targetHex = hexSequence[index]
+                if landmarkTable:
+                    minJumps, minParsecs = landmarkTable.lowerBounds(currentHex, targetHex)
+                    targetToFinishMinParsecs += minParsecs
+                    targetToFinishMinJumps += minJumps
+                else:
+                    targetToFinishMinParsecs += currentHex.parsecsTo(targetHex)
+        targetStates.reverse()
 
         # Add the starting node to the open list
         fuelParsecs = math.floor(maxStartingFuel / shipFuelPerParsec)
@@ -397,18 +891,25 @@ class RoutePlanner(object):
             hex=startHex,
             world=startWorld,
             gScore=0,
-            fScore=0,
             isFuelWorld=isCurrentFuelWorld,
             fuelParsecs=fuelParsecs,
             costContext=jumpCostCalculator.initialise(
                 startHex=startHex,
                 startWorld=startWorld),
             parent=None)
-        heapq.heappush(openQueue, startNode)
-
-        targetHex = hexSequence[1]
-        currentToTargetParsecs = startHex.parsecsTo(targetHex)
-        targetStates[1][1][startHex] = (0, fuelParsecs, currentToTargetParsecs)
+        heapq.heappush(openQueue, startNode.queueEntry(fScore=0))
+
+        _, targetHexData, targetToFinishMinParsecs, targetToFinishMinJumps = targetStates[1]
+        targetHexData[startHex] = (
+            0,
+            fuelParsecs,
+            self._estimateRemainingCost(
+                hex=startHex,
+                targetHex=hexSequence[1],
+                targetToFinishMinParsecs=targetToFinishMinParsecs,
+                targetToFinishMinJumps=targetToFinishMinJumps,
+                jumpCostCalculator=jumpCostCalculator,
+                landmarkTable=landmarkTable))
 
         # Process nodes while the open list is not empty
         closedRoutes = 0
@@ -417,12 +918,13 @@ class RoutePlanner(object):
                 return None
 
             # current node = node from open list with the lowest cost
-            currentNode: _RouteNode = heapq.heappop(openQueue)
+            currentNode: _RouteNode = heapq.heappop(openQueue)[2]
             currentHex = currentNode.hex()
             targetIndex = currentNode.targetIndex()
             targetHex = hexSequence[targetIndex]
 
-            targetClosedSet, targetHexData, targetToFinishMinParsecs = targetStates[targetIndex]
+            targetClosedSet, targetHexData, targetToFinishMinParsecs, targetToFinishMinJumps = \
+                targetStates[targetIndex]
             targetClosedSet.add(currentHex)
 
             # if current node = goal node then path complete
@@ -445,8 +947,9 @@ class RoutePlanner(object):
 
                 # Update the best scores for entry for the current world
                 # NOTE: It's important to get the state for the new target
-                targetClosedSet, targetHexData, targetToFinishMinParsecs = targetStates[targetIndex]
-                currentHexBestScore, currentHexBestFuelParsecs, currentToTargetParsecs = \
+                targetClosedSet, targetHexData, targetToFinishMinParsecs, targetToFinishMinJumps = \
+                    targetStates[targetIndex]
+                currentHexBestScore, currentHexBestFuelParsecs, currentRemainingEstimate = \
                     targetHexData.get(currentHex, (None, None, None))
 
                 currentHexBestScore = currentNode.gScore() \
@@ -457,11 +960,17 @@ class RoutePlanner(object):
                     if currentHexBestFuelParsecs == None else \
                     max(currentNode.fuelParsecs(), currentHexBestFuelParsecs)
 
-                if currentToTargetParsecs == None:
-                    currentToTargetParsecs = currentHex.parsecsTo(targetHex)
+                if currentRemainingEstimate == None:
+                    currentRemainingEstimate = self._estimateRemainingCost(
+                        hex=currentHex,
+                        targetHex=targetHex,
+                        targetToFinishMinParsecs=targetToFinishMinParsecs,
+                        targetToFinishMinJumps=targetToFinishMinJumps,
+                        jumpCostCalculator=jumpCostCalculator,
+                        landmarkTable=landmarkTable)
 
                 targetHexData[currentHex] = \
-                    (currentHexBestScore, currentHexBestFuelParsecs, currentToTargetParsecs)
+                    (currentHexBestScore, currentHexBestFuelParsecs, currentRemainingEstimate)
 
             if progressCallback:
                 progressCallback(closedRoutes, False) # Search isn't finished
@@ -470,15 +979,19 @@ class RoutePlanner(object):
                 routingType=routingType,
                 milieu=milieu,
                 currentNode=currentNode,
-                targetHex=targetHex,
+                targetHexes=(targetHex,),
                 shipJumpRating=shipJumpRating,
                 shipParsecsWithoutRefuelling=shipParsecsWithoutRefuelling,
                 closedSet=targetClosedSet,
                 hexData=targetHexData,
                 worldManager=worldManager,
+                jumpGraph=jumpGraph,
                 pitCostCalculator=pitCostCalculator,
                 hexFilter=hexFilter,
                 filterResultCache=filterResultCache)
+            currentWorld = currentNode.world()
+            currentGScore = currentNode.gScore()
+            currentCostContext = currentNode.costContext()
             possibleRoutes = 0
             addedRoutes = 0
             for potential in potentialsIterator:
@@ -488,22 +1001,22 @@ class RoutePlanner(object):
                 isNearbyFuelWorld = potential[3]
                 nearbyHexBestScore = potential[4]
                 nearbyHexBestFuelParsecs = potential[5]
-                nearbyToTargetMinParsecs = potential[6]
+                nearbyRemainingEstimate = potential[6]
                 fuelParsecs = potential[7]
                 possibleRoutes += 1
 
                 # Calculate the cost of jumping to the adjacent world
                 jumpCost, costContext = jumpCostCalculator.calculate(
                     currentHex=currentHex,
-                    currentWorld=currentNode.world(),
+                    currentWorld=currentWorld,
                     nextHex=nearbyHex,
                     nextWorld=nearbyWorld,
                     jumpParsecs=nearbyParsecs,
-                    costContext=currentNode.costContext())
+                    costContext=currentCostContext)
                 if jumpCost == None:
                     continue
 
-                tentativeScore = currentNode.gScore() + jumpCost
+                tentativeScore = currentGScore + jumpCost
                 isBetter = (nearbyHexBestScore == None) or \
                     (tentativeScore < nearbyHexBestScore) or \
                     (fuelParsecs > nearbyHexBestFuelParsecs)
@@ -517,29 +1030,33 @@ class RoutePlanner(object):
                         if nearbyHexBestFuelParsecs == None else \
                         max(fuelParsecs, nearbyHexBestFuelParsecs)
 
-                    if nearbyToTargetMinParsecs == None:
-                        nearbyToTargetMinParsecs = nearbyHex.parsecsTo(targetHex)
-
-                    targetHexData[nearbyHex] = \
-                        (nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyToTargetMinParsecs)
-
                     # For estimating the cost of the remaining portion of the
                     # route, use min distance from the adjacent world to the
                     # finish going via all remaining waypoints
-                    remainingEstimate = jumpCostCalculator.estimate(
-                        parsecsToFinish=nearbyToTargetMinParsecs + targetToFinishMinParsecs)
+                    if nearbyRemainingEstimate == None:
+                        nearbyRemainingEstimate = self._estimateRemainingCost(
+                            hex=nearbyHex,
+                            targetHex=targetHex,
+                            targetToFinishMinParsecs=targetToFinishMinParsecs,
+                            targetToFinishMinJumps=targetToFinishMinJumps,
+                            jumpCostCalculator=jumpCostCalculator,
+                            landmarkTable=landmarkTable)
+
+                    targetHexData[nearbyHex] = \
+                        (nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyRemainingEstimate)
 
                     newNode = _RouteNode(
                         targetIndex=targetIndex,
                         hex=nearbyHex,
                         world=nearbyWorld,
                         gScore=tentativeScore,
-                        fScore=tentativeScore + remainingEstimate,
                         isFuelWorld=isNearbyFuelWorld,
                         fuelParsecs=fuelParsecs,
                         costContext=costContext,
                         parent=currentNode)
-                    heapq.heappush(openQueue, newNode)
+                    heapq.heappush(
+                        openQueue,
+                        newNode.queueEntry(fScore=tentativeScore + nearbyRemainingEstimate))
                     addedRoutes += 1
 
             closedRoutes += possibleRoutes - addedRoutes
@@ -551,7 +1068,7 @@ class RoutePlanner(object):
             routingType: RoutingType,
             milieu: multiverse.Milieu,
             currentNode: _RouteNode,
-            targetHex: multiverse.HexPosition,
+            targetHexes: typing.Collection[multiverse.HexPosition],
             shipJumpRating: int,
             shipParsecsWithoutRefuelling: int,
             closedSet: typing.Set[multiverse.HexPosition],
@@ -560,9 +1077,10 @@ class RoutePlanner(object):
                 typing.Tuple[
                     float, # Best gScore for a route reaching this hex
                     int, # Best remaining fuel for a route reaching this hex
-                    int # Parsecs from hex to target (note target not necessarily finish)
+                    float # Estimated cost from hex to finish (note target not necessarily finish)
                 ]],
             worldManager: multiverse.WorldManager,
+            jumpGraph: typing.Optional[multiverse.JumpGraph],
             pitCostCalculator: typing.Optional[logic.PitStopCostCalculator],
             hexFilter: typing.Optional[HexFilterInterface] = None,
             filterResultCache: typing.Optional[typing.Dict[multiverse.HexPosition, bool]] = None
@@ -574,7 +1092,7 @@ class RoutePlanner(object):
                     bool, # True if potential hex is a fuel world
                     float, # Current best score for potential hex
                     int, # Current best fuel parsecs for potential hex
-                    int, # Current best parsecs to target for potential hex
+                    float, # Estimated cost from potential hex to finish
                     int], # Max fuel remaining in tank if ship travels to hex
                 None,
                 None]:
@@ -612,15 +1130,24 @@ class RoutePlanner(object):
                 return
 
         currentHex = currentNode.hex()
-        alreadyProcessed: typing.Optional[typing.Set[multiverse.HexPosition]] = None
+
+        # Dead space processing tracks hexes by hex id so hex positions only
+        # need to be created for dead space hexes that aren't skipped
+        alreadyProcessed: typing.Optional[typing.Set[int]] = None
         if routingType is RoutingType.DeadSpace:
             alreadyProcessed = set()
 
-        worldList = worldManager.yieldWorldsInRadius(
-            milieu=milieu,
-            center=currentHex,
-            radius=searchRadius)
-        for nearbyWorld in worldList:
+        if jumpGraph:
+            worldList = jumpGraph.yieldWorldsInRadius(
+                center=currentHex,
+                radius=searchRadius)
+        else:
+            worldList = ((world, currentHex.parsecsTo(world.hex())) for world in \
+                worldManager.yieldWorldsInRadius(
+                    milieu=milieu,
+                    center=currentHex,
+                    radius=searchRadius))
+        for nearbyWorld, nearbyParsecs in worldList:
             nearbyHex = nearbyWorld.hex()
 
             if nearbyHex == currentHex:
@@ -635,9 +1162,7 @@ class RoutePlanner(object):
             # Ordering here is important. We only want to take note of worlds
             # that weren't excluded.
             if alreadyProcessed != None:
-                alreadyProcessed.add(nearbyHex)
-
-            nearbyParsecs = currentHex.parsecsTo(nearbyHex)
+                alreadyProcessed.add(nearbyHex.hexId())
 
             # Work out the max amount of fuel the ship can have in the tank
             # after completing the jump from the current hex to the nearby hex
@@ -660,13 +1185,13 @@ class RoutePlanner(object):
                     # reach the adjacent world
                     continue
 
-                if (not isNearbyFuelWorld) and (fuelParsecs < 1) and (nearbyHex != targetHex):
+                if (not isNearbyFuelWorld) and (fuelParsecs < 1) and (nearbyHex not in targetHexes):
                     # The nearby world isn't a fuel world and the ship won't
                     # have enough fuel to jump on so there is no point
                     # continuing the route
                     continue
 
-            nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyToTargetMinParsecs = \
+            nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyRemainingEstimate = \
                 hexData.get(nearbyHex, (None, None, None))
 
             # Skip worlds that have already been reached with a BETTER cost
@@ -687,9 +1212,9 @@ class RoutePlanner(object):
             if not isBetter:
                 continue
 
-            # If the adjacent world isn't the current target world, check if
+            # If the adjacent world isn't a current target world, check if
             # it's been excluded
-            if hexFilter and (nearbyHex != targetHex):
+            if hexFilter and (nearbyHex not in targetHexes):
                 isMatched = filterResultCache.get(nearbyHex)
                 if isMatched == None:
                     isMatched = hexFilter.match(hex=nearbyHex, world=nearbyWorld)
@@ -704,12 +1229,13 @@ class RoutePlanner(object):
                 isNearbyFuelWorld,
                 nearbyHexBestScore,
                 nearbyHexBestFuelParsecs,
-                nearbyToTargetMinParsecs,
+                nearbyRemainingEstimate,
                 fuelParsecs)
 
         if routingType is RoutingType.DeadSpace:
             nearbyParsecs = 1
-            hitTarget = False
+            targetIds = {targetHex.hexId() for targetHex in targetHexes}
+            hitTargets: typing.Set[int] = set()
             while nearbyParsecs <= searchRadius:
                 # Calculate the max fuel the ship can have left in the tank if
                 # it jumps to this radius
@@ -723,27 +1249,37 @@ class RoutePlanner(object):
                     # dealing with dead space hexes so there will be no way to
                     # take on more fuel. As such there is no point in taking
                     # this any further.
-                    # If the target hex is a dead space hex within the search
-                    # radius it will be processed later due to hitTarget not
-                    # being set
+                    # If a target hex is a dead space hex within the search
+                    # radius it will be processed later due to it not being
+                    # in the hit targets set
                     break
 
-                for nearbyHex in currentHex.yieldRadiusHexes(radius=nearbyParsecs, includeInterior=False):
-                    isTarget = nearbyHex == targetHex
+                radiusHexes = multiverse.yieldAbsoluteRadiusHexes(
+                    center=currentHex.absolute(),
+                    radius=nearbyParsecs,
+                    includeInterior=False)
+                for absoluteX, absoluteY in radiusHexes:
+                    nearbyId = multiverse.absoluteSpaceToHexId((absoluteX, absoluteY))
+                    isTarget = nearbyId in targetIds
                     if isTarget:
-                        hitTarget = True
+                        hitTargets.add(nearbyId)
 
                     # Check if the hex has already been processed due to it
                     # containing a world. If it has been there is no need to
                     # process it again
-                    if nearbyHex in alreadyProcessed:
+                    if nearbyId in alreadyProcessed:
                         continue
 
-                    # If we get to here it means the hex is dead space
+                    # If we get to here it means the hex is dead space. The
+                    # interned instance is used as the same dead space hexes
+                    # are checked from many of the hexes along a route
+                    nearbyHex = multiverse.HexPosition.intern(
+                        absoluteX=absoluteX,
+                        absoluteY=absoluteY)
 
                     # Skip hexes that already have a better route. See code that
                     # processes worlds in the search area for more details
-                    nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyToTargetMinParsecs = \
+                    nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyRemainingEstimate = \
                         hexData.get(nearbyHex, (None, None, None))
                     isBetter = (nearbyHexBestFuelParsecs == None) or \
                         (fuelParsecs > nearbyHexBestFuelParsecs) or \
@@ -768,12 +1304,15 @@ class RoutePlanner(object):
                         False, # Dead space is not a fuel world
                         nearbyHexBestScore,
                         nearbyHexBestFuelParsecs,
-                        nearbyToTargetMinParsecs,
+                        nearbyRemainingEstimate,
                         fuelParsecs)
 
                 nearbyParsecs += 1
 
-            if not hitTarget:
+            for targetHex in targetHexes:
+                if targetHex.hexId() in hitTargets:
+                    continue
+
                 parsecsToTarget = currentHex.parsecsTo(targetHex)
                 if parsecsToTarget <= searchRadius:
                     # The target is dead space and is within the specified search
@@ -791,7 +1330,7 @@ class RoutePlanner(object):
 
                     # Skip hexes that already have a better route. See code that
                     # processes worlds in the search area for more details
-                    nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyToTargetMinParsecs = \
+                    nearbyHexBestScore, nearbyHexBestFuelParsecs, nearbyRemainingEstimate = \
                         hexData.get(targetHex, (None, None, None))
                     isBetter = (nearbyHexBestFuelParsecs == None) or \
                         (fuelParsecs > nearbyHexBestFuelParsecs) or \
@@ -804,7 +1343,7 @@ class RoutePlanner(object):
                             False, # Dead space is not a fuel world
                             nearbyHexBestScore,
                             nearbyHexBestFuelParsecs,
-                            nearbyToTargetMinParsecs,
+                            nearbyRemainingEstimate,
                             fuelParsecs)
 
     def _finaliseRoute(
@@ -817,16 +1356,33 @@ class RoutePlanner(object):
             ) -> logic.JumpRoute:
         # We've found the lowest cost route that goes through all the worlds in the sequence.
         # Process it to generate the final list of route worlds then bail
+        routeHexes = []
+        node = finishNode
+        while node is not None:
+            routeHexes.append(node.hex())
+            node = node.parent()
+        routeHexes.reverse()
+
+        if progressCallback:
+            progressCallback(progressCount, True) # Search is finished
+
+        return self._createJumpRoute(
+            routeHexes=routeHexes,
+            hexSequence=hexSequence,
+            berthingIndices=berthingIndices)
+
+    def _createJumpRoute(
+            self,
+            routeHexes: typing.Sequence[multiverse.HexPosition],
+            hexSequence: typing.Sequence[multiverse.HexPosition],
+            berthingIndices: typing.Optional[typing.Collection[int]] # This is a collection of indices into the hex sequence where berthing is mandatory
+            ) -> logic.JumpRoute:
         path = []
 
-        node = finishNode
         finishSequenceIndex = len(hexSequence) - 1
         sequenceIndex = finishSequenceIndex
 
-        while node is not None:
-            parent = node.parent()
-            nodeHex = node.hex()
-
+        for nodeHex in reversed(routeHexes):
             nodeFlags = 0
             sequenceHex = hexSequence[sequenceIndex]
             if sequenceHex == nodeHex:
@@ -839,12 +1395,243 @@ class RoutePlanner(object):
                 sequenceIndex -= 1
 
             path.append((nodeHex, nodeFlags))
-            node = parent
         assert(sequenceIndex == -1)
 
         path.reverse()
 
+        return logic.JumpRoute(nodes=path)
+
+    def _estimateRemainingCost(
+            self,
+            hex: multiverse.HexPosition,
+            targetHex: multiverse.HexPosition,
+            targetToFinishMinParsecs: int,
+            targetToFinishMinJumps: typing.Optional[int],
+            jumpCostCalculator: JumpCostCalculatorInterface,
+            landmarkTable: typing.Optional[multiverse.LandmarkTable]
+            ) -> float:
+        if not landmarkTable:
+            return jumpCostCalculator.estimate(
+                parsecsToFinish=hex.parsecsTo(targetHex) + targetToFinishMinParsecs)
+
+        minJumps, minParsecs = landmarkTable.lowerBounds(hex, targetHex)
+        return jumpCostCalculator.estimate(
+            parsecsToFinish=minParsecs + targetToFinishMinParsecs,
+            jumpsToFinish=minJumps + targetToFinishMinJumps)
+
+    # Calculate a route by searching from both ends of each segment of the
+    # route at the same time. This is only valid for basic routing with a
+    # symmetric jump cost calculator as, without fuel or cost context to
+    # consider, the lowest cost route through all the hexes in the sequence is
+    # just the lowest cost route for each segment joined together.
+    def _calculateBidirectionalRoute(
+            self,
+            hexSequence: typing.Sequence[multiverse.HexPosition],
+            jumpGraph: multiverse.JumpGraph,
+            landmarkTable: typing.Optional[multiverse.LandmarkTable],
+            jumpCostCalculator: JumpCostCalculatorInterface,
+            hexFilter: typing.Optional[HexFilterInterface],
+            berthingIndices: typing.Optional[typing.Collection[int]],
+            progressCallback: typing.Optional[typing.Callable[[int, bool], typing.Any]],
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]]
+            ) -> typing.Optional[logic.JumpRoute]:
+        filterResultCache: typing.Dict[multiverse.HexPosition, bool] = {}
+        routeHexes = [hexSequence[0]]
+        progressCount = 0
+        for index in range(len(hexSequence) - 1):
+            segmentHexes, progressCount = self._bidirectionalSearch(
+                startHex=hexSequence[index],
+                finishHex=hexSequence[index + 1],
+                jumpGraph=jumpGraph,
+                landmarkTable=landmarkTable,
+                jumpCostCalculator=jumpCostCalculator,
+                hexFilter=hexFilter,
+                filterResultCache=filterResultCache,
+                progressCount=progressCount,
+                progressCallback=progressCallback,
+                isCancelledCallback=isCancelledCallback)
+            if not segmentHexes:
+                return None # No route found or cancelled
+            routeHexes.extend(segmentHexes[1:])
+
         if progressCallback:
             progressCallback(progressCount, True) # Search is finished
 
-        return logic.JumpRoute(nodes=path)
+        return self._createJumpRoute(
+            routeHexes=routeHexes,
+            hexSequence=hexSequence,
+            berthingIndices=berthingIndices)
+
+    # Bidirectional A* search between two worlds. The forward search from the
+    # start and reverse search from the finish use the average of the
+    # estimates to the finish and from the start as their heuristic (with
+    # opposite signs). This keeps the two searches consistent with each other
+    # so the search can stop as soon as the sum of the lowest scores in the
+    # two open queues is no better than the best route found so far.
+    def _bidirectionalSearch(
+            self,
+            startHex: multiverse.HexPosition,
+            finishHex: multiverse.HexPosition,
+            jumpGraph: multiverse.JumpGraph,
+            landmarkTable: typing.Optional[multiverse.LandmarkTable],
+            jumpCostCalculator: JumpCostCalculatorInterface,
+            hexFilter: typing.Optional[HexFilterInterface],
+            filterResultCache: typing.Dict[multiverse.HexPosition, bool],
+            progressCount: int,
+            progressCallback: typing.Optional[typing.Callable[[int, bool], typing.Any]],
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]]
+            ) -> typing.Tuple[
+                typing.Optional[typing.List[multiverse.HexPosition]], # Route hexes, None if no route or cancelled
+                int]: # Updated progress count
+        startIndex = jumpGraph.worldIndex(startHex)
+        finishIndex = jumpGraph.worldIndex(finishHex)
+
+        potentials: typing.Dict[int, float] = {}
+        for index, hex in ((startIndex, startHex), (finishIndex, finishHex)):
+            potentials[index] = self._bidirectionalPotential(
+                hex=hex,
+                startHex=startHex,
+                finishHex=finishHex,
+                jumpCostCalculator=jumpCostCalculator,
+                landmarkTable=landmarkTable)
+
+        # Index 0 is the forward search, index 1 is the reverse search
+        openQueues: typing.Tuple[typing.List[typing.Tuple[float, int]], ...] = \
+            ([(potentials[startIndex], startIndex)], [(-potentials[finishIndex], finishIndex)])
+        closedSets: typing.Tuple[typing.Set[int], ...] = (set(), set())
+        gScores: typing.Tuple[typing.Dict[int, float], ...] = \
+            ({startIndex: 0}, {finishIndex: 0})
+        parents: typing.Tuple[typing.Dict[int, int], ...] = ({}, {})
+
+        bestCost = None
+        bestMeeting = None # Tuple of forward search world and reverse search world
+        while openQueues[0] and openQueues[1]:
+            if isCancelledCallback and isCancelledCallback():
+                return (None, progressCount)
+
+            if (bestCost != None) and \
+                    (openQueues[0][0][0] + openQueues[1][0][0] >= bestCost):
+                break # No better route can be found
+
+            # Expand the search with the fewest open nodes
+            direction = 0 if len(openQueues[0]) <= len(openQueues[1]) else 1
+            _, currentIndex = heapq.heappop(openQueues[direction])
+            closedSet = closedSets[direction]
+            if currentIndex in closedSet:
+                continue # Already processed with a better score
+            closedSet.add(currentIndex)
+
+            progressCount += 1
+            if progressCallback:
+                progressCallback(progressCount, False) # Search isn't finished
+
+            directionScores = gScores[direction]
+            otherScores = gScores[1 - direction]
+            directionParents = parents[direction]
+            currentGScore = directionScores[currentIndex]
+            currentWorld = jumpGraph.worldByIndex(currentIndex)
+            currentHex = currentWorld.hex()
+
+            neighbourIndices, neighbourParsecs = jumpGraph.neighbourIndices(currentIndex)
+            for neighbourIndex, jumpParsecs in zip(neighbourIndices, neighbourParsecs):
+                if neighbourIndex == currentIndex or neighbourIndex in closedSet:
+                    continue
+
+                neighbourWorld = jumpGraph.worldByIndex(neighbourIndex)
+                neighbourHex = neighbourWorld.hex()
+
+                # The start and finish can't be filtered
+                if hexFilter and (neighbourIndex != startIndex) and (neighbourIndex != finishIndex):
+                    isMatched = filterResultCache.get(neighbourHex)
+                    if isMatched == None:
+                        isMatched = hexFilter.match(hex=neighbourHex, world=neighbourWorld)
+                        filterResultCache[neighbourHex] = isMatched
+                    if not isMatched:
+                        continue # Hex has been excluded
+
+                jumpCost, _ = jumpCostCalculator.calculate(
+                    currentHex=currentHex,
+                    currentWorld=currentWorld,
+                    nextHex=neighbourHex,
+                    nextWorld=neighbourWorld,
+                    jumpParsecs=jumpParsecs,
+                    costContext=None)
+                if jumpCost == None:
+                    continue
+
+                tentativeScore = currentGScore + jumpCost
+                neighbourScore = directionScores.get(neighbourIndex)
+                if (neighbourScore == None) or (tentativeScore < neighbourScore):
+                    directionScores[neighbourIndex] = tentativeScore
+                    directionParents[neighbourIndex] = currentIndex
+
+                    potential = potentials.get(neighbourIndex)
+                    if potential == None:
+                        potential = self._bidirectionalPotential(
+                            hex=neighbourHex,
+                            startHex=startHex,
+                            finishHex=finishHex,
+                            jumpCostCalculator=jumpCostCalculator,
+                            landmarkTable=landmarkTable)
+                        potentials[neighbourIndex] = potential
+
+                    heapq.heappush(
+                        openQueues[direction],
+                        (tentativeScore + potential if direction == 0 else tentativeScore - potential,
+                         neighbourIndex))
+
+                # Check if this jump joins the two searches with a better
+                # route than has been found so far
+                otherScore = otherScores.get(neighbourIndex)
+                if otherScore != None:
+                    routeCost = tentativeScore + otherScore
+                    if (bestCost == None) or (routeCost < bestCost):
+                        bestCost = routeCost
+                        bestMeeting = (currentIndex, neighbourIndex) \
+                            if direction == 0 else \
+                            (neighbourIndex, currentIndex)
+
+        if bestMeeting == None:
+            return (None, progressCount) # No route found
+
+        forwardIndex, reverseIndex = bestMeeting
+        routeIndices = []
+        index = forwardIndex
+        while index != None:
+            routeIndices.append(index)
+            index = parents[0].get(index)
+        routeIndices.reverse()
+        index = reverseIndex
+        while index != None:
+            routeIndices.append(index)
+            index = parents[1].get(index)
+
+        return ([jumpGraph.worldByIndex(index).hex() for index in routeIndices], progressCount)
+
+    # The potential for the bidirectional search is half the difference of
+    # the estimated cost to the finish and estimated cost from the start.
+    # Using the same function (negated) for both searches is what allows the
+    # searches to be stopped as soon as they meet with the best route.
+    def _bidirectionalPotential(
+            self,
+            hex: multiverse.HexPosition,
+            startHex: multiverse.HexPosition,
+            finishHex: multiverse.HexPosition,
+            jumpCostCalculator: JumpCostCalculatorInterface,
+            landmarkTable: typing.Optional[multiverse.LandmarkTable]
+            ) -> float:
+        toFinishEstimate = self._estimateRemainingCost(
+            hex=hex,
+            targetHex=finishHex,
+            targetToFinishMinParsecs=0,
+            targetToFinishMinJumps=0,
+            jumpCostCalculator=jumpCostCalculator,
+            landmarkTable=landmarkTable)
+        fromStartEstimate = self._estimateRemainingCost(
+            hex=hex,
+            targetHex=startHex,
+            targetToFinishMinParsecs=0,
+            targetToFinishMinJumps=0,
+            jumpCostCalculator=jumpCostCalculator,
+            landmarkTable=landmarkTable)
+        return (toFinishEstimate - fromStartEstimate) / 2
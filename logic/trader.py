@@ -198,8 +198,39 @@ class Trader(object):
             includePurchaseWorldBerthing: bool = False, # Assume we're already berthed on the purchase world
             includeSaleWorldBerthing: bool = True, # Assume we'll have to berth on the sale world to complete the trade
             includeLogisticsCosts: bool = True,
-            includeUnprofitableTrades: bool = False
+            includeUnprofitableTrades: bool = False,
+            processPool: typing.Optional['logic.TraderProcessPool'] = None
             ) -> None:
+        # Keep a copy of the arguments as they were passed so they can be
+        # passed on to worker processes if a process pool is being used
+        poolArgs = dict(
+            saleWorlds=saleWorlds,
+            playerBrokerDm=playerBrokerDm,
+            minSellerDm=minSellerDm,
+            maxSellerDm=maxSellerDm,
+            minBuyerDm=minBuyerDm,
+            maxBuyerDm=maxBuyerDm,
+            includeIllegal=includeIllegal,
+            availableFunds=availableFunds,
+            shipTonnage=shipTonnage,
+            shipJumpRating=shipJumpRating,
+            shipCargoCapacity=shipCargoCapacity,
+            shipFuelCapacity=shipFuelCapacity,
+            shipStartingFuel=shipStartingFuel,
+            routingType=routingType,
+            perJumpOverheads=perJumpOverheads,
+            jumpCostCalculator=jumpCostCalculator,
+            pitCostCalculator=pitCostCalculator,
+            shipFuelPerParsec=shipFuelPerParsec,
+            useLocalPurchaseBroker=useLocalPurchaseBroker,
+            localPurchaseBrokerDm=localPurchaseBrokerDm,
+            useLocalSaleBroker=useLocalSaleBroker,
+            localSaleBrokerDm=localSaleBrokerDm,
+            includePurchaseWorldBerthing=includePurchaseWorldBerthing,
+            includeSaleWorldBerthing=includeSaleWorldBerthing,
+            includeLogisticsCosts=includeLogisticsCosts,
+            includeUnprofitableTrades=includeUnprofitableTrades)
+
         # Convert arguments used directly but this class to calculations if needed. Arguments that
         # are just passed on will be converted by the function they are passed to if required.
         if not isinstance(availableFunds, common.ScalarCalculation):
@@ -304,6 +335,10 @@ class Trader(object):
                 value=localSaleBrokerDm,
                 name='Local Sale Broker DM')
 
+        purchaseWorlds = list(purchaseWorlds)
+        saleWorlds = list(saleWorlds)
+        poolArgs['saleWorlds'] = saleWorlds
+
         self._optionsToProcess = 0
         purchaseWorldPossibleCargo = []
         for purchaseWorld in purchaseWorlds:
@@ -323,6 +358,34 @@ class Trader(object):
         self._optionsToProcess *= len(saleWorlds)
         self._currentProgress = 0
 
+        if processPool and len(purchaseWorlds) > 1:
+            # Only worlds that have cargo to buy need to be sent to the pool
+            poolWorlds = []
+            poolCargoCounts = []
+            for purchaseWorld, possibleCargo in zip(purchaseWorlds, purchaseWorldPossibleCargo):
+                if possibleCargo:
+                    poolWorlds.append(purchaseWorld)
+                    poolCargoCounts.append(len(possibleCargo))
+
+            # Progress is updated as each purchase world is completed. The
+            # workers process all sale worlds for a purchase world so the
+            # number of options processed is known
+            def poolProgress(index: int) -> None:
+                self._updateProgress(
+                    processedCount=poolCargoCounts[index] * len(saleWorlds))
+
+            if processPool.calculateTradeOptions(
+                    rules=self._rules,
+                    milieu=self._milieu,
+                    purchaseWorlds=poolWorlds,
+                    tradeOptionCallback=self._tradeOptionCallback,
+                    traderInfoCallback=self._traderInfoCallback,
+                    progressCallback=poolProgress,
+                    isCancelledCallback=self._isCancelledCallback,
+                    **poolArgs):
+                return
+            # The pool couldn't be used so fall back to calculating in process
+
         # Note that it's intentional that there is no check that the purchase and sale worlds are
         # the same. Depending on trade codes there are worlds where it's possible to make a profit
         # with average dice rolls just by buying and selling on the same world
@@ -389,28 +452,31 @@ class Trader(object):
             ) -> None:
         routePlanner = logic.RoutePlanner()
 
-        for saleWorld in saleWorlds:
-            jumpRoute = routePlanner.calculateDirectRoute(
-                routingType=routingType,
-                milieu=milieu,
-                startHex=purchaseWorld.hex(),
-                finishHex=saleWorld.hex(),
-                shipTonnage=shipTonnage,
-                shipJumpRating=shipJumpRating,
-                shipFuelCapacity=shipFuelCapacity,
-                shipFuelPerParsec=shipFuelPerParsec,
-                shipCurrentFuel=shipStartingFuel,
-                jumpCostCalculator=jumpCostCalculator,
-                pitCostCalculator=pitCostCalculator,
-                mandatoryStartBerthing=includePurchaseWorldBerthing,
-                mandatoryFinishBerthing=includeSaleWorldBerthing,
-                hexFilter=None,
-                isCancelledCallback=self._isCancelledCallback)
-            if not jumpRoute:
-                if self._isCancelledCallback and self._isCancelledCallback():
-                    # Operation was cancelled while calculating the jump route
-                    return
+        # Calculate the routes to all the sale worlds with a single search from
+        # the purchase world rather than performing a search per sale world
+        saleWorlds = list(saleWorlds)
+        jumpRoutes = routePlanner.calculateRoutesToMany(
+            routingType=routingType,
+            milieu=milieu,
+            startHex=purchaseWorld.hex(),
+            finishHexes=[saleWorld.hex() for saleWorld in saleWorlds],
+            shipTonnage=shipTonnage,
+            shipJumpRating=shipJumpRating,
+            shipFuelCapacity=shipFuelCapacity,
+            shipFuelPerParsec=shipFuelPerParsec,
+            shipCurrentFuel=shipStartingFuel,
+            jumpCostCalculator=jumpCostCalculator,
+            pitCostCalculator=pitCostCalculator,
+            mandatoryStartBerthing=includePurchaseWorldBerthing,
+            mandatoryFinishBerthing=includeSaleWorldBerthing,
+            hexFilter=None,
+            isCancelledCallback=self._isCancelledCallback)
+        if jumpRoutes is None:
+            # Operation was cancelled while calculating the jump routes
+            return
 
+        for saleWorld, jumpRoute in zip(saleWorlds, jumpRoutes):
+            if not jumpRoute:
                 self._updateProgress(
                     processedCount=(len(currentCargo) if currentCargo else 0) + \
                     (len(possibleCargo) if possibleCargo else 0))
@@ -0,0 +1,266 @@
+import concurrent.futures
+import io
+import logic
+import logging
+import multiprocessing
+import multiverse
+import os
+import pickle
+import threading
+import traveller
+import typing
+
+# Objects are passed between the main process and workers by pickling them
+# with persistent ids for universe objects. Worlds, trade goods and the
+# universe itself are large and, more importantly, the main process needs
+# trade options that reference ITS instances of them (rather than copies) so
+# they compare equal to worlds from the rest of the app. Each process holds
+# its own copy of the universe so they can be looked up by position.
+class _Pickler(pickle.Pickler):
+    def persistent_id(self, obj: typing.Any) -> typing.Any:
+        if isinstance(obj, multiverse.World):
+            return ('world', obj.milieu().value, obj.hex().absolute())
+        if isinstance(obj, traveller.TradeGood):
+            return ('tradegood', obj.ruleSystem().value, obj.id())
+        if isinstance(obj, multiverse.Universe):
+            return ('universe',)
+        return None
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid: typing.Any) -> typing.Any:
+        objType = pid[0]
+        if objType == 'world':
+            _, milieu, (absoluteX, absoluteY) = pid
+            world = multiverse.WorldManager.instance().worldByPosition(
+                milieu=multiverse.Milieu(milieu),
+                hex=multiverse.HexPosition(absoluteX=absoluteX, absoluteY=absoluteY))
+            if not world:
+                raise pickle.UnpicklingError(
+                    f'No world at ({absoluteX}, {absoluteY}) in {milieu}')
+            return world
+        if objType == 'tradegood':
+            _, ruleSystem, tradeGoodId = pid
+            return traveller.tradeGoodFromId(
+                ruleSystem=traveller.RuleSystem(ruleSystem),
+                tradeGoodId=tradeGoodId)
+        if objType == 'universe':
+            return multiverse.WorldManager.instance().universe()
+        raise pickle.UnpicklingError(f'Unknown persistent id type {objType}')
+
+def _serialise(obj: typing.Any) -> bytes:
+    buffer = io.BytesIO()
+    _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+def _deserialise(data: bytes) -> typing.Any:
+    return _Unpickler(io.BytesIO(data)).load()
+
+# Per worker process state, set up by _initialiseWorker
+_workerCancelEvent = None
+
+def _initialiseWorker(
+        installDir: str,
+        overlayDir: str,
+        customDir: str,
+        cacheDir: typing.Optional[str],
+        cancelEvent: typing.Any
+        ) -> None:
+    global _workerCancelEvent
+    _workerCancelEvent = cancelEvent
+
+    multiverse.DataStore.setSectorDirs(
+        installDir=installDir,
+        overlayDir=overlayDir,
+        customDir=customDir,
+        cacheDir=cacheDir)
+    # Workers only ever need the milieu of the scans they're used for. They
+    # load sectors in process as multiple workers are already running in
+    # parallel
+    multiverse.WorldManager.setLazyLoading(True)
+    multiverse.WorldManager.setLoadWorkerCount(1)
+    multiverse.WorldManager.instance().loadSectors()
+
+def _isWorkerCancelled() -> bool:
+    return _workerCancelEvent is not None and _workerCancelEvent.is_set()
+
+def _calculateWorkerTradeOptions(
+        argsData: bytes,
+        purchaseWorldData: bytes
+        ) -> bytes:
+    rules, milieu, kwargs = _deserialise(argsData)
+    purchaseWorld = _deserialise(purchaseWorldData)
+
+    tradeOptions = []
+    infoStrings = []
+    trader = logic.Trader(
+        rules=rules,
+        milieu=milieu,
+        tradeOptionCallback=tradeOptions.append,
+        traderInfoCallback=infoStrings.append,
+        isCancelledCallback=_isWorkerCancelled)
+    trader.calculateTradeOptionsForMultipleWorlds(
+        purchaseWorlds=[purchaseWorld],
+        **kwargs)
+
+    return _serialise((tradeOptions, infoStrings))
+
+# The trader process pool is used to spread the work of a multi world trade
+# scan over multiple processes. A scan is split into one task per purchase
+# world, each worker calculates the trade options for the purchase world
+# against all the sale worlds. Worker processes load their own copy of the
+# universe when they start so the first scan after the pool is created is
+# slower but workers are kept alive for subsequent scans.
+# Only one scan can use the pool at a time, if a second scan is started while
+# the pool is in use it's calculated in process as it would be if there was
+# no pool.
+class TraderProcessPool(object):
+    _MaxWorkerCount = 4
+    # How often the main process checks if the scan has been cancelled
+    _CancelCheckInterval = 0.1 # Seconds
+
+    _instance = None # Singleton instance
+    _lock = threading.Lock()
+    _workerCount = None
+
+    def __init__(self) -> None:
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def instance(cls):
+        if not cls._instance:
+            with cls._lock:
+                # Recheck instance as another thread could have created it between the
+                # first check and the lock
+                if not cls._instance:
+                    cls._instance = cls.__new__(cls)
+                    cls._instance._executor = None
+                    cls._instance._cancelEvent = None
+                    cls._instance._universeVersion = None
+                    cls._instance._scanLock = threading.Lock()
+        return cls._instance
+
+    # Set the number of worker processes. This must be called before the
+    # singleton is initialised. A count of less than 2 disables the pool.
+    @staticmethod
+    def setWorkerCount(count: int) -> None:
+        if TraderProcessPool._instance:
+            raise RuntimeError('You can\'t set the worker count after the singleton has been initialised')
+        TraderProcessPool._workerCount = count
+
+    def workerCount(self) -> int:
+        if TraderProcessPool._workerCount is not None:
+            return TraderProcessPool._workerCount
+        return min(os.cpu_count() or 1, TraderProcessPool._MaxWorkerCount)
+
+    def isEnabled(self) -> bool:
+        return self.workerCount() > 1
+
+    def shutdown(self) -> None:
+        with self._scanLock:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._cancelEvent = None
+                self._universeVersion = None
+
+    # Calculate trade options for each purchase world in a worker process.
+    # The keyword arguments are passed to Trader.calculateTradeOptionsForMultipleWorlds
+    # in the worker. Returns False without doing anything if the pool is
+    # disabled or already in use by another scan.
+    def calculateTradeOptions(
+            self,
+            rules: traveller.Rules,
+            milieu: multiverse.Milieu,
+            purchaseWorlds: typing.Iterable[multiverse.World],
+            tradeOptionCallback: typing.Callable[[logic.TradeOption], typing.Any],
+            traderInfoCallback: typing.Optional[typing.Callable[[str], typing.Any]] = None,
+            progressCallback: typing.Optional[typing.Callable[[int], typing.Any]] = None, # Called with the index of each completed purchase world
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]] = None,
+            **kwargs
+            ) -> bool:
+        if not self.isEnabled():
+            return False
+        if not self._scanLock.acquire(blocking=False):
+            return False
+
+        try:
+            executor = self._createExecutor()
+
+            # The arguments shared by all tasks are only serialised once
+            argsData = _serialise((rules, milieu, kwargs))
+            futureIndices: typing.Dict[concurrent.futures.Future, int] = {}
+            for index, purchaseWorld in enumerate(purchaseWorlds):
+                future = executor.submit(
+                    _calculateWorkerTradeOptions,
+                    argsData,
+                    _serialise(purchaseWorld))
+                futureIndices[future] = index
+
+            pending = set(futureIndices.keys())
+            try:
+                while pending:
+                    if isCancelledCallback and isCancelledCallback():
+                        return True
+
+                    completed, pending = concurrent.futures.wait(
+                        pending,
+                        timeout=TraderProcessPool._CancelCheckInterval,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in completed:
+                        tradeOptions, infoStrings = _deserialise(future.result())
+                        if traderInfoCallback:
+                            for infoString in infoStrings:
+                                traderInfoCallback(infoString)
+                        for tradeOption in tradeOptions:
+                            tradeOptionCallback(tradeOption)
+                        if progressCallback:
+                            progressCallback(futureIndices[future])
+            finally:
+                if pending:
+                    # Stop any tasks that are still running and wait for them
+                    # so the cancel event can be reset for the next scan
+                    self._cancelEvent.set()
+                    for future in pending:
+                        future.cancel()
+                    concurrent.futures.wait(pending)
+                    self._cancelEvent.clear()
+
+            return True
+        except concurrent.futures.process.BrokenProcessPool:
+            # A worker died (e.g. it ran out of memory). Drop the executor so
+            # a new one is created for the next scan
+            self._executor = None
+            self._cancelEvent = None
+            self._universeVersion = None
+            raise
+        finally:
+            self._scanLock.release()
+
+    # Workers hold their own copy of the universe so, if the universe has
+    # changed since they were started (e.g. a custom sector has been added),
+    # they're replaced with workers that load the current universe. This must
+    # be called with the scan lock held
+    def _createExecutor(self) -> concurrent.futures.ProcessPoolExecutor:
+        universeVersion = multiverse.WorldManager.instance().universeVersion()
+        if self._executor:
+            if universeVersion == self._universeVersion:
+                return self._executor
+            logging.info('Restarting trader process pool as the universe has changed')
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._cancelEvent = None
+
+        # Always spawn workers rather than forking as the main process has
+        # Qt threads running
+        context = multiprocessing.get_context('spawn')
+        self._cancelEvent = context.Event()
+        installDir, overlayDir, customDir, cacheDir = multiverse.DataStore.sectorDirs()
+        workerCount = self.workerCount()
+        logging.info(f'Starting trader process pool with {workerCount} workers')
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workerCount,
+            mp_context=context,
+            initializer=_initialiseWorker,
+            initargs=(installDir, overlayDir, customDir, cacheDir, self._cancelEvent))
+        self._universeVersion = universeVersion
+        return self._executor
@@ -1,5 +1,6 @@
 import enum
 import logic
+import numpy
 import re
 import traveller
 import multiverse
@@ -83,6 +84,74 @@ def _performComparisonOperation(
         return worldValue == compareValue
     raise TypeError('Invalid comparison operation')
 
+# Vectorised version of _performComparisonOperation. World values equal to
+# WorldTable.UnknownValue are treated the same as a world value of None.
+def _performComparisonMask(
+        operation: ComparisonFilterOperation,
+        worldValues: numpy.ndarray,
+        compareValue: typing.Optional[int]
+        ) -> numpy.ndarray:
+    known = worldValues != multiverse.WorldTable.UnknownValue
+    if compareValue == None:
+        if operation == ComparisonFilterOperation.Equal or \
+                operation == ComparisonFilterOperation.GreaterOrEqual or \
+                operation == ComparisonFilterOperation.LessOrEqual:
+            return ~known
+        elif operation == ComparisonFilterOperation.NotEqual:
+            return known
+        elif operation == ComparisonFilterOperation.Greater or \
+                operation == ComparisonFilterOperation.Less:
+            return numpy.zeros(len(worldValues), dtype=numpy.bool_)
+        raise TypeError('Invalid comparison operation')
+
+    if operation == ComparisonFilterOperation.Equal:
+        return known & (worldValues == compareValue)
+    elif operation == ComparisonFilterOperation.NotEqual:
+        return ~known | (worldValues != compareValue)
+    elif operation == ComparisonFilterOperation.Greater:
+        return known & (worldValues > compareValue)
+    elif operation == ComparisonFilterOperation.GreaterOrEqual:
+        return known & (worldValues >= compareValue)
+    elif operation == ComparisonFilterOperation.Less:
+        return known & (worldValues < compareValue)
+    elif operation == ComparisonFilterOperation.LessOrEqual:
+        return known & (worldValues <= compareValue)
+    raise TypeError('Invalid comparison operation')
+
+# Vectorised list operation for filters where the world values are held in
+# the world table as bitmasks. Contains only is a match if the set of values
+# the world has is exactly the set of values being checked for.
+def _performBitmaskListOperation(
+        operation: ListFilterOperation,
+        worldBitmasks: numpy.ndarray,
+        checkBitmask: int
+        ) -> numpy.ndarray:
+    checkBitmask = worldBitmasks.dtype.type(checkBitmask)
+    if operation == ListFilterOperation.ContainsAny:
+        return (worldBitmasks & checkBitmask) != 0
+    elif operation == ListFilterOperation.ContainsAll:
+        return (worldBitmasks & checkBitmask) == checkBitmask
+    elif operation == ListFilterOperation.ContainsOnly:
+        return worldBitmasks == checkBitmask
+    raise ValueError('Invalid list filter operation')
+
+# Combine the posting lists for the values a list filter is checking for to
+# get the candidate worlds for the filter. None is returned if all worlds are
+# candidates. For contains only the candidates are the worlds that have all
+# the values, they still need checking to see if they have any others.
+def _listCandidates(
+        operation: ListFilterOperation,
+        postingLists: typing.Sequence[numpy.ndarray]
+        ) -> typing.Optional[numpy.ndarray]:
+    if operation == ListFilterOperation.ContainsAny:
+        return multiverse.WorldTable.unionPostingLists(postingLists)
+    elif operation == ListFilterOperation.ContainsAll or \
+            operation == ListFilterOperation.ContainsOnly:
+        if not postingLists:
+            return None
+        return multiverse.WorldTable.intersectPostingLists(postingLists)
+    raise ValueError('Invalid list filter operation')
+
 class WorldFilter(object):
     def description(self) -> str:
         raise RuntimeError('The description method should be implemented by the derived class')
@@ -95,6 +164,30 @@ class WorldFilter(object):
             ) -> bool:
         raise RuntimeError('The match method should be implemented by the derived class')
 
+    # Returns a boolean array indicating which worlds in the table match the
+    # filter. The result must be the same as calling match for each world.
+    # Filters that can't be evaluated against the table return None and are
+    # checked by calling match for each world instead.
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return None
+
+    # Returns the sorted indices of the worlds in the table that could match
+    # the filter, worlds that aren't candidates are guaranteed not to match.
+    # Candidates still need to be checked with mask or match. Filters that
+    # can't use the table indexes to find candidates return None.
+    def candidates(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return None
+
 class NameFiler(WorldFilter):
     class Type(enum.Enum):
         WorldName = 0
@@ -242,6 +335,22 @@ class ZoneFiler(WorldFilter):
             worldValue=ZoneFiler._zoneToInt(world.zone()),
             compareValue=self._integer)
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        # The table holds the zone type value (or 0 for no zone) so a lookup
+        # table is used to map them to the same integers used by match
+        lookup = numpy.zeros(max(zone.value for zone in multiverse.ZoneType) + 1, dtype=numpy.int16)
+        for zone in multiverse.ZoneType:
+            lookup[zone.value] = ZoneFiler._zoneToInt(zone)
+        return _performComparisonMask(
+            operation=self._operation,
+            worldValues=lookup[table.zoneColumn()],
+            compareValue=self._integer)
+
     # Greater/less than comparisons don't really make logical sense for zones
     # but this function makes an attempt to map them to integers so it does
     # something vaguely sensible if the user chooses to do it. It's based on the
@@ -323,6 +432,17 @@ class UWPFilter(WorldFilter):
                 default=None),
             compareValue=self._integer)
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performComparisonMask(
+            operation=self._operation,
+            worldValues=table.uwpColumn(self._element),
+            compareValue=self._integer)
+
 class EconomicsFilter(WorldFilter):
     def __init__(
             self,
@@ -386,6 +506,17 @@ class EconomicsFilter(WorldFilter):
             worldValue=worldValue,
             compareValue=self._integer)
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performComparisonMask(
+            operation=self._operation,
+            worldValues=table.economicsColumn(self._element),
+            compareValue=self._integer)
+
 class CultureFilter(WorldFilter):
     def __init__(
             self,
@@ -439,6 +570,17 @@ class CultureFilter(WorldFilter):
                 default=None),
             compareValue=self._integer)
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performComparisonMask(
+            operation=self._operation,
+            worldValues=table.cultureColumn(self._element),
+            compareValue=self._integer)
+
 class RefuellingFilter(WorldFilter):
     class Type(enum.Enum):
         RefinedRefuelling = 0
@@ -544,6 +686,78 @@ class RefuellingFilter(WorldFilter):
 
         return self._operation != ListFilterOperation.ContainsAny
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        if self._operation == ListFilterOperation.ContainsAny:
+            result = numpy.zeros(table.worldCount(), dtype=numpy.bool_)
+        else:
+            result = numpy.ones(table.worldCount(), dtype=numpy.bool_)
+
+        checkList = RefuellingFilter.Type if self._operation == ListFilterOperation.ContainsOnly else self._value
+        for refuelling in checkList:
+            if refuelling == RefuellingFilter.Type.RefinedRefuelling:
+                match = RefuellingFilter._starPortMask(
+                    table=table,
+                    rules=rules,
+                    includeRefined=True,
+                    includeUnrefined=False)
+            elif refuelling == RefuellingFilter.Type.UnrefinedRefuelling:
+                match = RefuellingFilter._starPortMask(
+                    table=table,
+                    rules=rules,
+                    includeRefined=False,
+                    includeUnrefined=True)
+            elif refuelling == RefuellingFilter.Type.GasGiantRefuelling:
+                match = table.derivedColumn(
+                    key=traveller.worldHasGasGiantRefuelling,
+                    function=traveller.worldHasGasGiantRefuelling,
+                    dtype=numpy.bool_)
+            elif refuelling == RefuellingFilter.Type.WaterRefuelling:
+                match = table.derivedColumn(
+                    key=traveller.worldHasWaterRefuelling,
+                    function=traveller.worldHasWaterRefuelling,
+                    dtype=numpy.bool_)
+            elif refuelling == RefuellingFilter.Type.FuelCacheRefuelling:
+                match = table.fuelCacheColumn()
+            elif refuelling == RefuellingFilter.Type.AnomalyRefuelling:
+                match = table.anomalyColumn()
+            else:
+                raise ValueError('Invalid refuelling filter type')
+
+            if self._operation == ListFilterOperation.ContainsAny:
+                result |= match
+            elif self._operation == ListFilterOperation.ContainsAll:
+                result &= match
+            elif self._operation == ListFilterOperation.ContainsOnly:
+                allowed = refuelling in self._value
+                result &= match if allowed else ~match
+            else:
+                raise ValueError('Invalid refuelling filter operation')
+
+        return result
+
+    # Star port refuelling only depends on the star port code so it's
+    # calculated once for each code in the table
+    @staticmethod
+    def _starPortMask(
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            includeRefined: bool,
+            includeUnrefined: bool
+            ) -> numpy.ndarray:
+        lookup = numpy.array(
+            [traveller.starPortCodeHasRefuelling(
+                code=code,
+                rules=rules,
+                includeRefined=includeRefined,
+                includeUnrefined=includeUnrefined) for code in table.starPortCodes()],
+            dtype=numpy.bool_)
+        return lookup[table.starPortCodeColumn()]
+
 class AllegianceFilter(WorldFilter):
     def __init__(
             self,
@@ -577,7 +791,35 @@ class AllegianceFilter(WorldFilter):
         allegiance = world.allegiance()
         if not allegiance:
             return False
+        return self._matchAllegiance(allegiance=allegiance)
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        # The regex is only checked once for each allegiance in the table. An
+        # extra False entry is added to the end of the lookup table so worlds
+        # with no allegiance (index -1) don't match
+        lookup = [self._matchAllegiance(allegiance=allegiance) for allegiance in table.allegiances()]
+        lookup.append(False)
+        return numpy.array(lookup, dtype=numpy.bool_)[table.allegianceColumn()]
+
+    def candidates(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        uniqueCodes = set()
+        for allegiance in table.allegiances():
+            if self._matchAllegiance(allegiance=allegiance):
+                uniqueCodes.add(allegiance.uniqueCode())
+        return multiverse.WorldTable.unionPostingLists(
+            [table.allegianceWorlds(uniqueCode=uniqueCode) for uniqueCode in uniqueCodes])
+
+    def _matchAllegiance(self, allegiance: multiverse.Allegiance) -> bool:
         allegianceCode = allegiance.code()
         if self._operation == StringFilterOperation.ContainsString:
             if self._regex.search(allegianceCode):
@@ -709,6 +951,27 @@ class BaseFilter(WorldFilter):
 
         return self._operation != ListFilterOperation.ContainsAny
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performBitmaskListOperation(
+            operation=self._operation,
+            worldBitmasks=table.baseColumn(),
+            checkBitmask=multiverse.WorldTable.baseMask(self._value))
+
+    def candidates(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _listCandidates(
+            operation=self._operation,
+            postingLists=[table.baseWorlds(base=base) for base in self._value])
+
 class NobilityFilter(WorldFilter):
     def __init__(
             self,
@@ -773,6 +1036,27 @@ class NobilityFilter(WorldFilter):
 
         return self._operation != ListFilterOperation.ContainsAny
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performBitmaskListOperation(
+            operation=self._operation,
+            worldBitmasks=table.nobilityColumn(),
+            checkBitmask=multiverse.WorldTable.nobilityMask(self._value))
+
+    def candidates(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _listCandidates(
+            operation=self._operation,
+            postingLists=[table.nobilityWorlds(nobility=nobility) for nobility in self._value])
+
 class RemarksFilter(WorldFilter):
     def __init__(
             self,
@@ -815,6 +1099,25 @@ class RemarksFilter(WorldFilter):
                 raise ValueError('Invalid remarks filter operation')
         return False
 
+    def candidates(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        # If the filter is searching for a plain string that doesn't contain
+        # any separators then it can only match within an individual remark
+        # so only worlds with remarks that match are candidates. Anything
+        # else can match across remarks so all worlds are candidates.
+        if self._operation != StringFilterOperation.ContainsString or \
+                not self._value or \
+                re.escape(self._value) != self._value or \
+                ',' in self._value:
+            return None
+
+        return multiverse.WorldTable.unionPostingLists(
+            [table.remarkWorlds(remark=remark) for remark in table.remarks() if self._regex.search(remark)])
+
 class TradeCodeFilter(WorldFilter):
     def __init__(
             self,
@@ -878,6 +1181,27 @@ class TradeCodeFilter(WorldFilter):
 
         return self._operation != ListFilterOperation.ContainsAny
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performBitmaskListOperation(
+            operation=self._operation,
+            worldBitmasks=table.tradeCodeColumn(),
+            checkBitmask=multiverse.WorldTable.tradeCodeMask(self._value))
+
+    def candidates(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _listCandidates(
+            operation=self._operation,
+            postingLists=[table.tradeCodeWorlds(tradeCode=tradeCode) for tradeCode in self._value])
+
 class PBGFilter(WorldFilter):
     def __init__(
             self,
@@ -929,6 +1253,17 @@ class PBGFilter(WorldFilter):
                 default=None),
             compareValue=self._integer)
 
+    def mask(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging
+            ) -> typing.Optional[numpy.ndarray]:
+        return _performComparisonMask(
+            operation=self._operation,
+            worldValues=table.pbgColumn(self._element),
+            compareValue=self._integer)
+
 class WorldSearch(object):
     def __init__(self) -> None:
         super().__init__()
@@ -994,17 +1329,14 @@ class WorldSearch(object):
             tagging: logic.WorldTagging,
             maxResults: int = 1000
             ) -> typing.Iterable[multiverse.World]:
-        results = []
-        for sector in multiverse.WorldManager.instance().yieldSectors(milieu=milieu):
-            self._searchWorlds(
-                worlds=sector.yieldWorlds(),
-                rules=rules,
-                tagging=tagging,
-                inPlaceResults=results,
-                maxResults=maxResults)
-            if maxResults and len(results) >= maxResults:
-                break
-        return results
+        table = multiverse.WorldManager.instance().worldTable(milieu=milieu)
+        if not table:
+            return []
+        return self._searchTable(
+            table=table,
+            rules=rules,
+            tagging=tagging,
+            maxResults=maxResults)
 
     def searchRegion(
             self,
@@ -1045,11 +1377,114 @@ class WorldSearch(object):
             centerHex: multiverse.HexPosition,
             searchRadius: int
             ) -> typing.Iterable[multiverse.World]:
-        return multiverse.WorldManager.instance().worldsInRadius(
-            milieu=milieu,
-            center=centerHex,
-            searchRadius=searchRadius,
-            filterCallback=lambda world: self.checkWorld(world=world, rules=rules, tagging=tagging))
+        table = multiverse.WorldManager.instance().worldTable(milieu=milieu)
+        if not table:
+            return []
+
+        candidates = table.radiusWorlds(
+            center=centerHex.absolute(),
+            radius=searchRadius)
+        worlds = self._searchTable(
+            table=table.subset(indices=candidates),
+            rules=rules,
+            tagging=tagging,
+            maxResults=0)
+
+        # The table is in sector order, sort the results so they're in the
+        # same order as WorldManager.worldsInRadius would return them
+        return sorted(worlds, key=lambda world: world.hex().absolute())
+
+    # Search the worlds in the world table. When all filters must match, the
+    # table indexes are used to limit the search to the worlds that are
+    # candidates for all the filters. Filters that can be evaluated against
+    # the table are combined into a single mask, any that can't are then
+    # checked for each world the mask doesn't already decide. Results
+    # are in table order and are the same as if checkWorld was called for
+    # each world in the table.
+    def _searchTable(
+            self,
+            table: multiverse.WorldTable,
+            rules: traveller.Rules,
+            tagging: logic.WorldTagging,
+            maxResults: int
+            ) -> typing.Iterable[multiverse.World]:
+        if self._logic == FilterLogic.MatchesAll and self._filters:
+            # Only worlds that are candidates for all filters can match so the
+            # search is limited to them
+            candidates = None
+            for filter in self._filters:
+                filterCandidates = filter.candidates(table=table, rules=rules, tagging=tagging)
+                if filterCandidates is None:
+                    continue
+                if candidates is None:
+                    candidates = filterCandidates
+                else:
+                    candidates = multiverse.WorldTable.intersectPostingLists(
+                        [candidates, filterCandidates])
+                if not len(candidates):
+                    return []
+            if candidates is not None:
+                table = table.subset(indices=candidates)
+
+        worldCount = table.worldCount()
+        if not self._filters:
+            # No filter always matches the world
+            return [table.world(index) for index in multiverse.WorldTable.maskIndices(
+                mask=numpy.ones(worldCount, dtype=numpy.bool_),
+                maxResults=maxResults)]
+
+        masks: typing.List[numpy.ndarray] = []
+        slowFilters: typing.List[WorldFilter] = []
+        for filter in self._filters:
+            mask = filter.mask(table=table, rules=rules, tagging=tagging)
+            if mask is not None:
+                masks.append(mask)
+            else:
+                slowFilters.append(filter)
+
+        if self._logic == FilterLogic.MatchesAll:
+            if masks:
+                mask = numpy.logical_and.reduce(masks)
+            else:
+                mask = numpy.ones(worldCount, dtype=numpy.bool_)
+        elif self._logic == FilterLogic.MatchesAny or self._logic == FilterLogic.MatchesNone:
+            # For matches none, the mask is the worlds that match any filter
+            if masks:
+                mask = numpy.logical_or.reduce(masks)
+            else:
+                mask = numpy.zeros(worldCount, dtype=numpy.bool_)
+        else:
+            raise TypeError('Invalid logical operation')
+
+        if not slowFilters:
+            if self._logic == FilterLogic.MatchesNone:
+                mask = ~mask
+            return [table.world(index) for index in multiverse.WorldTable.maskIndices(
+                mask=mask,
+                maxResults=maxResults)]
+
+        results = []
+        if self._logic == FilterLogic.MatchesAll:
+            # Only worlds that match all the other filters need checking
+            for index in multiverse.WorldTable.maskIndices(mask=mask):
+                world = table.world(index)
+                if all(filter.match(world=world, rules=rules, tagging=tagging) for filter in slowFilters):
+                    results.append(world)
+                    if maxResults and len(results) >= maxResults:
+                        break
+        else:
+            # Only worlds that don't match any of the other filters need
+            # checking
+            matchesAny = self._logic == FilterLogic.MatchesAny
+            for index in range(worldCount):
+                world = table.world(index)
+                matched = bool(mask[index]) or \
+                    any(filter.match(world=world, rules=rules, tagging=tagging) for filter in slowFilters)
+                if matched == matchesAny:
+                    results.append(world)
+                    if maxResults and len(results) >= maxResults:
+                        break
+        return results
 
     def _searchWorlds(
             self,
@@ -27,5 +27,11 @@ from .route import *
 from .sectorsources import *
 from .sector import *
 from .main import *
+from .maintable import *
+from .jumpgraph import *
+from .landmarktable import *
+from .worldgrid import *
+from .worldtable import *
+from .nameindex import *
 from .universe import *
 from .worldmanager import *
@@ -1,6 +1,8 @@
 import typing
 
 class Allegiance(object):
+    __slots__ = ('_code', '_name', '_legacyCode', '_baseCode', '_uniqueCode')
+
     def __init__(
             self,
             code: str,
@@ -1,6 +1,8 @@
 import enum
 import math
+import numpy
 import typing
+import weakref
 
 SubsectorWidth = 8 # parsecs
 SubsectorHeight = 10 # parsecs
@@ -55,6 +57,85 @@ def absoluteSpaceToRelativeSpace(
     offsetY = absoluteY - (sectorY * SectorHeight) + 1
     return (sectorX, sectorY, offsetX, offsetY)
 
+# Reimplementation of code from Traveller Map source code.
+# HexDistance in Astrometrics.cs
+def absoluteHexDistance(
+        pos1: typing.Tuple[int, int],
+        pos2: typing.Tuple[int, int]
+        ) -> int:
+    x1, y1 = pos1
+    x2, y2 = pos2
+    dx = x2 - x1
+    dy = y2 - y1
+
+    adx = dx if dx >= 0 else -dx
+
+    ody = dy + (adx // 2)
+
+    if ((x1 & 0b1) == 0) and ((x2 & 0b1) != 0):
+        ody += 1
+
+    max = ody if ody > adx else adx
+    adx -= ody
+    return adx if adx > max else max
+
+# Vectorised versions of absoluteHexDistance for code that needs the distance
+# to a lot of hexes. Coordinates are NumPy arrays (or anything that can be
+# converted to one) and are broadcast against each other so, for example, the
+# distances from a column of hexes to a row of hexes can be calculated in one
+# call. The result is an array of int64 distances.
+def absoluteHexDistancesFrom(
+        origin: typing.Tuple[int, int],
+        xs: numpy.ndarray,
+        ys: numpy.ndarray
+        ) -> numpy.ndarray:
+    return _hexDistanceKernel(
+        x1=numpy.int64(origin[0]),
+        y1=numpy.int64(origin[1]),
+        x2=numpy.asarray(xs, dtype=numpy.int64),
+        y2=numpy.asarray(ys, dtype=numpy.int64))
+
+def absoluteHexDistancesBetween(
+        xs1: numpy.ndarray,
+        ys1: numpy.ndarray,
+        xs2: numpy.ndarray,
+        ys2: numpy.ndarray
+        ) -> numpy.ndarray:
+    return _hexDistanceKernel(
+        x1=numpy.asarray(xs1, dtype=numpy.int64),
+        y1=numpy.asarray(ys1, dtype=numpy.int64),
+        x2=numpy.asarray(xs2, dtype=numpy.int64),
+        y2=numpy.asarray(ys2, dtype=numpy.int64))
+
+# Returns a mask of the hexes that are within the radius of the center hex.
+# If includeInterior is False, only hexes on the ring at exactly the radius
+# are included (the same hexes yieldAbsoluteRadiusHexes yields). As with the
+# distance functions, the coordinates are broadcast so a mask for a block of
+# hexes can be created by passing a row of x coordinates and a column of y
+# coordinates.
+def absoluteRadiusMask(
+        center: typing.Tuple[int, int],
+        radius: int,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        includeInterior: bool = True
+        ) -> numpy.ndarray:
+    distances = absoluteHexDistancesFrom(origin=center, xs=xs, ys=ys)
+    if includeInterior:
+        return distances <= radius
+    return distances == radius
+
+def _hexDistanceKernel(
+        x1: numpy.ndarray,
+        y1: numpy.ndarray,
+        x2: numpy.ndarray,
+        y2: numpy.ndarray
+        ) -> numpy.ndarray:
+    adx = numpy.abs(x2 - x1)
+    ody = (y2 - y1) + (adx // 2)
+    ody += ((x1 & 0b1) == 0) & ((x2 & 0b1) != 0)
+    return numpy.maximum(numpy.maximum(ody, adx), adx - ody)
+
 def absoluteSpaceToSectorPos(
         pos: typing.Tuple[int, int]
         ) -> typing.Tuple[int, int]:
@@ -62,6 +143,26 @@ def absoluteSpaceToSectorPos(
     absoluteY = pos[1] + (ReferenceHexY - 1)
     return (absoluteX // SectorWidth, absoluteY // SectorHeight)
 
+# Hex ids pack an absolute position into a single int so they can be used
+# as cheap set/dict keys in code that processes large numbers of hexes. The
+# offset makes both halves positive so ids sort in the same order as hex
+# positions (by y then x).
+_HexIdBits = 32
+_HexIdOffset = 1 << (_HexIdBits - 1)
+_HexIdMask = (1 << _HexIdBits) - 1
+
+def absoluteSpaceToHexId(
+        pos: typing.Tuple[int, int]
+        ) -> int:
+    return ((pos[1] + _HexIdOffset) << _HexIdBits) | (pos[0] + _HexIdOffset)
+
+def hexIdToAbsoluteSpace(
+        hexId: int
+        ) -> typing.Tuple[int, int]:
+    return (
+        (hexId & _HexIdMask) - _HexIdOffset,
+        (hexId >> _HexIdBits) - _HexIdOffset)
+
 # These are orientated visually as seen in Traveller Map
 class HexEdge(enum.Enum):
     Upper = 0
@@ -434,6 +535,16 @@ class SubsectorIndex(object):
 # NOTE: There is a LOT of code that assumes instances of this
 # class are immutable
 class HexPosition(object):
+    __slots__ = (
+        '_absolute', '_relative', '_sectorIndex', '_subsectorIndex',
+        '_worldCenter', '_isotropicSpace', '_hash', '__weakref__')
+
+    # Flyweight instances returned by intern, keyed by hex id. Values are
+    # weakly referenced so instances are only shared while something is
+    # still using them.
+    _internTable: 'weakref.WeakValueDictionary[int, HexPosition]' = \
+        weakref.WeakValueDictionary()
+
     @typing.overload
     def __init__(self, absoluteX: int, absoluteY: int) -> None: ...
     @typing.overload
@@ -472,7 +583,26 @@ class HexPosition(object):
         self._isotropicSpace: typing.Optional[typing.Tuple[float, float]] = None
         self._hash = None
 
+    # Returns a shared instance for the absolute position. This should be
+    # used by code that creates a lot of short lived hex positions as it
+    # avoids creating a new instance (and recalculating its lazily
+    # calculated values) when an instance for the same hex is still in use.
+    @staticmethod
+    def intern(absoluteX: int, absoluteY: int) -> 'HexPosition':
+        hexId = absoluteSpaceToHexId(pos=(absoluteX, absoluteY))
+        hex = HexPosition._internTable.get(hexId)
+        if hex is None:
+            hex = HexPosition._internTable.setdefault(
+                hexId,
+                HexPosition(absoluteX=absoluteX, absoluteY=absoluteY))
+        return hex
+
+    def __reduce__(self):
+        return (HexPosition, self.absolute())
+
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, HexPosition):
             # Only need to compare absolute position
             return self.absolute() == other.absolute()
@@ -513,6 +643,9 @@ class HexPosition(object):
             self._calculateAbsolute()
         return self._absolute
 
+    def hexId(self) -> int:
+        return absoluteSpaceToHexId(pos=self.absolute())
+
     def sector(self) -> typing.Tuple[int, int]:
         if not self._relative:
             self._calculateRelative()
@@ -578,46 +711,23 @@ class HexPosition(object):
                 worldCenter[1] * ParsecScaleY)
         return self._isotropicSpace
 
-    # Reimplementation of code from Traveller Map source code.
-    # HexDistance in Astrometrics.cs
     def parsecsTo(
             self,
             other: 'HexPosition'
             ) -> int:
-        x1, y1 = self.absolute()
-        x2, y2 = other.absolute()
-        dx = x2 - x1
-        dy = y2 - y1
-
-        adx = dx if dx >= 0 else -dx
-
-        ody = dy + (adx // 2)
-
-        if ((x1 & 0b1) == 0) and ((x2 & 0b1) != 0):
-            ody += 1
-
-        max = ody if ody > adx else adx
-        adx -= ody
-        return adx if adx > max else max
+        return absoluteHexDistance(self.absolute(), other.absolute())
 
     def neighbourHex(
             self,
             edge: HexEdge
             ) -> 'HexPosition':
-        if self._absolute:
-            absoluteX, absoluteY = neighbourAbsoluteHex(
-                origin=self._absolute,
-                edge=edge)
-            return HexPosition(absoluteX=absoluteX, absoluteY=absoluteY)
-        else:
-            sectorX, sectorY, offsetX, offsetY = neighbourRelativeHex(
-                origin=self._relative,
-                edge=edge)
-            return HexPosition(
-                sectorX=sectorX,
-                sectorY=sectorY,
-                offsetX=offsetX,
-                offsetY=offsetY)
+        if not self._absolute:
+            self._calculateAbsolute()
+
+        absoluteX, absoluteY = neighbourAbsoluteHex(
+            origin=self._absolute,
+            edge=edge)
+        return HexPosition.intern(absoluteX=absoluteX, absoluteY=absoluteY)
 
     def yieldRadiusHexes(
             self,
@@ -632,7 +742,7 @@ class HexPosition(object):
             radius=radius,
             includeInterior=includeInterior)
         for absoluteX, absoluteY in generator:
-            yield HexPosition(absoluteX=absoluteX, absoluteY=absoluteY)
+            yield HexPosition.intern(absoluteX=absoluteX, absoluteY=absoluteY)
 
     # Return the absolute center point of the hex
     def worldCenter(self) -> typing.Tuple[float, float]:
@@ -1,3 +1,4 @@
+import common
 import enum
 import logging
 import typing
@@ -123,6 +124,11 @@ _MilitaryBaseTypes = [
 ]
 
 class Bases(object):
+    __slots__ = ('_string', '_bases')
+
+    # Immutable so worlds with the same bases string share an instance
+    _internTable: common.InternTable[str, 'Bases'] = common.InternTable()
+
     def __init__(
             self,
             string: str
@@ -133,6 +139,13 @@ class Bases(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'Bases':
+        return Bases._internTable.get(string, lambda: Bases(string))
+
+    def __reduce__(self):
+        return (Bases.intern, (self._string,))
+
     def isEmpty(self) -> bool:
         return not self._string
 
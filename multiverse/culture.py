@@ -1,3 +1,4 @@
+import common
 import enum
 import multiverse
 import typing
@@ -101,6 +102,11 @@ class Culture(object):
         _SymbolsDescriptionMap
     ]
 
+    __slots__ = ('_string', '_sanitised')
+
+    # Immutable so worlds with the same culture string share an instance
+    _internTable: common.InternTable[str, 'Culture'] = common.InternTable()
+
     def __init__(
             self,
             string: str
@@ -111,6 +117,13 @@ class Culture(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'Culture':
+        return Culture._internTable.get(string, lambda: Culture(string))
+
+    def __reduce__(self):
+        return (Culture.intern, (self._string,))
+
     def sanitised(self) -> str:
         return self._sanitised
 
@@ -1,7 +1,7 @@
 import common
+import concurrent.futures
 import datetime
 import enum
-import io
 import json
 import logging
 import multiverse
@@ -419,12 +419,22 @@ class DataStore(object):
     _DataFormatUrl = 'https://raw.githubusercontent.com/cthulhustig/autojimmy-data/main/map/dataformat.txt'
     _SnapshotCheckTimeout = 3 # Seconds
     _SnapshotDownloadTimeout = 60 # Seconds
-    _SnapshotChunkSize = 10 * 1024 * 1024 # Bytes
+    _SnapshotChunkSize = 1024 * 1024 # Bytes
+    _SnapshotDownloadAttempts = 3
+    # The snapshot archive is downloaded to a file next to the overlay
+    # directory. If a download is interrupted the partial file is kept,
+    # along with the ETag (or last modified time) of the archive, so the
+    # download can be resumed with a HTTP range request
+    _SnapshotArchiveSuffix = '_snapshot.zip'
+    _SnapshotArchiveTagSuffix = '.tag'
+    _SnapshotExtractChunkSize = 64 * 1024 # Bytes
+    _SnapshotExtractWorkerCount = 8
     # NOTE: Pattern for matching data version treats the second digit as optional, if not specified it's
     # assumed to be 0. It also allows white space at the end to stop an easy typo in the snapshot breaking
     # all instances of the app everywhere
     _DataVersionPattern = re.compile(r'^(\d+)(?:\.(\d+))?\s*$')
     _MinDataFormatVersion = UniverseDataFormat(4, 1)
+    _ContentRangePattern = re.compile(r'^bytes\s+(\d+)-\d+/(?:\d+|\*)$')
 
     _SectorFormatExtensions = {
         # NOTE: The sec format is short for second survey, not the legacy sec format
@@ -439,6 +449,7 @@ class DataStore(object):
     _installDir = None
     _overlayDir = None
     _customDir = None
+    _cacheDir = None
     _universeMap = None
 
     def __init__(self) -> None:
@@ -462,13 +473,29 @@ class DataStore(object):
     def setSectorDirs(
             installDir: str,
             overlayDir: str,
-            customDir: str
+            customDir: str,
+            cacheDir: typing.Optional[str] = None # None disables caching of data derived from the universe
             ) -> None:
         if DataStore._instance:
             raise RuntimeError('You can\'t set the data store directories after the singleton has been initialised')
         DataStore._installDir = installDir
         DataStore._overlayDir = overlayDir
         DataStore._customDir = customDir
+        DataStore._cacheDir = cacheDir
+
+    # Returns the install, overlay, custom & cache directories. This allows
+    # other processes to be configured to use the same data.
+    @staticmethod
+    def sectorDirs() -> typing.Tuple[
+            typing.Optional[str], # Install dir
+            typing.Optional[str], # Overlay dir
+            typing.Optional[str], # Custom dir
+            typing.Optional[str]]: # Cache dir
+        return (
+            DataStore._installDir,
+            DataStore._overlayDir,
+            DataStore._customDir,
+            DataStore._cacheDir)
 
     def sectorCount(
             self,
@@ -603,6 +630,56 @@ class DataStore(object):
             logging.error(f'Failed to read custom sectors timestamp', exc_info=ex)
             return None
 
+    # Read a file that was previously written to the cache with writeCacheFile.
+    # None is returned if the file doesn't exist or it's no longer valid. A
+    # cache file is only valid if it was written with the same format version
+    # and the universe and custom sector timestamps haven't changed since it
+    # was written.
+    def readCacheFile(
+            self,
+            fileName: str,
+            formatVersion: int
+            ) -> typing.Optional[bytes]:
+        if not self._cacheDir:
+            return None
+
+        filePath = os.path.join(self._cacheDir, fileName)
+        try:
+            if not os.path.exists(filePath):
+                return None
+            data = DataStore._readFile(path=filePath)
+        except Exception as ex:
+            logging.warning(f'Failed to read cache file "{filePath}"', exc_info=ex)
+            return None
+
+        header = self._cacheHeader(formatVersion=formatVersion)
+        if not data.startswith(header):
+            logging.debug(f'Ignoring out of date cache file "{filePath}"')
+            return None
+        return data[len(header):]
+
+    def writeCacheFile(
+            self,
+            fileName: str,
+            formatVersion: int,
+            data: bytes
+            ) -> None:
+        if not self._cacheDir:
+            return
+
+        filePath = os.path.join(self._cacheDir, fileName)
+        tempFilePath = filePath + '.tmp'
+        try:
+            os.makedirs(self._cacheDir, exist_ok=True)
+            with open(tempFilePath, 'wb') as file:
+                file.write(self._cacheHeader(formatVersion=formatVersion))
+                file.write(data)
+            # Replace the file in a single operation so a partially written
+            # file is never read if the app is closed while writing
+            os.replace(tempFilePath, filePath)
+        except Exception as ex:
+            logging.warning(f'Failed to write cache file "{filePath}"', exc_info=ex)
+
     # NOTE: This will block while it downloads the latest snapshot timestamp from the github repo
     def checkForNewSnapshot(self) -> SnapshotAvailability:
         currentTimestamp = self.universeTimestamp()
@@ -653,81 +730,57 @@ class DataStore(object):
             if progressCallback:
                 progressCallback(DataStore.UpdateStage.DownloadStage, 0, 0)
 
-            dataBuffer = io.BytesIO()
-            with requests.get(
-                    url=DataStore._DataArchiveUrl,
-                    timeout=DataStore._SnapshotDownloadTimeout,
-                    stream=True
-                    ) as response:
-                length = response.headers.get('content-length')
-                length = int(length) if length else 0
-                progress = 0
-                for chunk in response.iter_content(chunk_size=DataStore._SnapshotChunkSize):
-                    if isCancelledCallback and isCancelledCallback():
-                        return # Operation cancelled
-                    dataBuffer.write(chunk)
-                    progress += len(chunk)
-                    progressCallback(
-                        DataStore.UpdateStage.DownloadStage,
-                        progress,
-                        length)
+            archivePath = self._overlayDir + DataStore._SnapshotArchiveSuffix
+            if not DataStore._downloadSnapshotArchive(
+                    archivePath=archivePath,
+                    progressCallback=progressCallback,
+                    isCancelledCallback=isCancelledCallback):
+                return # Operation cancelled, the partial download is kept so it can be resumed
 
             logging.info('Extracting universe snapshot')
             if progressCallback:
                 progressCallback(DataStore.UpdateStage.ExtractStage, 0, 0)
 
-            workingDirPath = DataStore._makeWorkingDir(
-                baseDirPath=self._overlayDir)
-            zipData = zipfile.ZipFile(dataBuffer)
-            fileInfoList = zipData.infolist()
-
-            # Find the data format file to sanity check that the snapshot is compatible
-            dataFormatPath = DataStore._DataArchiveMapPath + DataStore._DataFormatFileName
-            dataFormatInfo = None
-            for fileInfo in fileInfoList:
-                if fileInfo.is_dir():
-                    continue # Skip directories
-                if fileInfo.filename == dataFormatPath:
-                    dataFormatInfo = fileInfo
-                    break
-
-            if not dataFormatInfo:
-                raise RuntimeError('Universe snapshot has no data format file')
+            # The archive is deleted once extraction has been attempted. If
+            # it's corrupt or incompatible there is nothing to resume and a
+            # range request for the remainder of a complete file would fail
             try:
-                dataFormat = self._parseUniverseDataFormat(
-                    data=zipData.read(dataFormatInfo.filename))
-            except Exception as ex:
-                raise RuntimeError(f'Unable to read universe snapshot data format file ({str(ex)})')
-            if not dataFormat or not self._isDataFormatCompatible(dataFormat):
-                raise RuntimeError(f'Universe snapshot is incompatible')
-
-            extractIndex = 0
-            for fileInfo in fileInfoList:
-                if isCancelledCallback and isCancelledCallback():
+                with zipfile.ZipFile(archivePath) as zipData:
+                    fileInfoList = zipData.infolist()
+
+                    # Find the data format file to sanity check that the snapshot is compatible
+                    dataFormatPath = DataStore._DataArchiveMapPath + DataStore._DataFormatFileName
+                    dataFormatInfo = None
+                    for fileInfo in fileInfoList:
+                        if fileInfo.is_dir():
+                            continue # Skip directories
+                        if fileInfo.filename == dataFormatPath:
+                            dataFormatInfo = fileInfo
+                            break
+
+                    if not dataFormatInfo:
+                        raise RuntimeError('Universe snapshot has no data format file')
+                    try:
+                        dataFormat = self._parseUniverseDataFormat(
+                            data=zipData.read(dataFormatInfo))
+                    except Exception as ex:
+                        raise RuntimeError(f'Unable to read universe snapshot data format file ({str(ex)})')
+                    if not dataFormat or not self._isDataFormatCompatible(dataFormat):
+                        raise RuntimeError(f'Universe snapshot is incompatible')
+
+                workingDirPath = DataStore._makeWorkingDir(
+                    baseDirPath=self._overlayDir)
+                if not DataStore._extractSnapshotArchive(
+                        archivePath=archivePath,
+                        fileInfoList=fileInfoList,
+                        workingDirPath=workingDirPath,
+                        progressCallback=progressCallback,
+                        isCancelledCallback=isCancelledCallback):
                     return # Operation cancelled
-
-                extractIndex += 1
-                if progressCallback:
-                    progressCallback(
-                        DataStore.UpdateStage.ExtractStage,
-                        extractIndex,
-                        len(fileInfoList))
-
-                if fileInfo.is_dir():
-                    continue # Skip directories
-                if not fileInfo.filename.startswith(DataStore._DataArchiveMapPath):
-                    continue # Skip files not in the map directory
-
-                subPath = fileInfo.filename[len(DataStore._DataArchiveMapPath):]
-                targetPath = os.path.join(workingDirPath, subPath)
-
-                logging.info(f'Extracting {subPath}')
-                directoryHierarchy = os.path.dirname(targetPath)
-                if not os.path.exists(directoryHierarchy):
-                    os.makedirs(directoryHierarchy, exist_ok=True)
-                DataStore._writeFile(
-                    path=targetPath,
-                    data=zipData.read(fileInfo.filename))
+            except zipfile.BadZipFile as ex:
+                raise RuntimeError(f'Universe snapshot is corrupt ({str(ex)})')
+            finally:
+                DataStore._deleteSnapshotArchive(archivePath=archivePath)
 
             logging.info('Replacing old universe snapshot')
             DataStore._replaceDir(
@@ -1060,6 +1113,18 @@ class DataStore(object):
                 f'Failed to delete overlay directory "{self._overlayDir}"',
                 exc_info=ex)
 
+    def _cacheHeader(
+            self,
+            formatVersion: int
+            ) -> bytes:
+        universeTimestamp = self.universeTimestamp()
+        customTimestamp = self.customSectorsTimestamp()
+        header = '{version}|{universe}|{custom}\n'.format(
+            version=formatVersion,
+            universe=DataStore._formatTimestamp(universeTimestamp).decode() if universeTimestamp else '',
+            custom=DataStore._formatTimestamp(customTimestamp).decode() if customTimestamp else '')
+        return header.encode()
+
     def _readStockFile(
             self,
             relativeFilePath: str
@@ -1321,3 +1386,186 @@ class DataStore(object):
             if oldDirPath:
                 os.rename(oldDirPath, currentDirPath)
             raise
+
+    # Download the snapshot archive to the specified file. If a partial
+    # download from a previous attempt exists, and the server still has the
+    # same archive, only the remainder is downloaded. Returns False if the
+    # download was cancelled.
+    @staticmethod
+    def _downloadSnapshotArchive(
+            archivePath: str,
+            progressCallback: typing.Optional[typing.Callable[[UpdateStage, int, int], typing.Any]],
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]]
+            ) -> bool:
+        tagPath = archivePath + DataStore._SnapshotArchiveTagSuffix
+        failedAttempts = 0
+        while True:
+            resumeOffset = 0
+            headers = {
+                # Range requests refer to the encoded content so ask for the
+                # archive as is
+                'Accept-Encoding': 'identity'}
+            if os.path.isfile(archivePath) and os.path.isfile(tagPath):
+                resumeOffset = os.path.getsize(archivePath)
+            if resumeOffset:
+                headers['Range'] = f'bytes={resumeOffset}-'
+                # If the archive has changed since the partial download was
+                # started the server will return the complete new archive
+                headers['If-Range'] = DataStore._bytesToString(
+                    DataStore._readFile(path=tagPath))
+
+            try:
+                with requests.get(
+                        url=DataStore._DataArchiveUrl,
+                        headers=headers,
+                        timeout=DataStore._SnapshotDownloadTimeout,
+                        stream=True
+                        ) as response:
+                    if resumeOffset and \
+                            response.status_code == requests.codes.range_not_satisfiable:
+                        # The partial download is no longer valid for the
+                        # archive on the server so start again
+                        logging.info('Restarting universe snapshot download')
+                        DataStore._deleteSnapshotArchive(archivePath=archivePath)
+                        continue
+                    response.raise_for_status()
+
+                    length = response.headers.get('content-length')
+                    length = int(length) if length else 0
+                    if resumeOffset:
+                        if response.status_code != requests.codes.partial_content or \
+                                DataStore._contentRangeStart(response=response) != resumeOffset:
+                            # The server sent the complete archive
+                            resumeOffset = 0
+                        else:
+                            logging.info(f'Resuming universe snapshot download at {resumeOffset} bytes')
+
+                    if not resumeOffset:
+                        # Record the tag for the archive before any of it is
+                        # written so the download can be resumed if it's
+                        # interrupted. If the server doesn't provide a strong
+                        # tag the download can't be resumed safely
+                        tag = response.headers.get('etag')
+                        if not tag or tag.startswith('W/'):
+                            tag = response.headers.get('last-modified')
+                        if tag:
+                            DataStore._writeFile(path=tagPath, data=tag)
+                        elif os.path.exists(tagPath):
+                            os.remove(tagPath)
+
+                    progress = resumeOffset
+                    total = (resumeOffset + length) if length else 0
+                    with open(archivePath, 'ab' if resumeOffset else 'wb') as file:
+                        for chunk in response.iter_content(chunk_size=DataStore._SnapshotChunkSize):
+                            if isCancelledCallback and isCancelledCallback():
+                                return False # Operation cancelled
+                            file.write(chunk)
+                            progress += len(chunk)
+                            if progressCallback:
+                                progressCallback(
+                                    DataStore.UpdateStage.DownloadStage,
+                                    progress,
+                                    total)
+                return True
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout) as ex:
+                failedAttempts += 1
+                if failedAttempts >= DataStore._SnapshotDownloadAttempts:
+                    raise RuntimeError(f'Failed to download universe snapshot ({str(ex)})')
+                logging.warning(
+                    f'Universe snapshot download interrupted, retrying ({str(ex)})')
+
+    # Extract the files in the map directory of the snapshot archive to the
+    # working directory. Files are copied in chunks so memory usage doesn't
+    # depend on the size of the archive. The sector files are small and
+    # numerous so they're extracted by a pool of threads, each with its own
+    # handle to the archive. Returns False if the extraction was cancelled.
+    @staticmethod
+    def _extractSnapshotArchive(
+            archivePath: str,
+            fileInfoList: typing.Iterable[zipfile.ZipInfo],
+            workingDirPath: str,
+            progressCallback: typing.Optional[typing.Callable[[UpdateStage, int, int], typing.Any]],
+            isCancelledCallback: typing.Optional[typing.Callable[[], bool]]
+            ) -> bool:
+        extractList: typing.List[typing.Tuple[zipfile.ZipInfo, str]] = []
+        for fileInfo in fileInfoList:
+            if fileInfo.is_dir():
+                continue # Skip directories
+            if not fileInfo.filename.startswith(DataStore._DataArchiveMapPath):
+                continue # Skip files not in the map directory
+
+            subPath = fileInfo.filename[len(DataStore._DataArchiveMapPath):]
+            extractList.append((fileInfo, os.path.join(workingDirPath, subPath)))
+
+        # Create the directory hierarchy up front rather than having the
+        # worker threads race to create it
+        for directoryHierarchy in {os.path.dirname(targetPath) for _, targetPath in extractList}:
+            os.makedirs(directoryHierarchy, exist_ok=True)
+
+        threadData = threading.local()
+        zipFiles: typing.List[zipfile.ZipFile] = []
+
+        def extractFile(fileInfo: zipfile.ZipInfo, targetPath: str) -> None:
+            zipData = getattr(threadData, 'zipData', None)
+            if not zipData:
+                zipData = zipfile.ZipFile(archivePath)
+                zipFiles.append(zipData)
+                threadData.zipData = zipData
+
+            logging.info(f'Extracting {fileInfo.filename[len(DataStore._DataArchiveMapPath):]}')
+            with zipData.open(fileInfo) as sourceFile:
+                with open(targetPath, 'wb') as targetFile:
+                    shutil.copyfileobj(
+                        sourceFile,
+                        targetFile,
+                        DataStore._SnapshotExtractChunkSize)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=DataStore._SnapshotExtractWorkerCount
+                    ) as executor:
+                futures = [
+                    executor.submit(extractFile, fileInfo, targetPath)
+                    for fileInfo, targetPath in extractList]
+                try:
+                    extractIndex = 0
+                    for future in concurrent.futures.as_completed(futures):
+                        if isCancelledCallback and isCancelledCallback():
+                            return False # Operation cancelled
+                        future.result() # Raise any exception extracting the file
+
+                        extractIndex += 1
+                        if progressCallback:
+                            progressCallback(
+                                DataStore.UpdateStage.ExtractStage,
+                                extractIndex,
+                                len(extractList))
+                finally:
+                    # Prevent any files that haven't been started being
+                    # extracted if the operation is cancelled or failed
+                    for future in futures:
+                        future.cancel()
+        finally:
+            for zipData in zipFiles:
+                zipData.close()
+
+        return True
+
+    @staticmethod
+    def _deleteSnapshotArchive(archivePath: str) -> None:
+        for path in [archivePath, archivePath + DataStore._SnapshotArchiveTagSuffix]:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception as ex:
+                logging.warning(f'Failed to delete universe snapshot file "{path}"', exc_info=ex)
+
+    @staticmethod
+    def _contentRangeStart(response: requests.Response) -> typing.Optional[int]:
+        result = DataStore._ContentRangePattern.match(
+            response.headers.get('content-range', ''))
+        if not result:
+            return None
+        return int(result.group(1))
@@ -1,3 +1,4 @@
+import common
 import enum
 import multiverse
 import typing
@@ -99,6 +100,11 @@ class Economics(object):
         _EfficiencyDescriptionMap
     ]
 
+    __slots__ = ('_string', '_sanitised')
+
+    # Immutable so worlds with the same economics string share an instance
+    _internTable: common.InternTable[str, 'Economics'] = common.InternTable()
+
     def __init__(
             self,
             string: str
@@ -109,6 +115,13 @@ class Economics(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'Economics':
+        return Economics._internTable.get(string, lambda: Economics(string))
+
+    def __reduce__(self):
+        return (Economics.intern, (self._string,))
+
     def sanitised(self) -> str:
         return self._sanitised
 
@@ -0,0 +1,119 @@
+import array
+import multiverse
+import typing
+
+# The jump graph is an adjacency index for the worlds in a milieu. For each
+# world it holds the worlds within the graph radius and the parsec distance to
+# them. The neighbours for a world are only calculated the first time they're
+# requested, after that they're held as compact arrays of world indices and
+# distances. This avoids walking every hex in the radius and probing the world
+# position map each time the neighbours of a world are needed (e.g. for each
+# node the route planner processes).
+# The order neighbours are returned in matches the order they would be
+# returned by Universe.yieldWorldsInRadius. This is important as the route
+# planner can give different (but equal cost) routes if the order changes.
+# This object is thread safe. Two threads may calculate the neighbours for the
+# same world at the same time but they will generate the same results and
+# assigning them to the list is atomic.
+class JumpGraph(object):
+    def __init__(
+            self,
+            worlds: typing.Iterable[multiverse.World],
+            radius: int
+            ) -> None:
+        if radius < 0:
+            raise ValueError('Jump graph radius can\'t be negative')
+
+        self._radius = radius
+        # Worlds are sorted by position so the index of a world is the same
+        # each time a graph is created for the same set of worlds. This
+        # allows data indexed by world index to be cached to disk
+        self._worlds = sorted(worlds, key=lambda world: world.hex().absolute())
+        self._positionMap: typing.Dict[typing.Tuple[int, int], int] = {}
+        for index, world in enumerate(self._worlds):
+            self._positionMap[world.hex().absolute()] = index
+        self._neighbours: typing.List[typing.Optional[typing.Tuple[
+            array.array, # Indices of neighbour worlds
+            array.array # Parsecs to neighbour worlds
+            ]]] = [None] * len(self._worlds)
+
+    def radius(self) -> int:
+        return self._radius
+
+    def worldCount(self) -> int:
+        return len(self._worlds)
+
+    def worldIndex(
+            self,
+            hex: multiverse.HexPosition
+            ) -> typing.Optional[int]:
+        return self._positionMap.get(hex.absolute())
+
+    def worldByIndex(
+            self,
+            index: int
+            ) -> multiverse.World:
+        return self._worlds[index]
+
+    # Returns the indices of the worlds within the graph radius of the world
+    # with the specified index along with the distance to them. The world
+    # itself is included at a distance of 0.
+    def neighbourIndices(
+            self,
+            index: int
+            ) -> typing.Tuple[array.array, array.array]:
+        neighbours = self._neighbours[index]
+        if neighbours is None:
+            neighbours = self._calculateNeighbours(index=index)
+            self._neighbours[index] = neighbours
+        return neighbours
+
+    # Yield the worlds within the specified radius of the center hex along
+    # with the parsecs to them. The center world is included if there is one.
+    # The center doesn't need to be a world, if it's not then the worlds in
+    # the radius are found by probing the hexes in the radius.
+    def yieldWorldsInRadius(
+            self,
+            center: multiverse.HexPosition,
+            radius: typing.Optional[int] = None # None means use graph radius
+            ) -> typing.Generator[typing.Tuple[multiverse.World, int], None, None]:
+        if radius is None:
+            radius = self._radius
+        elif radius > self._radius:
+            raise ValueError(f'Radius {radius} is larger than jump graph radius {self._radius}')
+
+        centerPos = center.absolute()
+        index = self._positionMap.get(centerPos)
+        if index is None:
+            for position in multiverse.yieldAbsoluteRadiusHexes(center=centerPos, radius=radius):
+                worldIndex = self._positionMap.get(position)
+                if worldIndex is not None:
+                    yield (
+                        self._worlds[worldIndex],
+                        multiverse.absoluteHexDistance(centerPos, position))
+            return
+
+        worlds = self._worlds
+        neighbourIndices, neighbourParsecs = self.neighbourIndices(index=index)
+        if radius == self._radius:
+            for worldIndex, parsecs in zip(neighbourIndices, neighbourParsecs):
+                yield (worlds[worldIndex], parsecs)
+        else:
+            for worldIndex, parsecs in zip(neighbourIndices, neighbourParsecs):
+                if parsecs <= radius:
+                    yield (worlds[worldIndex], parsecs)
+
+    def _calculateNeighbours(
+            self,
+            index: int
+            ) -> typing.Tuple[array.array, array.array]:
+        positionMap = self._positionMap
+        centerPos = self._worlds[index].hex().absolute()
+        neighbourIndices = array.array('i')
+        neighbourParsecs = array.array('B')
+        for position in multiverse.yieldAbsoluteRadiusHexes(center=centerPos, radius=self._radius):
+            worldIndex = positionMap.get(position)
+            if worldIndex is not None:
+                neighbourIndices.append(worldIndex)
+                neighbourParsecs.append(multiverse.absoluteHexDistance(centerPos, position))
+        return (neighbourIndices, neighbourParsecs)
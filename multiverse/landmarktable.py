@@ -0,0 +1,335 @@
+import array
+import math
+import multiverse
+import struct
+import sys
+import typing
+import zlib
+
+# The landmark table holds precomputed distances from a small number of
+# landmark worlds to every other world in the jump graph for a milieu. The
+# triangle inequality means, for any two worlds A & B and a landmark L, the
+# shortest route from A to B can't be shorter than |dist(L, A) - dist(L, B)|.
+# Taking the max of this over all landmarks gives a lower bound for the
+# length of a route between two worlds that is generally far tighter than the
+# straight line hex distance, especially for routes that need to go around
+# rifts (this technique is known as ALT, A* with Landmarks & Triangle
+# inequality).
+# The table holds the bound for both the number of jumps and the number of
+# parsecs as the two can be different routes. It also holds the connected
+# component each world is part of. If two worlds are in different components
+# then there is no way to jump between them with the jump rating the table
+# was generated for.
+# Landmarks are chosen separately for each component. As components don't
+# overlap, landmarks from different components share the same distance
+# arrays. A distance of _NoLandmark means the component the world is part of
+# has no more landmarks.
+class LandmarkTable(object):
+    # Increment this when the layout of the serialised table changes
+    FormatVersion = 1
+
+    _NoLandmark = 0xFFFF
+    _MaxDistance = _NoLandmark - 1
+    _DefaultLandmarkCount = 8
+    # Components with fewer worlds than this don't get landmarks. Searches
+    # in them are small enough that the hex distance bound is good enough
+    _MinComponentSize = 50
+    _HeaderFormat = '<IIII' # Radius, world count, landmark count, position checksum
+
+    def __init__(
+            self,
+            graph: multiverse.JumpGraph,
+            componentIds: array.array,
+            jumpDistances: typing.Sequence[array.array],
+            parsecDistances: typing.Sequence[array.array]
+            ) -> None:
+        self._graph = graph
+        self._componentIds = componentIds
+        self._jumpDistances = list(jumpDistances)
+        self._parsecDistances = list(parsecDistances)
+
+    def radius(self) -> int:
+        return self._graph.radius()
+
+    def landmarkCount(self) -> int:
+        return len(self._jumpDistances)
+
+    # Returns False if it's known that there is no possible route between the
+    # two hexes with the jump rating the table was created for. If either of
+    # the hexes aren't worlds then nothing is known so it returns True.
+    def isReachable(
+            self,
+            hex1: multiverse.HexPosition,
+            hex2: multiverse.HexPosition
+            ) -> bool:
+        index1 = self._graph.worldIndex(hex1)
+        index2 = self._graph.worldIndex(hex2)
+        if index1 is None or index2 is None:
+            return True
+        return self._componentIds[index1] == self._componentIds[index2]
+
+    # Returns the min number of jumps and min parsecs for a route between the
+    # two hexes. Nothing useful is known about hexes in different components
+    # (as there is no route between them) so the hex distance bound is
+    # returned. The same is true for hexes that don't contain a world.
+    def lowerBounds(
+            self,
+            hex1: multiverse.HexPosition,
+            hex2: multiverse.HexPosition
+            ) -> typing.Tuple[
+                int, # Min jumps
+                int]: # Min parsecs
+        parsecs = hex1.parsecsTo(hex2)
+        jumps = math.ceil(parsecs / self._graph.radius()) if self._graph.radius() else 0
+
+        index1 = self._graph.worldIndex(hex1)
+        index2 = self._graph.worldIndex(hex2)
+        if index1 is None or index2 is None or \
+                self._componentIds[index1] != self._componentIds[index2]:
+            return (jumps, parsecs)
+
+        for jumpDistances, parsecDistances in zip(self._jumpDistances, self._parsecDistances):
+            distance1 = jumpDistances[index1]
+            if distance1 == LandmarkTable._NoLandmark:
+                break # No more landmarks for this component
+            bound = abs(distance1 - jumpDistances[index2])
+            if bound > jumps:
+                jumps = bound
+
+            bound = abs(parsecDistances[index1] - parsecDistances[index2])
+            if bound > parsecs:
+                parsecs = bound
+
+        return (jumps, parsecs)
+
+    def toBytes(self) -> bytes:
+        data = bytearray(struct.pack(
+            LandmarkTable._HeaderFormat,
+            self._graph.radius(),
+            self._graph.worldCount(),
+            len(self._jumpDistances),
+            LandmarkTable._positionChecksum(graph=self._graph)))
+        data += LandmarkTable._arrayToBytes(self._componentIds)
+        for distances in self._jumpDistances:
+            data += LandmarkTable._arrayToBytes(distances)
+        for distances in self._parsecDistances:
+            data += LandmarkTable._arrayToBytes(distances)
+        return bytes(data)
+
+    # Recreate a table from data generated by toBytes. The graph must be for
+    # the same set of worlds as the graph the table was originally created
+    # for, a ValueError is raised if it's not.
+    @staticmethod
+    def fromBytes(
+            graph: multiverse.JumpGraph,
+            data: bytes
+            ) -> 'LandmarkTable':
+        headerSize = struct.calcsize(LandmarkTable._HeaderFormat)
+        radius, worldCount, landmarkCount, checksum = struct.unpack_from(
+            LandmarkTable._HeaderFormat,
+            data)
+        if radius != graph.radius():
+            raise ValueError(f'Landmark table radius {radius} doesn\'t match jump graph radius {graph.radius()}')
+        if worldCount != graph.worldCount() or \
+                checksum != LandmarkTable._positionChecksum(graph=graph):
+            raise ValueError('Landmark table worlds don\'t match jump graph worlds')
+
+        offset = headerSize
+        componentIds, offset = LandmarkTable._arrayFromBytes(
+            typecode='i',
+            count=worldCount,
+            data=data,
+            offset=offset)
+        jumpDistances = []
+        for _ in range(landmarkCount):
+            distances, offset = LandmarkTable._arrayFromBytes(
+                typecode='H',
+                count=worldCount,
+                data=data,
+                offset=offset)
+            jumpDistances.append(distances)
+        parsecDistances = []
+        for _ in range(landmarkCount):
+            distances, offset = LandmarkTable._arrayFromBytes(
+                typecode='H',
+                count=worldCount,
+                data=data,
+                offset=offset)
+            parsecDistances.append(distances)
+        if offset != len(data):
+            raise ValueError('Landmark table data has unexpected trailing data')
+
+        return LandmarkTable(
+            graph=graph,
+            componentIds=componentIds,
+            jumpDistances=jumpDistances,
+            parsecDistances=parsecDistances)
+
+    # Create a table for the worlds in a jump graph. Landmarks are chosen
+    # using farthest point selection, the first landmark for a component is
+    # the world furthest from an arbitrary world in the component, then each
+    # subsequent landmark is the world furthest from all the landmarks chosen
+    # so far. This tends to place landmarks around the edge of the component
+    # which is where they give the best bounds.
+    @staticmethod
+    def build(
+            graph: multiverse.JumpGraph,
+            landmarkCount: int = _DefaultLandmarkCount
+            ) -> 'LandmarkTable':
+        worldCount = graph.worldCount()
+
+        componentIds = array.array('i', [-1]) * worldCount
+        components: typing.List[typing.List[int]] = []
+        for index in range(worldCount):
+            if componentIds[index] >= 0:
+                continue
+            componentId = len(components)
+            componentIds[index] = componentId
+            members = [index]
+            stack = [index]
+            while stack:
+                neighbourIndices, _ = graph.neighbourIndices(stack.pop())
+                for neighbourIndex in neighbourIndices:
+                    if componentIds[neighbourIndex] < 0:
+                        componentIds[neighbourIndex] = componentId
+                        members.append(neighbourIndex)
+                        stack.append(neighbourIndex)
+            components.append(members)
+
+        jumpDistances = [
+            array.array('H', [LandmarkTable._NoLandmark]) * worldCount
+            for _ in range(landmarkCount)]
+        parsecDistances = [
+            array.array('H', [LandmarkTable._NoLandmark]) * worldCount
+            for _ in range(landmarkCount)]
+        minJumps = array.array('H', [LandmarkTable._NoLandmark]) * worldCount
+
+        for members in components:
+            if len(members) < LandmarkTable._MinComponentSize:
+                continue
+
+            # Use the world furthest from an arbitrary world as the starting
+            # point. The distances are calculated into the first slot but
+            # will be overwritten when the first landmark is processed
+            LandmarkTable._calculateJumps(
+                graph=graph,
+                source=members[0],
+                distances=jumpDistances[0])
+            landmark = max(members, key=lambda index: jumpDistances[0][index])
+
+            for slot in range(landmarkCount):
+                LandmarkTable._calculateJumps(
+                    graph=graph,
+                    source=landmark,
+                    distances=jumpDistances[slot])
+                LandmarkTable._calculateParsecs(
+                    graph=graph,
+                    source=landmark,
+                    distances=parsecDistances[slot])
+
+                if slot + 1 >= landmarkCount:
+                    break
+
+                bestDistance = 0
+                landmark = None
+                for index in members:
+                    distance = min(minJumps[index], jumpDistances[slot][index])
+                    minJumps[index] = distance
+                    if distance > bestDistance:
+                        bestDistance = distance
+                        landmark = index
+                if landmark is None:
+                    break # All worlds in the component are landmarks
+
+        return LandmarkTable(
+            graph=graph,
+            componentIds=componentIds,
+            jumpDistances=jumpDistances,
+            parsecDistances=parsecDistances)
+
+    # Breadth first search to find the min number of jumps to each world in
+    # the same component as the source world
+    @staticmethod
+    def _calculateJumps(
+            graph: multiverse.JumpGraph,
+            source: int,
+            distances: array.array
+            ) -> None:
+        distances[source] = 0
+        visited = {source}
+        frontier = [source]
+        jumps = 0
+        while frontier:
+            jumps = min(jumps + 1, LandmarkTable._MaxDistance)
+            nextFrontier = []
+            for index in frontier:
+                neighbourIndices, _ = graph.neighbourIndices(index)
+                for neighbourIndex in neighbourIndices:
+                    if neighbourIndex not in visited:
+                        visited.add(neighbourIndex)
+                        distances[neighbourIndex] = jumps
+                        nextFrontier.append(neighbourIndex)
+            frontier = nextFrontier
+
+    # Find the min parsecs to each world in the same component as the source
+    # world. Jump distances are small integers so this uses a bucket queue
+    # (Dial's algorithm) rather than a heap
+    @staticmethod
+    def _calculateParsecs(
+            graph: multiverse.JumpGraph,
+            source: int,
+            distances: array.array
+            ) -> None:
+        settled = set()
+        buckets: typing.List[typing.Optional[typing.List[int]]] = [[source]]
+        parsecs = 0
+        while parsecs < len(buckets):
+            for index in buckets[parsecs]:
+                if index in settled:
+                    continue
+                settled.add(index)
+                distances[index] = min(parsecs, LandmarkTable._MaxDistance)
+
+                neighbourIndices, neighbourParsecs = graph.neighbourIndices(index)
+                for neighbourIndex, jumpParsecs in zip(neighbourIndices, neighbourParsecs):
+                    if neighbourIndex in settled:
+                        continue
+                    neighbourDistance = parsecs + jumpParsecs
+                    while len(buckets) <= neighbourDistance:
+                        buckets.append([])
+                    buckets[neighbourDistance].append(neighbourIndex)
+            buckets[parsecs] = None
+            parsecs += 1
+
+    @staticmethod
+    def _positionChecksum(graph: multiverse.JumpGraph) -> int:
+        checksum = 0
+        for index in range(graph.worldCount()):
+            x, y = graph.worldByIndex(index).hex().absolute()
+            checksum = zlib.crc32(struct.pack('<ii', x, y), checksum)
+        return checksum
+
+    @staticmethod
+    def _arrayToBytes(values: array.array) -> bytes:
+        # Data is always stored little endian so the cache can't be misread if
+        # copied between machines
+        if sys.byteorder != 'little':
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def _arrayFromBytes(
+            typecode: str,
+            count: int,
+            data: bytes,
+            offset: int
+            ) -> typing.Tuple[array.array, int]:
+        values = array.array(typecode)
+        size = values.itemsize * count
+        if offset + size > len(data):
+            raise ValueError('Landmark table data is truncated')
+        values.frombytes(data[offset:offset + size])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return (values, offset + size)
@@ -0,0 +1,208 @@
+import array
+import multiverse
+import struct
+import sys
+import typing
+import zlib
+
+# The main table holds all the mains for a milieu. A main is a group of
+# worlds that are connected by jump-1, i.e. every world in the main is
+# adjacent to at least one other world in the main. Mains are found with a
+# union-find over the adjacency of every world so finding all the mains for a
+# milieu takes about the same time as flood filling a handful of the largest
+# ones. Looking up the main for a world is then just a dictionary lookup.
+class MainTable(object):
+    # Increment this when the layout of the serialised table changes
+    FormatVersion = 1
+
+    # This is the value used by Traveller Map (tools\mains.js)
+    MinWorldCount = 5
+
+    _HeaderFormat = '<IIII' # World count, main count, main world count, position checksum
+
+    def __init__(
+            self,
+            mains: typing.Iterable[multiverse.Main],
+            worldCount: int,
+            positionChecksum: int
+            ) -> None:
+        self._mains = list(mains)
+        self._worldCount = worldCount
+        self._positionChecksum = positionChecksum
+        self._hexMainMap: typing.Dict[multiverse.HexPosition, multiverse.Main] = {}
+        for main in self._mains:
+            for world in main:
+                self._hexMainMap[world.hex()] = main
+
+    def mainCount(self) -> int:
+        return len(self._mains)
+
+    def mains(self) -> typing.Iterable[multiverse.Main]:
+        return list(self._mains)
+
+    def mainByPosition(
+            self,
+            hex: multiverse.HexPosition
+            ) -> typing.Optional[multiverse.Main]:
+        return self._hexMainMap.get(hex)
+
+    def toBytes(self) -> bytes:
+        worldCounts = array.array('I', (len(main) for main in self._mains))
+        positions = array.array('i')
+        for main in self._mains:
+            for world in main:
+                positions.extend(world.hex().absolute())
+
+        data = bytearray(struct.pack(
+            MainTable._HeaderFormat,
+            self._worldCount,
+            len(self._mains),
+            len(positions) // 2,
+            self._positionChecksum))
+        data += MainTable._arrayToBytes(worldCounts)
+        data += MainTable._arrayToBytes(positions)
+        return bytes(data)
+
+    # Recreate a table from data generated by toBytes. The worlds must be at
+    # the same positions as the worlds the table was originally created
+    # from, a ValueError is raised if they're not.
+    @staticmethod
+    def fromBytes(
+            worlds: typing.Iterable[multiverse.World],
+            data: bytes
+            ) -> 'MainTable':
+        worldMap = {world.hex().absolute(): world for world in worlds}
+        positionChecksum = MainTable._calculateChecksum(positions=worldMap.keys())
+
+        worldCount, mainCount, mainWorldCount, checksum = struct.unpack_from(
+            MainTable._HeaderFormat,
+            data)
+        if worldCount != len(worldMap) or checksum != positionChecksum:
+            raise ValueError('Main table worlds don\'t match universe worlds')
+
+        offset = struct.calcsize(MainTable._HeaderFormat)
+        worldCounts, offset = MainTable._arrayFromBytes(
+            typecode='I',
+            count=mainCount,
+            data=data,
+            offset=offset)
+        positions, offset = MainTable._arrayFromBytes(
+            typecode='i',
+            count=mainWorldCount * 2,
+            data=data,
+            offset=offset)
+        if offset != len(data):
+            raise ValueError('Main table data has unexpected trailing data')
+        if sum(worldCounts) != mainWorldCount:
+            raise ValueError('Main table world counts don\'t match positions')
+
+        mains = []
+        index = 0
+        for count in worldCounts:
+            mainWorlds = []
+            for _ in range(count):
+                world = worldMap.get((positions[index], positions[index + 1]))
+                if not world:
+                    raise ValueError('Main table world position doesn\'t match a universe world')
+                mainWorlds.append(world)
+                index += 2
+            mains.append(multiverse.Main(worlds=mainWorlds))
+
+        return MainTable(
+            mains=mains,
+            worldCount=worldCount,
+            positionChecksum=checksum)
+
+    # Create a table for the worlds. Worlds in each main are in the order
+    # they're iterated and mains are ordered by their first world.
+    @staticmethod
+    def build(
+            worlds: typing.Iterable[multiverse.World]
+            ) -> 'MainTable':
+        worldMap = {world.hex().absolute(): world for world in worlds}
+
+        # Union-find with union by size and path halving. The parent of each
+        # world is keyed by its absolute position
+        parents = {pos: pos for pos in worldMap.keys()}
+        sizes = dict.fromkeys(worldMap.keys(), 1)
+
+        def findRoot(pos: typing.Tuple[int, int]) -> typing.Tuple[int, int]:
+            parent = parents[pos]
+            while parent != pos:
+                grandparent = parents[parent]
+                parents[pos] = grandparent
+                pos = parent
+                parent = grandparent
+            return pos
+
+        # Only the upper right, lower right and lower edges of each world need
+        # to be checked as the other edges are checked from the adjacent
+        # world. The positions are calculated here rather than with
+        # neighbourAbsoluteHex as it's considerably faster
+        for pos in worldMap.keys():
+            x, y = pos
+            rightY = y if x % 2 else y - 1
+            for adjacentPos in ((x + 1, rightY), (x + 1, rightY + 1), (x, y + 1)):
+                if adjacentPos not in parents:
+                    continue
+
+                root = findRoot(pos)
+                adjacentRoot = findRoot(adjacentPos)
+                if root == adjacentRoot:
+                    continue
+                if sizes[root] < sizes[adjacentRoot]:
+                    root, adjacentRoot = adjacentRoot, root
+                parents[adjacentRoot] = root
+                sizes[root] += sizes[adjacentRoot]
+
+        groups: typing.Dict[typing.Tuple[int, int], typing.List[multiverse.World]] = {}
+        for pos, world in worldMap.items():
+            root = findRoot(pos)
+            if sizes[root] < MainTable.MinWorldCount:
+                continue
+            group = groups.get(root)
+            if group is None:
+                group = []
+                groups[root] = group
+            group.append(world)
+
+        return MainTable(
+            mains=[multiverse.Main(worlds=group) for group in groups.values()],
+            worldCount=len(worldMap),
+            positionChecksum=MainTable._calculateChecksum(positions=worldMap.keys()))
+
+    # The checksum is calculated from the sorted positions so it doesn't
+    # depend on the order the worlds were iterated in
+    @staticmethod
+    def _calculateChecksum(
+            positions: typing.Iterable[typing.Tuple[int, int]]
+            ) -> int:
+        values = array.array('i')
+        for pos in sorted(positions):
+            values.extend(pos)
+        return zlib.crc32(MainTable._arrayToBytes(values))
+
+    @staticmethod
+    def _arrayToBytes(values: array.array) -> bytes:
+        # Data is always stored little endian so the cache can't be misread if
+        # copied between machines
+        if sys.byteorder != 'little':
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def _arrayFromBytes(
+            typecode: str,
+            count: int,
+            data: bytes,
+            offset: int
+            ) -> typing.Tuple[array.array, int]:
+        values = array.array(typecode)
+        size = values.itemsize * count
+        if offset + size > len(data):
+            raise ValueError('Main table data is truncated')
+        values.frombytes(data[offset:offset + size])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return (values, offset + size)
@@ -0,0 +1,149 @@
+import bisect
+import numpy
+import re
+import threading
+import typing
+
+_ItemType = typing.TypeVar('_ItemType')
+
+# The name index is used to speed up searching for items (e.g. worlds or
+# sectors) by name with the fnmatch style patterns used by the universe search
+# functions. Rather than checking the pattern against the name of every item,
+# the index is used to find a set of candidate items that could match the
+# pattern, the caller then only needs to check the pattern against the
+# candidates.
+# Casefolded names are held in a sorted list so the literal text at the start
+# of a pattern can be used to find candidates with a binary search. Patterns
+# that start with a wild card use a trigram index of the names to find items
+# that contain the literal text in the pattern. The trigram index is only
+# built the first time it's needed.
+# Only ASCII names are indexed, items with names that contain other
+# characters are always returned as candidates. This avoids differences
+# between casefolding and the case insensitive matching done by re for
+# some unicode characters.
+# The index also holds the position of each item when they're sorted by a
+# sort key so lists of items can be sorted without generating the key for
+# each item every time.
+# This object is thread safe, the trigram index is created under a lock.
+class NameIndex(typing.Generic[_ItemType]):
+    _WildCardPattern = re.compile(r'[*?]')
+    # Character that sorts after all ASCII characters, used to find the end
+    # of the range of names with a given prefix
+    _PrefixRangeEnd = '\x80'
+    _EmptyIds = numpy.empty(0, dtype=numpy.intp)
+
+    def __init__(
+            self,
+            items: typing.Iterable[_ItemType],
+            names: typing.Callable[[_ItemType], typing.Iterable[str]],
+            sortKey: typing.Callable[[_ItemType], str]
+            ) -> None:
+        self._items = list(items)
+        self._lock = threading.Lock()
+        self._trigramMap: typing.Optional[typing.Dict[str, numpy.ndarray]] = None
+
+        indexedNames: typing.List[typing.Tuple[str, int]] = []
+        unindexedIds = []
+        for itemId, item in enumerate(self._items):
+            isIndexed = True
+            for name in names(item):
+                if not name.isascii():
+                    isIndexed = False
+                    break
+                indexedNames.append((name.casefold(), itemId))
+            if not isIndexed:
+                unindexedIds.append(itemId)
+        indexedNames.sort()
+        self._sortedNames = [name for name, _ in indexedNames]
+        self._sortedNameIds = numpy.array([itemId for _, itemId in indexedNames], dtype=numpy.intp)
+        self._unindexedIds = numpy.array(unindexedIds, dtype=numpy.intp)
+
+        # Ties are ordered by the order items were passed in so sorting by
+        # rank gives the same order as a stable sort by the key
+        order = sorted(
+            range(len(self._items)),
+            key=lambda itemId: sortKey(self._items[itemId]))
+        self._sortRanks: typing.Dict[_ItemType, int] = {
+            self._items[itemId]: rank for rank, itemId in enumerate(order)}
+
+    # Returns the items that could match the fnmatch pattern, in the order
+    # the items were passed to the index. As with the universe search
+    # functions, the pattern is matched against the start of the names so
+    # any item with a name that matches the pattern followed by a wild card
+    # is a candidate. None is returned if the pattern doesn't contain enough
+    # literal text to narrow down the candidates, in which case all items
+    # should be checked.
+    def candidates(self, pattern: str) -> typing.Optional[typing.List[_ItemType]]:
+        # Only text before any character sets is used as it's not possible to
+        # tell which characters inside the set are literals
+        setIndex = pattern.find('[')
+        if setIndex >= 0:
+            pattern = pattern[:setIndex]
+        literals = NameIndex._WildCardPattern.split(pattern)
+
+        postingLists: typing.List[numpy.ndarray] = []
+        prefix = literals[0]
+        if prefix and prefix.isascii():
+            prefix = prefix.casefold()
+            startIndex = bisect.bisect_left(self._sortedNames, prefix)
+            finishIndex = bisect.bisect_left(
+                self._sortedNames,
+                prefix + NameIndex._PrefixRangeEnd,
+                lo=startIndex)
+            postingLists.append(numpy.unique(self._sortedNameIds[startIndex:finishIndex]))
+
+        trigrams = set()
+        for literal in literals[1:]:
+            if len(literal) >= 3 and literal.isascii():
+                literal = literal.casefold()
+                for index in range(len(literal) - 2):
+                    trigrams.add(literal[index:index + 3])
+        if trigrams:
+            trigramMap = self._trigramIndex()
+            for trigram in trigrams:
+                postingLists.append(trigramMap.get(trigram, NameIndex._EmptyIds))
+
+        if not postingLists:
+            return None
+
+        # Intersect the shortest lists first to keep intermediate results
+        # small
+        postingLists.sort(key=len)
+        itemIds = postingLists[0]
+        for postingList in postingLists[1:]:
+            if not len(itemIds):
+                break
+            itemIds = numpy.intersect1d(itemIds, postingList, assume_unique=True)
+
+        if len(self._unindexedIds):
+            itemIds = numpy.union1d(itemIds, self._unindexedIds)
+
+        return [self._items[itemId] for itemId in itemIds]
+
+    # Sort items by the sort key the index was created with. All the items
+    # must be items that are in the index.
+    def sortItems(self, items: typing.List[_ItemType]) -> None:
+        items.sort(key=self._sortRanks.__getitem__)
+
+    def _trigramIndex(self) -> typing.Dict[str, numpy.ndarray]:
+        trigramMap = self._trigramMap
+        if trigramMap is not None:
+            return trigramMap
+
+        with self._lock:
+            # Recheck as another thread could have created the index between
+            # the first check and the lock being acquired
+            if self._trigramMap is None:
+                trigramIds: typing.Dict[str, typing.List[int]] = {}
+                for name, itemId in zip(self._sortedNames, self._sortedNameIds.tolist()):
+                    for index in range(len(name) - 2):
+                        trigram = name[index:index + 3]
+                        itemIds = trigramIds.get(trigram)
+                        if itemIds is None:
+                            itemIds = []
+                            trigramIds[trigram] = itemIds
+                        itemIds.append(itemId)
+                self._trigramMap = {
+                    trigram: numpy.unique(numpy.array(itemIds, dtype=numpy.intp))
+                    for trigram, itemIds in trigramIds.items()}
+            return self._trigramMap
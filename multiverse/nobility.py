@@ -1,3 +1,4 @@
+import common
 import enum
 import typing
 
@@ -41,6 +42,11 @@ _NobilityDescriptionMap = {
 }
 
 class Nobilities(object):
+    __slots__ = ('_string', '_nobilities')
+
+    # Immutable so worlds with the same nobility string share an instance
+    _internTable: common.InternTable[str, 'Nobilities'] = common.InternTable()
+
     def __init__(
             self,
             string: str
@@ -51,6 +57,13 @@ class Nobilities(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'Nobilities':
+        return Nobilities._internTable.get(string, lambda: Nobilities(string))
+
+    def __reduce__(self):
+        return (Nobilities.intern, (self._string,))
+
     def isEmpty(self) -> bool:
         return not self._string
 
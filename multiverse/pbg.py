@@ -1,3 +1,4 @@
+import common
 import enum
 import multiverse
 import typing
@@ -37,6 +38,12 @@ class PBG(object):
         _GasGiantDescriptionMap
     ]
 
+    __slots__ = ('_string', '_sanitised')
+
+    # Immutable so worlds with the same PBG string share an instance. There
+    # are only a few hundred distinct PBG strings in the universe
+    _internTable: common.InternTable[str, 'PBG'] = common.InternTable()
+
     def __init__(
             self,
             string
@@ -47,6 +54,13 @@ class PBG(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'PBG':
+        return PBG._internTable.get(string, lambda: PBG(string))
+
+    def __reduce__(self):
+        return (PBG.intern, (self._string,))
+
     def sanitised(self) -> str:
         return self._sanitised
 
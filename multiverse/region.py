@@ -72,7 +72,11 @@ class Region(object):
         if self._outline is not None:
             return self._outline
 
-        self._outline = []
+        # The outline is built in a local list and only stored once it's
+        # complete as map tiles are rendered from multiple threads. Two
+        # threads may end up building the same outline but neither will see
+        # a partial one
+        outline = []
 
         hexes = set(self._hexList)
         startHex, startEdge = Region._findOutlineStart(hexes=hexes)
@@ -80,8 +84,9 @@ class Region(object):
             # This is a single hex on it's own
             centerX, centerY = startHex.worldCenter()
             for offsetX, offsetY in Region._HexOutlineOffsets:
-                self._outline.append((centerX + offsetX, centerY + offsetY))
-            return self._outline
+                outline.append((centerX + offsetX, centerY + offsetY))
+            self._outline = outline
+            return outline
 
         hex = startHex
         edge = startEdge
@@ -95,7 +100,7 @@ class Region(object):
                 # There is no adjacent hex so add the most anti-clockwise
                 # point on the current edge and transition to the next
                 # edge
-                self._outline.append(Region._mostAntiClockwisePoint(
+                outline.append(Region._mostAntiClockwisePoint(
                     hex=hex,
                     edge=edge))
                 edge = multiverse.anticlockwiseHexEdge(edge)
@@ -104,7 +109,8 @@ class Region(object):
                 # Finished this outline
                 break
 
-        return self._outline
+        self._outline = outline
+        return outline
 
     @staticmethod
     def _findOutlineStart(hexes: typing.Collection[multiverse.HexPosition]) -> typing.Tuple[
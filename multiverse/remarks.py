@@ -1,3 +1,4 @@
+import common
 import logging
 import re
 import multiverse
@@ -21,6 +22,19 @@ class Remarks(object):
     # character
     _DefaultResearchStation = 'G'
 
+    __slots__ = (
+        '_string', '_tokenSet', '_sectorName', '_zone', '_tradeCodes',
+        '_isMajorHomeworld', '_isMinorHomeworld', '_sophontPercentages',
+        '_diebackSophonts', '_owningWorld', '_colonyWorlds',
+        '_rulingAllegiance', '_researchStation')
+
+    # Parsed remarks depend on the sector name and zone as well as the
+    # remarks string. Worlds in the same sector with the same zone and
+    # remarks share an instance as they're immutable
+    _internTable: common.InternTable[
+        typing.Tuple[str, str, typing.Optional[multiverse.ZoneType]],
+        'Remarks'] = common.InternTable()
+
     def __init__(
             self,
             string: str,
@@ -54,12 +68,28 @@ class Remarks(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(
+            string: str,
+            sectorName: str,
+            zone: typing.Optional[multiverse.ZoneType]
+            ) -> 'Remarks':
+        return Remarks._internTable.get(
+            (string, sectorName, zone),
+            lambda: Remarks(string=string, sectorName=sectorName, zone=zone))
+
+    def __reduce__(self):
+        return (Remarks.intern, (self._string, self._sectorName, self._zone))
+
     def isEmpty(self) -> bool:
         return not self._string
 
     def hasRemark(self, remark: str) -> bool:
         return remark in self._tokenSet
 
+    def remarks(self) -> typing.Iterable[str]:
+        return self._tokenSet
+
     def tradeCodes(self) -> typing.Iterable[multiverse.TradeCode]:
         return self._tradeCodes
 
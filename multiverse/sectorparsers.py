@@ -1,8 +1,8 @@
 import common
 import enum
-import itertools
 import json
 import logging
+import operator
 import re
 import typing
 import xml.etree.ElementTree
@@ -33,13 +33,24 @@ class WorldAttribute(enum.Enum):
     Allegiance = 12
     Stellar = 13
 
+    # Attributes are used as the keys of the dict each raw world holds its
+    # data in. The default enum hash is implemented in Python and hashing
+    # the keys was the largest cost when parsing sectors. Members are
+    # singletons that compare by identity so the identity hash is used
+    # instead
+    __hash__ = object.__hash__
+
 class RawWorld(object):
+    __slots__ = ('_lineNumber', '_attributes')
+
     def __init__(
             self,
-            lineNumber: int
+            lineNumber: int,
+            attributes: typing.Optional[typing.Dict[WorldAttribute, str]] = None
             ) -> None:
         self._lineNumber = lineNumber
-        self._attributes: typing.Dict[WorldAttribute, str] = {}
+        self._attributes: typing.Dict[WorldAttribute, str] = \
+            attributes if attributes is not None else {}
 
     def lineNumber(self) -> int:
         return self._lineNumber
@@ -496,6 +507,18 @@ def _isAllDashes(string: str) -> bool:
             return False
     return True
 
+# Maps strings made up of dashes (the marker used for no data) to an empty
+# string so the markers in a list of values can be replaced with a single
+# map(noDataMap.get, values, values). The map is extended as longer markers
+# are needed, it's safe for multiple threads to extend it at the same time
+# as they add the same values.
+_NoDataMap: typing.Dict[str, str] = {}
+
+def _noDataMap(maxLength: int) -> typing.Dict[str, str]:
+    for length in range(len(_NoDataMap) + 1, maxLength + 1):
+        _NoDataMap['-' * length] = ''
+    return _NoDataMap
+
 def _optionalConvertToBool(
         value: typing.Optional[typing.Any],
         attributeName: str,
@@ -608,7 +631,7 @@ def readT5ColumnSector(
     worlds = []
     columnNames = None
     columnAttributes = None
-    columnWidths = None
+    slicePlan = None
     for lineNumber, line in enumerate(content.splitlines()):
         if not line:
             # Ignore empty lines
@@ -640,7 +663,7 @@ def readT5ColumnSector(
                 attribute = _T5Column_ColumnNameToAttributeMap.get(columnName)
                 columnAttributes.append(attribute)
             continue
-        elif not columnWidths:
+        elif not slicePlan:
             separators = _SeparatorPattern.findall(line)
             if len(separators) != len(columnNames):
                 raise RuntimeError(
@@ -649,6 +672,9 @@ def readT5ColumnSector(
             columnWidths = []
             for columnSeparator in separators:
                 columnWidths.append(len(columnSeparator))
+            slicePlan = _T5ColumnSlicePlan(
+                columnAttributes=columnAttributes,
+                columnWidths=columnWidths)
             continue
 
         # Parse the line as a world definition
@@ -656,48 +682,65 @@ def readT5ColumnSector(
             worlds.append(_readT5ColumnWorld(
                 line=line,
                 lineNumber=lineNumber,
-                columnAttributes=columnAttributes,
-                columnWidths=columnWidths))
+                slicePlan=slicePlan))
         except Exception as ex:
             logging.warning(
                 f'Failed parse world on line {lineNumber} in data for {identifier} ({str(ex)})')
             continue
     return worlds
 
+# The slice plan is generated once from the header of a T5 column sector file
+# and used to split each world line into its attributes. All the known
+# columns are sliced from a line with a single call to an itemgetter rather
+# than slicing one column at a time. Columns with unknown names aren't
+# sliced as their data isn't used.
+class _T5ColumnSlicePlan(object):
+    def __init__(
+            self,
+            columnAttributes: typing.Sequence[typing.Optional[WorldAttribute]],
+            columnWidths: typing.Sequence[int]
+            ) -> None:
+        slices = []
+        self.attributes: typing.List[WorldAttribute] = []
+        startIndex = 0
+        lastStartIndex = 0
+        for attribute, width in zip(columnAttributes, columnWidths):
+            if attribute != None:
+                slices.append(slice(startIndex, startIndex + width))
+                self.attributes.append(attribute)
+            lastStartIndex = startIndex
+            startIndex += width + 1
+
+        # The header always has all the mandatory columns so there are
+        # multiple slices and the getter always returns a tuple
+        self.columnSlicer = operator.itemgetter(*slices)
+        # A line must reach the start of the last column, even if the data
+        # for the column isn't used
+        self.minLineLength = lastStartIndex + 1
+        self.noDataMap = _noDataMap(maxLength=max(columnWidths))
+
 def _readT5ColumnWorld(
         line: str,
         lineNumber: int,
-        columnAttributes: typing.Iterable[WorldAttribute],
-        columnWidths: typing.Iterable[int]
+        slicePlan: _T5ColumnSlicePlan
         ) -> RawWorld:
-    worldData = RawWorld(lineNumber=lineNumber)
-    lineLength = len(line)
-    startIndex = 0
-    finishIndex = 0
-    for attribute, width in itertools.zip_longest(columnAttributes, columnWidths):
-        if startIndex >= lineLength:
-            raise RuntimeError('Line is to short')
-
-        finishIndex = startIndex + width
-        if attribute != None:
-            data = line[startIndex:finishIndex].strip()
-            if data and _isAllDashes(data):
-                data = '' # Replace no data marker with empty string
-
-            worldData.setAttribute(
-                attribute=attribute,
-                value=data)
-        startIndex = finishIndex + 1
-    return worldData
+    if len(line) < slicePlan.minLineLength:
+        raise RuntimeError('Line is to short')
+
+    values = list(map(str.strip, slicePlan.columnSlicer(line)))
+    # Replace no data markers with empty strings
+    values = map(slicePlan.noDataMap.get, values, values)
+    return RawWorld(
+        lineNumber=lineNumber,
+        attributes=dict(zip(slicePlan.attributes, values)))
 
 def readT5RowSector(
         content: str,
         identifier: str
         ) -> typing.Collection[RawWorld]:
-    worlds = []
-    columnNames = None
+    lines = content.splitlines()
     columnAttributes = None
-    for lineNumber, line in enumerate(content.splitlines()):
+    for lineNumber, line in enumerate(lines):
         if not line:
             # Ignore blank lines
             continue
@@ -705,36 +748,49 @@ def readT5RowSector(
             # Technically comments aren't allowed in T5 tab format but ignore them anyway
             continue
 
-        if not columnNames:
-            columnNames = _HeaderPattern.findall(line)
-            if len(columnNames) < len(_T5Row_ColumnNameToAttributeMap):
-                # This is needed as some sectors (notably Shadow Rift) are off format and have
-                # broken comments that don't start with #. This gets logged at a low level so
-                # we don't spam the logs every time we start
-                logging.debug(
-                    f'Skipping bogus header on line {lineNumber} for {identifier}')
-                columnNames = None
-                continue
+        columnNames = _HeaderPattern.findall(line)
+        if len(columnNames) < len(_T5Row_ColumnNameToAttributeMap):
+            # This is needed as some sectors (notably Shadow Rift) are off format and have
+            # broken comments that don't start with #. This gets logged at a low level so
+            # we don't spam the logs every time we start
+            logging.debug(
+                f'Skipping bogus header on line {lineNumber} for {identifier}')
+            continue
 
-            # Check that mandatory columns are present
-            for columnName in _T5Row_ColumnNameToAttributeMap.keys():
-                if columnName not in columnNames:
-                    raise RuntimeError(
-                        f'Unable to load data for {identifier} (Header is missing {columnName} column)')
+        # Check that mandatory columns are present
+        for columnName in _T5Row_ColumnNameToAttributeMap.keys():
+            if columnName not in columnNames:
+                raise RuntimeError(
+                    f'Unable to load data for {identifier} (Header is missing {columnName} column)')
 
-            # Convert column names to list of column attributes with None for unknown columns
-            columnAttributes = []
-            for columnName in columnNames:
-                attribute = _T5Row_ColumnNameToAttributeMap.get(columnName)
-                columnAttributes.append(attribute)
-            continue
+        # Convert column names to list of column attributes with None for unknown columns
+        columnAttributes = []
+        for columnName in columnNames:
+            attribute = _T5Row_ColumnNameToAttributeMap.get(columnName)
+            columnAttributes.append(attribute)
+        break
 
+    if not columnAttributes:
+        return []
+
+    # The no data map needs to handle markers as long as the longest line so
+    # the world lines are gathered up front to find it
+    worldLines = [
+        (lineNumber, line)
+        for lineNumber, line in enumerate(lines[lineNumber + 1:], start=lineNumber + 1)
+        if line and line[:1] != '#']
+    noDataMap = _noDataMap(
+        maxLength=max((len(line) for _, line in worldLines), default=0))
+
+    worlds = []
+    for lineNumber, line in worldLines:
         # Parse the line as a world definition
         try:
             worlds.append(_readT5RowWorld(
                 line=line,
                 lineNumber=lineNumber,
-                columnAttributes=columnAttributes))
+                columnAttributes=columnAttributes,
+                noDataMap=noDataMap))
         except Exception as ex:
             logging.warning(
                 f'Failed parse world on line {lineNumber} in data for {identifier} ({str(ex)})')
@@ -744,21 +800,20 @@ def readT5RowSector(
 def _readT5RowWorld(
         line: str,
         lineNumber: int,
-        columnAttributes: typing.Iterable[WorldAttribute],
+        columnAttributes: typing.Sequence[typing.Optional[WorldAttribute]],
+        noDataMap: typing.Mapping[str, str]
         ) -> RawWorld:
+    # The tab format doesn't support quoting so splitting on tabs gives the
+    # same result as the csv module but is considerably faster
     columnData = line.split('\t')
     if len(columnData) != len(columnAttributes):
         raise RuntimeError('Line has incorrect number of columns')
 
-    worldData = RawWorld(lineNumber=lineNumber)
-    for attribute, data in itertools.zip_longest(columnAttributes, columnData):
-        if data and _isAllDashes(data):
-            data = '' # Replace no data marker with empty string
-
-        worldData.setAttribute(
-            attribute=attribute,
-            value=data)
-    return worldData
+    # Replace no data markers with empty strings
+    values = map(noDataMap.get, columnData, columnData)
+    return RawWorld(
+        lineNumber=lineNumber,
+        attributes=dict(zip(columnAttributes, values)))
 
 def metadataFileFormatDetect(content: str) -> typing.Optional[MetadataFormat]:
     try:
@@ -1,3 +1,4 @@
+import common
 import enum
 import re
 import typing
@@ -60,6 +61,8 @@ class Star(object):
         _LuminosityDescriptionMap
     ]
 
+    __slots__ = ('_classification', '_spectralClass', '_spectralScale', '_luminosityClass')
+
     def __init__(
             self,
             classification: str,
@@ -97,6 +100,11 @@ class Stellar(object):
     # https://travellermap.com/doc/fileformats#legacy-sec-format
     _StellarPattern = re.compile(r'([OBAFGKM][0-9])\s*(D|Ia|Ib|III|II|IV|VII|VI|V||)|(DB|DA|DF|DG|DK|DM|D)|(BD|BH|NS|PSR)')
 
+    __slots__ = ('_string', '_stars')
+
+    # Immutable so systems with the same stellar string share an instance
+    _internTable: common.InternTable[str, 'Stellar'] = common.InternTable()
+
     def __init__(
             self,
             string: str
@@ -107,6 +115,13 @@ class Stellar(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'Stellar':
+        return Stellar._internTable.get(string, lambda: Stellar(string))
+
+    def __reduce__(self):
+        return (Stellar.intern, (self._string,))
+
     def isEmpty(self) -> bool:
         return not self._string
 
@@ -1,8 +1,10 @@
+import collections
 import common
 import fnmatch
 import re
 import math
 import multiverse
+import threading
 import typing
 
 class Universe(object):
@@ -15,10 +17,15 @@ class Universe(object):
             self.subsectorNameMap: typing.Dict[str, typing.List[multiverse.Subsector]] = {}
             self.subsectorSectorMap: typing.Dict[multiverse.Subsector, multiverse.Sector] = {}
             self.worldPositionMap: typing.Dict[typing.Tuple[int, int], multiverse.World] = {}
-            self.mainsList: typing.List[multiverse.Main] = []
-            self.hexMainMap: typing.Dict[multiverse.HexPosition, multiverse.Main] = {}
             self.allegiances: typing.Dict[str, multiverse.Allegiance] = {}
             self.hexRoutesMap: typing.Dict[multiverse.HexPosition, typing.List[multiverse.Route]] = {}
+            self.jumpGraphMap: typing.Dict[int, multiverse.JumpGraph] = {}
+            self.worldGrid: typing.Optional[multiverse.WorldGrid] = None
+            self.worldTable: typing.Optional[multiverse.WorldTable] = None
+            self.mainTable: typing.Optional[multiverse.MainTable] = None
+            self.worldNameIndex: typing.Optional[multiverse.NameIndex[multiverse.World]] = None
+            self.subsectorNameIndex: typing.Optional[multiverse.NameIndex[multiverse.Subsector]] = None
+            self.sectorNameIndex: typing.Optional[multiverse.NameIndex[multiverse.Sector]] = None
 
     # The absolute and relative hex patterns match search strings formatted
     # as 2 or 4 comma separated signed integers respectively, optionally
@@ -36,85 +43,313 @@ class Universe(object):
     # and subsector name are extracted
     _WorldSearchPattern = re.compile(r'^(.+)\s+\(\s*(.+)\s*\)$')
 
-    # This is the value used by Traveller Map (tools\mains.js)
-    _MinMainWorldCount = 5
+    # Jump graphs are only created for radii up to this value. Larger radii
+    # have so many neighbours per world that the memory used would outweigh
+    # the benefit
+    _MaxJumpGraphRadius = 6
 
     def __init__(
             self,
             sectors: typing.Collection[multiverse.Sector], # Sectors for all milieu
-            placeholderMilieu: typing.Optional[multiverse.Milieu] = None
+            placeholderMilieu: typing.Optional[multiverse.Milieu] = None,
+            # If a sector loader is specified, milieu that don't have any sectors in
+            # the sectors collection are loaded by calling it the first time data
+            # for the milieu is accessed
+            sectorLoader: typing.Optional[typing.Callable[
+                [multiverse.Milieu],
+                typing.Collection[multiverse.Sector]]] = None,
+            # If a main table loader is specified, it's called to create the
+            # main table for a milieu the first time it's needed (e.g. so the
+            # table can be read from a cache). It's passed the worlds the
+            # table should be for, including placeholders. If not specified
+            # the table is built from the worlds
+            mainTableLoader: typing.Optional[typing.Callable[
+                [multiverse.Milieu, typing.Collection[multiverse.World]],
+                multiverse.MainTable]] = None
             ) -> None:
-        self._milieuDataMap: typing.Dict[multiverse.Milieu, Universe._MilieuData] = {}
+        # A milieu being in the map means its data has been loaded, the value
+        # will be None if the milieu has no sectors
+        self._milieuDataMap: typing.Dict[
+            multiverse.Milieu,
+            typing.Optional[Universe._MilieuData]] = {}
         self._placeholderMilieu = placeholderMilieu
+        self._sectorLoader = sectorLoader
+        self._mainTableLoader = mainTableLoader
+        self._lock = threading.Lock()
+        self._loadLock = threading.Lock()
 
+        milieuSectors: typing.Dict[multiverse.Milieu, typing.List[multiverse.Sector]] = {}
         for sector in sectors:
             milieu = sector.milieu()
+            sectorList = milieuSectors.get(milieu)
+            if sectorList is None:
+                sectorList = []
+                milieuSectors[milieu] = sectorList
+            sectorList.append(sector)
+
+        for milieu, sectorList in milieuSectors.items():
+            self._milieuDataMap[milieu] = Universe._createMilieuData(
+                sectors=sectorList)
+
+    # Returns the milieu whose sectors are used in other milieu that don't
+    # have their own sector at that position
+    def placeholderMilieu(self) -> typing.Optional[multiverse.Milieu]:
+        return self._placeholderMilieu
+
+    # Returns True if the data for the milieu has been loaded. This is always
+    # the case if the universe doesn't have a sector loader.
+    def isMilieuLoaded(
+            self,
+            milieu: multiverse.Milieu
+            ) -> bool:
+        return not self._sectorLoader or milieu in self._milieuDataMap
 
-            milieuData = self._milieuDataMap.get(milieu)
-            if not milieuData:
-                milieuData = Universe._MilieuData()
-                self._milieuDataMap[milieu] = milieuData
-
-            index = sector.index()
+    # Returns the data for the milieu, loading it if needed. None is returned
+    # if the milieu has no sectors.
+    def _milieuData(
+            self,
+            milieu: multiverse.Milieu
+            ) -> typing.Optional['Universe._MilieuData']:
+        # For speed the map is checked without the lock held, this works on
+        # the basis that entries are never removed and a dict lookup is
+        # thread safe
+        if not self._sectorLoader or milieu in self._milieuDataMap:
+            return self._milieuDataMap.get(milieu)
+
+        with self._loadLock:
+            # Recheck as another thread could have loaded the milieu between
+            # the first check and the lock being acquired
+            if milieu in self._milieuDataMap:
+                return self._milieuDataMap[milieu]
+
+            sectors = self._sectorLoader(milieu)
+            milieuData = Universe._createMilieuData(sectors=sectors) if sectors else None
+            self._milieuDataMap[milieu] = milieuData
+        return milieuData
+
+    @staticmethod
+    def _createMilieuData(
+            sectors: typing.Iterable[multiverse.Sector]
+            ) -> 'Universe._MilieuData':
+        milieuData = Universe._MilieuData()
+        for sector in sectors:
             milieuData.sectorList.append(sector)
-            milieuData.sectorIndexMap[index.elements()] = sector
-
-            # Add canonical name to the main name map. The name is added lower case as lookups are
-            # case insensitive
-            milieuData.canonicalNameMap[sector.name().lower()] = sector
-
-            # Add alternate names and abbreviations to the alternate name map
-            alternateNames = sector.alternateNames()
-            if alternateNames:
-                for alternateName in alternateNames:
-                    alternateName = alternateName.lower()
-                    sectorList = milieuData.alternateNameMap.get(alternateName)
-                    if not sectorList:
-                        sectorList = []
-                        milieuData.alternateNameMap[alternateName] = sectorList
-                    sectorList.append(sector)
-
-            abbreviation = sector.abbreviation()
-            if abbreviation:
-                abbreviation = abbreviation.lower()
-                sectorList = milieuData.alternateNameMap.get(abbreviation)
+            Universe._addSectorData(milieuData=milieuData, sector=sector)
+        Universe._updateAllegiances(milieuData=milieuData)
+        return milieuData
+
+    # Add the sector to the lookup maps. The sector isn't added to the sector
+    # list as the caller controls where in the list it goes
+    @staticmethod
+    def _addSectorData(
+            milieuData: 'Universe._MilieuData',
+            sector: multiverse.Sector
+            ) -> None:
+        milieuData.sectorIndexMap[sector.index().elements()] = sector
+
+        # Add canonical name to the main name map. The name is added lower case as lookups are
+        # case insensitive
+        milieuData.canonicalNameMap[sector.name().lower()] = sector
+
+        # Add alternate names and abbreviations to the alternate name map
+        alternateNames = sector.alternateNames()
+        if alternateNames:
+            for alternateName in alternateNames:
+                alternateName = alternateName.lower()
+                sectorList = milieuData.alternateNameMap.get(alternateName)
                 if not sectorList:
                     sectorList = []
-                    milieuData.alternateNameMap[abbreviation] = sectorList
+                    milieuData.alternateNameMap[alternateName] = sectorList
                 sectorList.append(sector)
 
-            for subsector in sector.subsectors():
-                subsectorName = subsector.name()
-                subsectorName = subsectorName.lower()
-                subsectorList = milieuData.subsectorNameMap.get(subsectorName)
-                if not subsectorList:
-                    subsectorList = []
-                    milieuData.subsectorNameMap[subsectorName] = subsectorList
-                subsectorList.append(subsector)
-
-                milieuData.subsectorSectorMap[subsector] = sector
-
+        abbreviation = sector.abbreviation()
+        if abbreviation:
+            abbreviation = abbreviation.lower()
+            sectorList = milieuData.alternateNameMap.get(abbreviation)
+            if not sectorList:
+                sectorList = []
+                milieuData.alternateNameMap[abbreviation] = sectorList
+            sectorList.append(sector)
+
+        for subsector in sector.subsectors():
+            subsectorName = subsector.name()
+            subsectorName = subsectorName.lower()
+            subsectorList = milieuData.subsectorNameMap.get(subsectorName)
+            if not subsectorList:
+                subsectorList = []
+                milieuData.subsectorNameMap[subsectorName] = subsectorList
+            subsectorList.append(subsector)
+
+            milieuData.subsectorSectorMap[subsector] = sector
+
+        for world in sector.worlds():
+            hex = world.hex()
+            milieuData.worldPositionMap[(hex.absoluteX(), hex.absoluteY())] = world
+
+        for route in sector.routes():
+            for hex in [route.startHex(), route.endHex()]:
+                endpoints = milieuData.hexRoutesMap.get(hex)
+                if not endpoints:
+                    endpoints = []
+                    milieuData.hexRoutesMap[hex] = endpoints
+                endpoints.append(route)
+
+    # Remove the sector from the lookup maps, this is the reverse of
+    # _addSectorData. Lists held by the maps are modified in place so they
+    # must not be shared with milieu data that's in use
+    @staticmethod
+    def _removeSectorData(
+            milieuData: 'Universe._MilieuData',
+            sector: multiverse.Sector
+            ) -> None:
+        index = sector.index().elements()
+        if milieuData.sectorIndexMap.get(index) is sector:
+            del milieuData.sectorIndexMap[index]
+
+        name = sector.name().lower()
+        if milieuData.canonicalNameMap.get(name) is sector:
+            del milieuData.canonicalNameMap[name]
+
+        alternateNames = list(sector.alternateNames() or [])
+        if sector.abbreviation():
+            alternateNames.append(sector.abbreviation())
+        for alternateName in alternateNames:
+            Universe._removeListItem(
+                listMap=milieuData.alternateNameMap,
+                key=alternateName.lower(),
+                item=sector)
+
+        for subsector in sector.subsectors():
+            Universe._removeListItem(
+                listMap=milieuData.subsectorNameMap,
+                key=subsector.name().lower(),
+                item=subsector)
+            milieuData.subsectorSectorMap.pop(subsector, None)
+
+        for world in sector.worlds():
+            hex = world.hex()
+            position = (hex.absoluteX(), hex.absoluteY())
+            if milieuData.worldPositionMap.get(position) is world:
+                del milieuData.worldPositionMap[position]
+
+        for route in sector.routes():
+            for hex in [route.startHex(), route.endHex()]:
+                Universe._removeListItem(
+                    listMap=milieuData.hexRoutesMap,
+                    key=hex,
+                    item=route)
+
+    @staticmethod
+    def _removeListItem(
+            listMap: typing.Dict[typing.Any, typing.List[typing.Any]],
+            key: typing.Any,
+            item: typing.Any
+            ) -> None:
+        itemList = listMap.get(key)
+        if not itemList:
+            return
+        itemList[:] = [other for other in itemList if other is not item]
+        if not itemList:
+            del listMap[key]
+
+    # Rebuild the allegiance map from the worlds in the milieu. Allegiances
+    # are keyed by their unique code, if there are multiple allegiance
+    # objects with the same code the first one found is used
+    @staticmethod
+    def _updateAllegiances(
+            milieuData: 'Universe._MilieuData'
+            ) -> None:
+        allegiances: typing.Dict[str, multiverse.Allegiance] = {}
+        for sector in milieuData.sectorList:
             for world in sector.worlds():
-                hex = world.hex()
-                milieuData.worldPositionMap[(hex.absoluteX(), hex.absoluteY())] = world
-
                 allegiance = world.allegiance()
-                if allegiance and (allegiance.uniqueCode() not in milieuData.allegiances):
-                    milieuData.allegiances[allegiance.uniqueCode()] = allegiance
-
-            for route in sector.routes():
-                for hex in [route.startHex(), route.endHex()]:
-                    endpoints = milieuData.hexRoutesMap.get(hex)
-                    if not endpoints:
-                        endpoints = []
-                        milieuData.hexRoutesMap[hex] = endpoints
-                    endpoints.append(route)
+                if allegiance and (allegiance.uniqueCode() not in allegiances):
+                    allegiances[allegiance.uniqueCode()] = allegiance
+        milieuData.allegiances = allegiances
+
+    # Replace sectors in a milieu that has already been loaded. The sectors
+    # map the index of each sector to replace to the sector that replaces it,
+    # if the sector is None any sector at that index is removed. Only the
+    # entries for the specified sectors are updated rather than rebuilding
+    # all the milieu data. Data generated on demand (e.g. jump graphs) is
+    # discarded and regenerated next time it's needed. As the placeholder
+    # milieu can contribute worlds to mains in other milieu, updating it
+    # also discards the main tables for all milieu.
+    # The milieu data is updated by creating a copy of it and replacing the
+    # current data with the copy once it's complete. This means threads that
+    # are reading from the current data see a consistent view while the
+    # update is made.
+    # False is returned if the milieu isn't loaded, in which case nothing is
+    # updated as the sectors will be read when the milieu is loaded.
+    def updateSectors(
+            self,
+            milieu: multiverse.Milieu,
+            sectors: typing.Mapping[multiverse.SectorIndex, typing.Optional[multiverse.Sector]]
+            ) -> bool:
+        with self._loadLock:
+            if self._sectorLoader and milieu not in self._milieuDataMap:
+                return False
+
+            currentData = self._milieuDataMap.get(milieu)
+            milieuData = Universe._copyMilieuData(milieuData=currentData) \
+                if currentData else Universe._MilieuData()
+
+            # Sectors with no worlds are falsy as Sector defines __len__ so
+            # they must be explicitly compared to None
+            for index, sector in sectors.items():
+                oldSector = milieuData.sectorIndexMap.get(index.elements())
+                if oldSector is not None:
+                    Universe._removeSectorData(milieuData=milieuData, sector=oldSector)
+                    listIndex = milieuData.sectorList.index(oldSector)
+                    if sector is not None:
+                        milieuData.sectorList[listIndex] = sector
+                    else:
+                        del milieuData.sectorList[listIndex]
+                elif sector is not None:
+                    milieuData.sectorList.append(sector)
+
+                if sector is not None:
+                    Universe._addSectorData(milieuData=milieuData, sector=sector)
+            Universe._updateAllegiances(milieuData=milieuData)
+
+            self._milieuDataMap[milieu] = milieuData if milieuData.sectorList else None
+
+            if milieu is self._placeholderMilieu:
+                # The lock is held while main tables are created so this
+                # can't be interleaved with a table for another milieu being
+                # created from the old placeholder data
+                with self._lock:
+                    for otherMilieu, otherData in self._milieuDataMap.items():
+                        if otherMilieu is not milieu and otherData:
+                            otherData.mainTable = None
+        return True
+
+    # Copy the maps that are updated when sectors are replaced. Lists held
+    # by the maps are also copied so they can be updated without affecting
+    # the original data. Data generated on demand isn't copied
+    @staticmethod
+    def _copyMilieuData(
+            milieuData: 'Universe._MilieuData'
+            ) -> 'Universe._MilieuData':
+        copy = Universe._MilieuData()
+        copy.sectorList = list(milieuData.sectorList)
+        copy.canonicalNameMap = dict(milieuData.canonicalNameMap)
+        copy.alternateNameMap = {
+            name: list(sectors) for name, sectors in milieuData.alternateNameMap.items()}
+        copy.sectorIndexMap = dict(milieuData.sectorIndexMap)
+        copy.subsectorNameMap = {
+            name: list(subsectors) for name, subsectors in milieuData.subsectorNameMap.items()}
+        copy.subsectorSectorMap = dict(milieuData.subsectorSectorMap)
+        copy.worldPositionMap = dict(milieuData.worldPositionMap)
+        copy.hexRoutesMap = {
+            hex: list(routes) for hex, routes in milieuData.hexRoutesMap.items()}
+        return copy
 
     def sectorNames(
             self,
             milieu: multiverse.Milieu
             ) -> typing.Iterable[str]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return []
 
@@ -128,7 +363,7 @@ class Universe(object):
             milieu: multiverse.Milieu,
             name: str
             ) -> typing.Optional[multiverse.Sector]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return None
         return milieuData.canonicalNameMap.get(name.lower())
@@ -169,7 +404,7 @@ class Universe(object):
             hex: multiverse.HexPosition,
             includePlaceholders: bool = False
             ) -> typing.Optional[multiverse.World]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         world = milieuData.worldPositionMap.get(hex.absolute()) if milieuData else None
 
         if not world and includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
@@ -188,7 +423,7 @@ class Universe(object):
             hex: multiverse.HexPosition,
             includePlaceholders: bool = False
             ) -> typing.Optional[multiverse.Sector]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         sector = milieuData.sectorIndexMap.get(hex.sectorIndex().elements()) if milieuData else None
 
         if not sector and includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
@@ -205,7 +440,7 @@ class Universe(object):
             index: multiverse.SectorIndex,
             includePlaceholders: bool = False
             ) -> typing.Optional[multiverse.Sector]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         sector = milieuData.sectorIndexMap.get(index.elements()) if milieuData else None
 
         if not sector and includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
@@ -330,14 +565,14 @@ class Universe(object):
             hex: multiverse.HexPosition,
             includePlaceholders: bool = False
             ) -> str:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
 
         sectorX, sectorY, offsetX, offsetY = hex.relative()
         sectorPos = (sectorX, sectorY)
         sector = milieuData.sectorIndexMap.get(sectorPos) if milieuData else None
 
         if not sector and includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
             if placeholderData:
                 sector = placeholderData.sectorIndexMap.get(sectorPos)
 
@@ -360,7 +595,7 @@ class Universe(object):
         sectorName = sectorName.lower()
 
         # Check to see if the sector name is a canonical sector name
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         sector = None
         if milieuData:
             sector = milieuData.canonicalNameMap.get(sectorName)
@@ -468,26 +703,222 @@ class Universe(object):
             milieu: multiverse.Milieu,
             hex: multiverse.HexPosition
             ) -> typing.Optional[multiverse.Main]:
-        milieuData = self._milieuDataMap.get(milieu)
+        table = self.mainTable(milieu=milieu)
+        return table.mainByPosition(hex=hex) if table else None
+
+    # Returns the main table for the specified milieu. The table is created
+    # the first time it's requested, it includes mains made up of worlds
+    # from the placeholder milieu where the milieu doesn't have a sector.
+    # None is returned if the milieu has no sectors.
+    def mainTable(
+            self,
+            milieu: multiverse.Milieu
+            ) -> typing.Optional[multiverse.MainTable]:
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return None
 
-        main = milieuData.hexMainMap.get(hex)
-        if main:
-            return main
+        table = milieuData.mainTable
+        if table:
+            return table
+
+        if self._placeholderMilieu and milieu is not self._placeholderMilieu:
+            # Make sure the placeholder milieu is loaded before the lock is
+            # acquired. Loading takes the load lock and updateSectors takes
+            # the locks in the opposite order
+            self._milieuData(milieu=self._placeholderMilieu)
+
+        with self._lock:
+            # Recheck as another thread could have created the table between
+            # the first check and the lock being acquired
+            table = milieuData.mainTable
+            if not table:
+                worlds = list(self.yieldWorlds(
+                    milieu=milieu,
+                    includePlaceholders=True))
+                if self._mainTableLoader:
+                    table = self._mainTableLoader(milieu, worlds)
+                else:
+                    table = multiverse.MainTable.build(worlds=worlds)
+                milieuData.mainTable = table
+        return table
+
+    # Returns the jump graph for the specified milieu and radius. The graph is
+    # created the first time it's requested. None is returned if the radius
+    # is larger than the max supported by jump graphs.
+    def jumpGraph(
+            self,
+            milieu: multiverse.Milieu,
+            radius: int
+            ) -> typing.Optional[multiverse.JumpGraph]:
+        if radius > Universe._MaxJumpGraphRadius:
+            return None
 
-        worlds = self.worldsInFlood(
-            hex=hex,
-            milieu=milieu,
-            includePlaceholders=True)
-        if len(worlds) < Universe._MinMainWorldCount:
+        milieuData = self._milieuData(milieu=milieu)
+        if not milieuData:
             return None
 
-        main = multiverse.Main(worlds=worlds)
-        for world in worlds:
-            milieuData.hexMainMap[world.hex()] = main
+        graph = milieuData.jumpGraphMap.get(radius)
+        if graph:
+            return graph
+
+        with self._lock:
+            # Recheck as another thread could have created the graph between
+            # the first check and the lock being acquired
+            graph = milieuData.jumpGraphMap.get(radius)
+            if not graph:
+                graph = multiverse.JumpGraph(
+                    worlds=milieuData.worldPositionMap.values(),
+                    radius=radius)
+                milieuData.jumpGraphMap[radius] = graph
+        return graph
+
+    # Returns the world table for the specified milieu. The table is created
+    # the first time it's requested. Worlds are ordered by sector (in the
+    # order they're returned by yieldSectors) then by their order in the
+    # sector. Placeholders aren't included. None is returned if the milieu has
+    # no sectors.
+    def worldTable(
+            self,
+            milieu: multiverse.Milieu
+            ) -> typing.Optional[multiverse.WorldTable]:
+        milieuData = self._milieuData(milieu=milieu)
+        if not milieuData:
+            return None
 
-        return main
+        table = milieuData.worldTable
+        if table:
+            return table
+
+        with self._lock:
+            # Recheck as another thread could have created the table between
+            # the first check and the lock being acquired
+            table = milieuData.worldTable
+            if not table:
+                table = multiverse.WorldTable(
+                    worlds=(world for sector in milieuData.sectorList for world in sector.yieldWorlds()))
+                milieuData.worldTable = table
+        return table
+
+    # The name indexes are created the first time a search is performed for
+    # the milieu. Worlds and subsectors are indexed in the order they're
+    # iterated from the sectors in the sector list so candidates are returned
+    # in the same order a search of all sectors would find them.
+    def _worldNameIndex(
+            self,
+            milieuData: _MilieuData
+            ) -> multiverse.NameIndex[multiverse.World]:
+        nameIndex = milieuData.worldNameIndex
+        if nameIndex:
+            return nameIndex
+
+        with self._lock:
+            # Recheck as another thread could have created the index between
+            # the first check and the lock being acquired
+            nameIndex = milieuData.worldNameIndex
+            if not nameIndex:
+                nameIndex = multiverse.NameIndex(
+                    items=(world for sector in milieuData.sectorList for world in sector),
+                    names=lambda world: (world.name(),),
+                    sortKey=lambda world: f'{world.name()}/{world.subsectorName()}/{world.sectorName()}'.casefold())
+                milieuData.worldNameIndex = nameIndex
+        return nameIndex
+
+    def _subsectorNameIndex(
+            self,
+            milieuData: _MilieuData
+            ) -> multiverse.NameIndex[multiverse.Subsector]:
+        nameIndex = milieuData.subsectorNameIndex
+        if nameIndex:
+            return nameIndex
+
+        with self._lock:
+            # Recheck as another thread could have created the index between
+            # the first check and the lock being acquired
+            nameIndex = milieuData.subsectorNameIndex
+            if not nameIndex:
+                nameIndex = multiverse.NameIndex(
+                    items=(subsector for sector in milieuData.sectorList for subsector in sector.subsectors()),
+                    names=lambda subsector: (subsector.name(),),
+                    sortKey=lambda subsector: f'{subsector.name()}/{subsector.sectorName()}'.casefold())
+                milieuData.subsectorNameIndex = nameIndex
+        return nameIndex
+
+    def _sectorNameIndex(
+            self,
+            milieuData: _MilieuData
+            ) -> multiverse.NameIndex[multiverse.Sector]:
+        nameIndex = milieuData.sectorNameIndex
+        if nameIndex:
+            return nameIndex
+
+        with self._lock:
+            # Recheck as another thread could have created the index between
+            # the first check and the lock being acquired
+            nameIndex = milieuData.sectorNameIndex
+            if not nameIndex:
+                nameIndex = multiverse.NameIndex(
+                    items=milieuData.sectorList,
+                    names=lambda sector: [sector.name()] + list(sector.alternateNames() or []),
+                    sortKey=lambda sector: sector.name().casefold())
+                milieuData.sectorNameIndex = nameIndex
+        return nameIndex
+
+    # Returns (absoluteX, absoluteY, world) tuples for the worlds in the area
+    # sorted by position (x then y). Placeholder worlds are only included for
+    # sectors that don't exist in the specified milieu.
+    def _gridWorldsInArea(
+            self,
+            milieu: multiverse.Milieu,
+            startX: int,
+            startY: int,
+            finishX: int,
+            finishY: int,
+            includePlaceholders: bool
+            ) -> typing.List[typing.Tuple[int, int, multiverse.World]]:
+        milieuData = self._milieuData(milieu=milieu)
+        placeholderData = None
+        if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
+
+        results = []
+        if milieuData:
+            results = self._worldGrid(milieuData=milieuData).worldsInArea(
+                startX=startX,
+                startY=startY,
+                finishX=finishX,
+                finishY=finishY)
+        if placeholderData:
+            results.extend(self._worldGrid(milieuData=placeholderData).worldsInArea(
+                startX=startX,
+                startY=startY,
+                finishX=finishX,
+                finishY=finishY,
+                excludeSectors=milieuData.sectorIndexMap if milieuData else None))
+
+        # The order matches the order worlds would be found if the hexes in
+        # the area were scanned. Positions are unique so worlds are never
+        # compared
+        results.sort()
+        return results
+
+    def _worldGrid(
+            self,
+            milieuData: 'Universe._MilieuData'
+            ) -> multiverse.WorldGrid:
+        grid = milieuData.worldGrid
+        if grid:
+            return grid
+
+        with self._lock:
+            # Recheck as another thread could have created the grid between
+            # the first check and the lock being acquired
+            grid = milieuData.worldGrid
+            if not grid:
+                grid = multiverse.WorldGrid(
+                    worlds=milieuData.worldPositionMap.values())
+                milieuData.worldGrid = grid
+        return grid
 
     def yieldSectors(
             self,
@@ -495,14 +926,14 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.Sector], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.Sector, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if milieuData:
             for sector in milieuData.sectorList:
                 if not filterCallback or filterCallback(sector):
                     yield sector
 
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
             if placeholderData:
                 for sector in placeholderData.sectorList:
                     sectorIndex = sector.index()
@@ -519,10 +950,10 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.Sector], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.Sector, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         placeholderData = None
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
 
         startX, finishX = common.minmax(upperLeft.sectorX(), lowerRight.sectorX())
         startY, finishY = common.minmax(upperLeft.sectorY(), lowerRight.sectorY())
@@ -547,7 +978,7 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.Subsector], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.Subsector, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if milieuData:
             for sector in milieuData.sectorList:
                 for subsector in sector.yieldSubsectors():
@@ -555,7 +986,7 @@ class Universe(object):
                         yield subsector
 
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
             if placeholderData:
                 for sector in placeholderData.sectorList:
                     sectorIndex = sector.index()
@@ -573,10 +1004,10 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.Subsector], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.Subsector, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         placeholderData = None
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
 
         startX, finishX = common.minmax(upperLeft.absoluteX(), lowerRight.absoluteX())
         startY, finishY = common.minmax(upperLeft.absoluteY(), lowerRight.absoluteY())
@@ -605,14 +1036,14 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.World], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.World, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if milieuData:
             for world in milieuData.worldPositionMap.values():
                 if not filterCallback or filterCallback(world):
                     yield world
 
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
             if placeholderData:
                 for sector in placeholderData.sectorList:
                     sectorIndex = sector.index()
@@ -630,29 +1061,18 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.World], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.World, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
-        placeholderData = None
-        if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
-
         startX, finishX = common.minmax(upperLeft.absoluteX(), lowerRight.absoluteX())
         startY, finishY = common.minmax(upperLeft.absoluteY(), lowerRight.absoluteY())
 
-        x = startX
-        while x <= finishX:
-            y = startY
-            while y <= finishY:
-                key = (x, y)
-                world = milieuData.worldPositionMap.get(key) if milieuData else None
-                if not world and placeholderData:
-                    sectorPos = multiverse.absoluteSpaceToSectorPos(key)
-                    if not milieuData or sectorPos not in milieuData.sectorIndexMap:
-                        world = placeholderData.worldPositionMap.get(key)
-
-                if world and ((not filterCallback) or filterCallback(world)):
-                    yield world
-                y += 1
-            x += 1
+        for _, _, world in self._gridWorldsInArea(
+                milieu=milieu,
+                startX=startX,
+                startY=startY,
+                finishX=finishX,
+                finishY=finishY,
+                includePlaceholders=includePlaceholders):
+            if (not filterCallback) or filterCallback(world):
+                yield world
 
     def yieldWorldsInRadius(
             self,
@@ -662,50 +1082,36 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.World], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.World, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         placeholderData = None
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
-
-        minLength = radius + 1
-        maxLength = (radius * 2) + 1
-        deltaLength = int(math.floor((maxLength - minLength) / 2))
-
-        centerX, centerY = center.absolute()
-        startX = centerX - radius
-        finishX = centerX + radius
-        startY = (centerY - radius) + deltaLength
-        finishY = (centerY + radius) - deltaLength
-        if (startX & 0b1) != 0:
-            startY += 1
-            if (radius & 0b1) != 0:
-                finishY -= 1
-        else:
-            if (radius & 0b1) != 0:
-                startY += 1
-            finishY -= 1
-        for x in range(startX, finishX + 1):
-            if (x & 0b1) != 0:
-                if x <= centerX:
-                    startY -= 1
-                else:
-                    finishY -= 1
-            else:
-                if x <= centerX:
-                    finishY += 1
-                else:
-                    startY += 1
-
-            for y in range(startY, finishY + 1):
-                key = (x, y)
-                world = milieuData.worldPositionMap.get(key) if milieuData else None
-                if not world and placeholderData:
-                    sectorPos = multiverse.absoluteSpaceToSectorPos(key)
-                    if not milieuData or sectorPos not in milieuData.sectorIndexMap:
-                        world = placeholderData.worldPositionMap.get(key)
-
-                if world and ((not filterCallback) or filterCallback(world)):
-                    yield world
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
+
+        if not placeholderData:
+            # Placeholder worlds aren't part of the jump graph so it can only
+            # be used when they're not needed
+            graph = self.jumpGraph(milieu=milieu, radius=radius)
+            if graph:
+                for world, _ in graph.yieldWorldsInRadius(center=center, radius=radius):
+                    if (not filterCallback) or filterCallback(world):
+                        yield world
+                return
+
+        # Get the worlds in the rectangle that bounds the radius then discard
+        # the ones in the corners that are further away than the radius
+        centerPos = center.absolute()
+        centerX, centerY = centerPos
+        for x, y, world in self._gridWorldsInArea(
+                milieu=milieu,
+                startX=centerX - radius,
+                startY=centerY - radius - 1,
+                finishX=centerX + radius,
+                finishY=centerY + radius + 1,
+                includePlaceholders=includePlaceholders):
+            if multiverse.absoluteHexDistance(centerPos, (x, y)) > radius:
+                continue
+            if (not filterCallback) or filterCallback(world):
+                yield world
 
     def yieldWorldsInFlood(
             self,
@@ -714,10 +1120,10 @@ class Universe(object):
             filterCallback: typing.Callable[[multiverse.World], bool] = None,
             includePlaceholders: bool = False
             ) -> typing.Generator[multiverse.World, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         placeholderData = None
         if includePlaceholders and self._placeholderMilieu and milieu is not self._placeholderMilieu:
-            placeholderData = self._milieuDataMap.get(self._placeholderMilieu)
+            placeholderData = self._milieuData(milieu=self._placeholderMilieu)
 
         key = hex.absolute()
         world = milieuData.worldPositionMap.get(key) if milieuData else None
@@ -731,24 +1137,28 @@ class Universe(object):
         if not filterCallback or filterCallback(world):
             yield world
 
-        todo = [world]
-        seen = set(todo)
+        # The flood is done with absolute positions and hex ids rather than
+        # hex positions to avoid creating an object for every hex checked
+        startPos = world.hex().absolute()
+        todo = collections.deque([startPos])
+        seen = {multiverse.absoluteSpaceToHexId(startPos)}
         while todo:
-            world = todo.pop(0)
-            hex = world.hex()
+            pos = todo.popleft()
             for edge in multiverse.HexEdge:
-                adjacentHex = hex.neighbourHex(edge=edge)
+                key = multiverse.neighbourAbsoluteHex(origin=pos, edge=edge)
+                hexId = multiverse.absoluteSpaceToHexId(key)
+                if hexId in seen:
+                    continue
 
-                key = adjacentHex.absolute()
                 adjacentWorld = milieuData.worldPositionMap.get(key) if milieuData else None
                 if not adjacentWorld and placeholderData:
                     sectorPos = multiverse.absoluteSpaceToSectorPos(key)
                     if not milieuData or sectorPos not in milieuData.sectorIndexMap:
                         adjacentWorld = placeholderData.worldPositionMap.get(key)
 
-                if adjacentWorld and (adjacentWorld not in seen):
-                    todo.append(adjacentWorld)
-                    seen.add(adjacentWorld)
+                if adjacentWorld:
+                    todo.append(key)
+                    seen.add(hexId)
 
                     if not filterCallback or filterCallback(adjacentWorld):
                         yield adjacentWorld
@@ -759,7 +1169,7 @@ class Universe(object):
             searchString: str,
             maxResults: int = 0 # 0 means unlimited
             ) -> typing.List[multiverse.World]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return []
 
@@ -778,6 +1188,7 @@ class Universe(object):
         except:
             pass
 
+        nameIndex = self._worldNameIndex(milieuData=milieuData)
         searchWorldLists = None
         result = self._WorldSearchPattern.match(searchString)
         filterString = searchString
@@ -798,10 +1209,16 @@ class Universe(object):
             if searchWorldLists:
                 filterString = worldString
 
-        if not searchWorldLists:
+        searchWorlds = None
+        if searchWorldLists:
+            searchWorlds = (world for worldList in searchWorldLists for world in worldList)
+        else:
             # Search the worlds in all sectors. This will happen if no sector/subsector is specified
-            # _or_ if the specified sector/subsector is unknown
-            searchWorldLists = milieuData.sectorList
+            # _or_ if the specified sector/subsector is unknown. The name index is used to limit
+            # the search to worlds that could match
+            searchWorlds = nameIndex.candidates(pattern=filterString)
+            if searchWorlds is None:
+                searchWorlds = (world for sector in milieuData.sectorList for world in sector)
 
         strictExpression = re.compile(
             fnmatch.translate(filterString),
@@ -815,15 +1232,13 @@ class Universe(object):
                 re.IGNORECASE)
 
         matches: typing.List[multiverse.World] = []
-        for worldList in searchWorldLists:
-            for world in worldList:
-                if strictExpression.match(world.name()):
-                    matches.append(world)
-                elif wildExpression and wildExpression.match(world.name()):
-                    matches.append(world)
-
-        matches.sort(
-            key=lambda world: f'{world.name()}/{world.subsectorName()}/{world.sectorName()}'.casefold())
+        for world in searchWorlds:
+            if strictExpression.match(world.name()):
+                matches.append(world)
+            elif wildExpression and wildExpression.match(world.name()):
+                matches.append(world)
+
+        nameIndex.sortItems(matches)
         if maxResults and len(matches) >= maxResults:
             return matches[:maxResults]
         seen = set(matches)
@@ -838,8 +1253,7 @@ class Universe(object):
                 if world not in seen:
                     subsectorMatches.append(world)
 
-        subsectorMatches.sort(
-            key=lambda world: f'{world.name()}/{world.subsectorName()}/{world.sectorName()}'.casefold())
+        nameIndex.sortItems(subsectorMatches)
         for world in subsectorMatches:
             matches.append(world)
             if maxResults and len(matches) >= maxResults:
@@ -854,8 +1268,7 @@ class Universe(object):
                 if world not in seen:
                     sectorMatches.append(world)
 
-        sectorMatches.sort(
-            key=lambda world: f'{world.name()}/{world.subsectorName()}/{world.sectorName()}'.casefold())
+        nameIndex.sortItems(sectorMatches)
         for world in sectorMatches:
             matches.append(world)
             if maxResults and len(matches) >= maxResults:
@@ -870,7 +1283,7 @@ class Universe(object):
             searchString: str,
             maxResults: int = 0 # 0 means unlimited
             ) -> typing.List[multiverse.Subsector]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return []
 
@@ -890,16 +1303,19 @@ class Universe(object):
                 fnmatch.translate(searchString + '*'),
                 re.IGNORECASE)
 
+        nameIndex = self._subsectorNameIndex(milieuData=milieuData)
+        searchSubsectors = nameIndex.candidates(pattern=searchString)
+        if searchSubsectors is None:
+            searchSubsectors = (subsector for sector in milieuData.sectorList for subsector in sector.subsectors())
+
         matches: typing.List[multiverse.Subsector] = []
-        for sector in milieuData.sectorList:
-            for subsector in sector.subsectors():
-                if strictExpression.match(subsector.name()):
-                    matches.append(subsector)
-                elif wildExpression and wildExpression.match(subsector.name()):
-                    matches.append(subsector)
-
-        matches.sort(
-            key=lambda subsector: f'{subsector.name()}/{subsector.sectorName()}'.casefold())
+        for subsector in searchSubsectors:
+            if strictExpression.match(subsector.name()):
+                matches.append(subsector)
+            elif wildExpression and wildExpression.match(subsector.name()):
+                matches.append(subsector)
+
+        nameIndex.sortItems(matches)
         if maxResults and len(matches) > maxResults:
             return matches[:maxResults]
 
@@ -911,7 +1327,7 @@ class Universe(object):
             searchString: str,
             maxResults: int = 0 # 0 means unlimited
             ) -> typing.List[multiverse.Sector]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return []
 
@@ -931,8 +1347,13 @@ class Universe(object):
                 fnmatch.translate(searchString + '*'),
                 re.IGNORECASE)
 
+        nameIndex = self._sectorNameIndex(milieuData=milieuData)
+        searchSectors = nameIndex.candidates(pattern=searchString)
+        if searchSectors is None:
+            searchSectors = milieuData.sectorList
+
         matches: typing.List[multiverse.Sector] = []
-        for sector in milieuData.sectorList:
+        for sector in searchSectors:
             if strictExpression.match(sector.name()):
                 matches.append(sector)
                 continue
@@ -954,7 +1375,7 @@ class Universe(object):
                     matches.append(sector)
                     continue
 
-        matches.sort(key=lambda sector: sector.name().casefold())
+        nameIndex.sortItems(matches)
         if maxResults and len(matches) > maxResults:
             return matches[:maxResults]
 
@@ -964,7 +1385,7 @@ class Universe(object):
             self,
             milieu: multiverse.Milieu
             ) -> typing.List[multiverse.Allegiance]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return []
         return list(milieuData.allegiances.values())
@@ -974,7 +1395,7 @@ class Universe(object):
             hex: multiverse.HexPosition,
             milieu: multiverse.Milieu
             ) -> bool:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return
         routes = milieuData.hexRoutesMap.get(hex)
@@ -992,7 +1413,7 @@ class Universe(object):
             hex: multiverse.HexPosition,
             milieu: multiverse.Milieu
             ) -> typing.Generator[multiverse.Route, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return
         routes = milieuData.hexRoutesMap.get(hex)
@@ -1012,7 +1433,7 @@ class Universe(object):
             hex: multiverse.HexPosition,
             milieu: multiverse.Milieu
             ) -> typing.Generator[multiverse.World, None, None]:
-        milieuData = self._milieuDataMap.get(milieu)
+        milieuData = self._milieuData(milieu=milieu)
         if not milieuData:
             return
         routes = milieuData.hexRoutesMap.get(hex)
@@ -1,3 +1,4 @@
+import common
 import enum
 import multiverse
 import typing
@@ -299,6 +300,12 @@ class UWP(object):
         _TechLevelStringMap
     ]
 
+    __slots__ = ('_string', '_sanitised')
+
+    # UWP objects are immutable so worlds with the same UWP string share a
+    # single instance, use intern rather than creating them directly
+    _internTable: common.InternTable[str, 'UWP'] = common.InternTable()
+
     def __init__(
             self,
             string: str
@@ -309,6 +316,13 @@ class UWP(object):
     def string(self) -> str:
         return self._string
 
+    @staticmethod
+    def intern(string: str) -> 'UWP':
+        return UWP._internTable.get(string, lambda: UWP(string))
+
+    def __reduce__(self):
+        return (UWP.intern, (self._string,))
+
     def sanitised(self) -> str:
         return self._sanitised
 
@@ -3,6 +3,12 @@ import multiverse
 import typing
 
 class World(object):
+    __slots__ = (
+        '_milieu', '_hex', '_name', '_isNameGenerated', '_sectorName',
+        '_subsectorName', '_allegiance', '_uwp', '_economics', '_culture',
+        '_nobilities', '_zone', '_remarks', '_isAnomaly', '_isFuelCache',
+        '_stellar', '_pbg', '_systemWorlds', '_bases')
+
     def __init__(
             self,
             milieu: multiverse.Milieu,
@@ -0,0 +1,89 @@
+import multiverse
+import typing
+
+# The world grid is a spatial index for the worlds in a milieu. Worlds are
+# bucketed by the subsector they're in so area queries only need to look at
+# the worlds in subsectors that overlap the area, rather than probing every
+# hex in the area to see if it contains a world. Most hexes don't contain a
+# world so this makes the cost of a query proportional to the number of
+# worlds in the area rather than the size of the area.
+# Each bucket holds (absoluteX, absoluteY, world) tuples sorted by position.
+# This object is immutable once created so is thread safe.
+class WorldGrid(object):
+    # Offsets to convert absolute coordinates to coordinates relative to the
+    # top left of the reference sector. This aligns buckets with subsectors
+    _OffsetX = multiverse.ReferenceHexX - 1
+    _OffsetY = multiverse.ReferenceHexY - 1
+
+    def __init__(
+            self,
+            worlds: typing.Iterable[multiverse.World]
+            ) -> None:
+        self._buckets: typing.Dict[
+            typing.Tuple[int, int], # Bucket position
+            typing.List[typing.Tuple[int, int, multiverse.World]]] = {}
+        for world in worlds:
+            x, y = world.hex().absolute()
+            bucketPos = WorldGrid._bucketPos(x, y)
+            bucket = self._buckets.get(bucketPos)
+            if bucket is None:
+                bucket = []
+                self._buckets[bucketPos] = bucket
+            bucket.append((x, y, world))
+        for bucket in self._buckets.values():
+            bucket.sort(key=lambda entry: (entry[0], entry[1]))
+
+    # Returns (absoluteX, absoluteY, world) tuples for the worlds in the area.
+    # The area bounds are inclusive. The returned list is NOT sorted. Buckets
+    # for subsectors in sectors contained in excludeSectors are skipped, the
+    # container should hold sector positions as returned by
+    # absoluteSpaceToSectorPos.
+    def worldsInArea(
+            self,
+            startX: int,
+            startY: int,
+            finishX: int,
+            finishY: int,
+            excludeSectors: typing.Optional[typing.Container[typing.Tuple[int, int]]] = None
+            ) -> typing.List[typing.Tuple[int, int, multiverse.World]]:
+        results = []
+        if not self._buckets:
+            return results
+
+        startBucketX, startBucketY = WorldGrid._bucketPos(startX, startY)
+        finishBucketX, finishBucketY = WorldGrid._bucketPos(finishX, finishY)
+        for bucketX in range(startBucketX, finishBucketX + 1):
+            # Buckets in the middle of the range are completely contained in
+            # the area on this axis so the worlds in them don't need checking
+            bucketLeft = (bucketX * multiverse.SubsectorWidth) - WorldGrid._OffsetX
+            bucketRight = bucketLeft + multiverse.SubsectorWidth - 1
+            containedX = bucketLeft >= startX and bucketRight <= finishX
+            sectorX = bucketX // multiverse.HorzSubsectorsPerSector
+
+            for bucketY in range(startBucketY, finishBucketY + 1):
+                bucket = self._buckets.get((bucketX, bucketY))
+                if not bucket:
+                    continue
+
+                if excludeSectors is not None:
+                    sectorY = bucketY // multiverse.VertSubsectorPerSector
+                    if (sectorX, sectorY) in excludeSectors:
+                        continue
+
+                bucketTop = (bucketY * multiverse.SubsectorHeight) - WorldGrid._OffsetY
+                bucketBottom = bucketTop + multiverse.SubsectorHeight - 1
+                if containedX and bucketTop >= startY and bucketBottom <= finishY:
+                    results.extend(bucket)
+                else:
+                    for entry in bucket:
+                        x = entry[0]
+                        y = entry[1]
+                        if startX <= x <= finishX and startY <= y <= finishY:
+                            results.append(entry)
+        return results
+
+    @staticmethod
+    def _bucketPos(x: int, y: int) -> typing.Tuple[int, int]:
+        return (
+            (x + WorldGrid._OffsetX) // multiverse.SubsectorWidth,
+            (y + WorldGrid._OffsetY) // multiverse.SubsectorHeight)
@@ -1,9 +1,14 @@
 import common
+import concurrent.futures
 import re
 import logging
+import multiprocessing
 import multiverse
+import pickle
 import threading
+import traceback
 import typing
+import weakref
 
 class _AllegianceCodeInfo(object):
     def __init__(
@@ -342,6 +347,67 @@ class _AllegianceTracker(object):
             milieuData[code] = codeInfo
         return codeInfo
 
+# The details of a sector to be loaded by _loadSectorChunk. The metadata is
+# parsed up front as it's needed for the allegiance pre-pass but the sector
+# file is read and parsed by whatever process loads the sector.
+_SectorLoadTask = typing.Tuple[
+    multiverse.Milieu,
+    str, # Canonical sector name
+    multiverse.SectorFormat,
+    multiverse.RawMetadata,
+    bool # True if sector is a custom sector
+]
+
+# Called with the milieu and index of a sector that has been changed by
+# WorldManager.reloadSector
+SectorChangedListener = typing.Callable[[multiverse.Milieu, multiverse.SectorIndex], typing.Any]
+
+# Per worker process state for parallel sector loading, set up by
+# _initialiseSectorLoadWorker
+_workerAllegianceTracker: typing.Optional[_AllegianceTracker] = None
+
+def _initialiseSectorLoadWorker(
+        installDir: str,
+        overlayDir: str,
+        customDir: str,
+        cacheDir: typing.Optional[str],
+        allegianceTrackerData: bytes
+        ) -> None:
+    global _workerAllegianceTracker
+    _workerAllegianceTracker = pickle.loads(allegianceTrackerData)
+
+    multiverse.DataStore.setSectorDirs(
+        installDir=installDir,
+        overlayDir=overlayDir,
+        customDir=customDir,
+        cacheDir=cacheDir)
+
+# Load a chunk of sectors in a worker process. The serialised sector or the
+# error that prevented it from being loaded is returned for each task in the
+# chunk. Sectors are returned serialised so the main process can write the
+# same data to the sector cache rather than serialising them again. Errors
+# are returned as formatted strings as not all exceptions can be pickled.
+def _loadSectorChunk(
+        tasks: typing.Sequence[_SectorLoadTask]
+        ) -> typing.List[typing.Tuple[
+            typing.Optional[bytes],
+            typing.Optional[str]]]:
+    results = []
+    with common.GarbageCollectionDisabled():
+        for milieu, canonicalName, sectorFormat, rawMetadata, isCustom in tasks:
+            try:
+                sector = WorldManager._loadSector(
+                    milieu=milieu,
+                    canonicalName=canonicalName,
+                    sectorFormat=sectorFormat,
+                    rawMetadata=rawMetadata,
+                    isCustom=isCustom,
+                    allegianceTracker=_workerAllegianceTracker)
+                results.append((WorldManager._serialiseSector(sector=sector), None))
+            except Exception:
+                results.append((None, traceback.format_exc()))
+    return results
+
 # This object is thread safe, however the world objects are only thread safe
 # as they are currently read only (i.e. once loaded they never change).
 class WorldManager(object):
@@ -361,9 +427,39 @@ class WorldManager(object):
     # Use with `_WrapPattern.sub('\n', label)` to  replace
     _LineWrapPattern = re.compile(r'\s+(?![a-z])')
 
+    # Increment this when a change is made that affects the content of
+    # processed sectors (e.g. a parser or _processSector change) so any
+    # cached sectors are regenerated
+    _SectorCacheFormatVersion = 5
+
+    # Sectors that aren't cached are parsed and processed in a pool of worker
+    # processes if there are enough of them to make it worth starting the
+    # workers. Sectors are sent to workers in chunks to reduce the overhead
+    # of passing them between processes
+    _MaxLoadWorkerCount = 8
+    _MinParallelSectorCount = 32
+    _ParallelChunkSize = 4
+
     _instance = None # Singleton instance
     _lock = threading.Lock()
     _universe: multiverse.Universe = None
+    _lazyLoading = False
+    _loadWorkerCount = None
+    # Incremented each time the universe is (re)loaded or updated so users
+    # of data derived from it can tell if it needs to be regenerated
+    _universeVersion = 0
+    _listenerLock = threading.Lock()
+    _sectorChangedListeners: typing.List[typing.Callable[[], typing.Optional[SectorChangedListener]]] = []
+    _landmarkLock = threading.Lock()
+    _landmarkTables: typing.Dict[
+        typing.Tuple[multiverse.Milieu, int],
+        multiverse.LandmarkTable] = {}
+    # Tables that are currently being built in the background. Each build is
+    # given a token so a build that was started before the tables were
+    # cleared doesn't store a table for a graph that is no longer in use
+    _landmarkBuilds: typing.Dict[
+        typing.Tuple[multiverse.Milieu, int],
+        object] = {}
 
     def __init__(self) -> None:
         raise RuntimeError('Call instance() instead')
@@ -378,6 +474,30 @@ class WorldManager(object):
                     cls._instance = cls.__new__(cls)
         return cls._instance
 
+    # When lazy loading is enabled, loadSectors only loads the placeholder
+    # milieu. Other milieu are loaded the first time they're accessed so
+    # startup time and memory usage only depend on the milieu that are
+    # actually used. This must be called before the sectors are loaded.
+    @staticmethod
+    def setLazyLoading(enabled: bool) -> None:
+        if WorldManager._instance and WorldManager._instance.universe():
+            raise RuntimeError('You can\'t set lazy loading after the sectors have been loaded')
+        WorldManager._lazyLoading = enabled
+
+    def isLazyLoading(self) -> bool:
+        return WorldManager._lazyLoading
+
+    # Set the number of worker processes used to load sectors. A count of
+    # less than 2 means sectors are always loaded in process.
+    @staticmethod
+    def setLoadWorkerCount(count: int) -> None:
+        WorldManager._loadWorkerCount = count
+
+    def loadWorkerCount(self) -> int:
+        if WorldManager._loadWorkerCount is not None:
+            return WorldManager._loadWorkerCount
+        return min(multiprocessing.cpu_count(), WorldManager._MaxLoadWorkerCount)
+
     def loadSectors(
             self,
             progressCallback: typing.Optional[typing.Callable[[str, int, int], typing.Any]] = None
@@ -397,93 +517,31 @@ class WorldManager(object):
                 # weren't loaded and the point it acquired the mutex.
                 return
 
-            totalSectorCount = 0
-            for milieu in multiverse.Milieu:
-                totalSectorCount += multiverse.DataStore.instance().sectorCount(milieu=milieu)
-
-            maxProgress = totalSectorCount * 2
-            currentProgress = 0
-
-            rawData: typing.List[typing.Tuple[
-                multiverse.Milieu,
-                multiverse.RawMetadata,
-                typing.Iterable[multiverse.RawWorld],
-                bool # True if sector is a custom sector
-                ]] = []
-            for milieu in multiverse.Milieu:
-                for sectorInfo in multiverse.DataStore.instance().sectors(milieu=milieu):
-                    canonicalName = sectorInfo.canonicalName()
-                    logging.debug(f'Loading sector {canonicalName}')
-
-                    if progressCallback:
-                        stage = f'Loading: {milieu.value} - {canonicalName}'
-                        currentProgress += 1
-                        progressCallback(stage, currentProgress, maxProgress)
-
-                    try:
-                        metadataContent = multiverse.DataStore.instance().sectorMetaData(
-                            sectorName=canonicalName,
-                            milieu=milieu)
-
-                        sectorContent = multiverse.DataStore.instance().sectorFileData(
-                            sectorName=canonicalName,
-                            milieu=milieu)
-
-                        rawMetadata = multiverse.readMetadata(
-                            content=metadataContent,
-                            format=sectorInfo.metadataFormat(),
-                            identifier=canonicalName)
-
-                        rawWorlds = multiverse.readSector(
-                            content=sectorContent,
-                            format=sectorInfo.sectorFormat(),
-                            identifier=canonicalName)
-
-                        rawData.append((milieu, rawMetadata, rawWorlds, sectorInfo.isCustomSector()))
-                    except Exception as ex:
-                        logging.error(f'Failed to load sector {canonicalName} in {milieu.value}', exc_info=ex)
-                        continue
-
-            # Generate allegiances for all sectors before processing them. This is
-            # done so that any disambiguation that is needed can be done prior to
-            # worlds being created as the unique disambiguated name is part of their
-            # construction
-            allegianceTracker = _AllegianceTracker()
-            for milieu, rawMetadata, _, _ in rawData:
-                canonicalName = rawMetadata.canonicalName()
-                logging.debug(f'Populating allegiances for sector {canonicalName}')
-                WorldManager._populateAllegiances(
-                    milieu=milieu,
-                    rawMetadata=rawMetadata,
-                    tracker=allegianceTracker)
-
-            sectors = []
-            for milieu, rawMetadata, rawWorlds, isCustom in rawData:
-                canonicalName = rawMetadata.canonicalName()
-                logging.debug(f'Processing sector {canonicalName}')
-
-                if progressCallback:
-                    stage = f'Processing: {milieu.value} - {canonicalName}'
-                    currentProgress += 1
-                    progressCallback(stage, currentProgress, maxProgress)
-
-                try:
-                    sector = self._processSector(
-                        milieu=milieu,
-                        rawMetadata=rawMetadata,
-                        rawWorlds=rawWorlds,
-                        allegianceTracker=allegianceTracker,
-                        isCustom=isCustom)
-                except Exception as ex:
-                    logging.error(f'Failed to process sector {canonicalName} in {milieu.value}', exc_info=ex)
-                    continue
-
-                logging.debug(f'Loaded {sector.worldCount()} worlds for sector {canonicalName} in {milieu.value}')
-                sectors.append(sector)
-
-            self._universe = multiverse.Universe(
+            if WorldManager._lazyLoading:
+                # Only the placeholder milieu is loaded up front as it's used
+                # to fill in gaps in all other milieu. Other milieu are loaded
+                # by the universe the first time they're used
+                loadMilieu = [WorldManager._PlaceholderMilieu]
+            else:
+                loadMilieu = list(multiverse.Milieu)
+
+            # Sectors are made up of a huge number of small objects, garbage
+            # collection is disabled while they're loaded as otherwise the
+            # collector repeatedly scans them as they're created. This more
+            # than halves the time taken to load. The sectors live for the
+            # lifetime of the app so they're frozen to stop the collector
+            # scanning them in future
+            with common.GarbageCollectionDisabled(freeze=True):
+                sectors = self._loadMilieuSectors(
+                    milieuList=loadMilieu,
+                    progressCallback=progressCallback)
+
+            universe = multiverse.Universe(
                 sectors=sectors,
-                placeholderMilieu=WorldManager._PlaceholderMilieu)
+                placeholderMilieu=WorldManager._PlaceholderMilieu,
+                sectorLoader=self._loadLazyMilieu if WorldManager._lazyLoading else None,
+                mainTableLoader=self._loadMainTable)
+            self._setUniverse(universe=universe)
 
     def createSectorUniverse(
             self,
@@ -529,6 +587,102 @@ class WorldManager(object):
     def universe(self) -> multiverse.Universe:
         return self._universe
 
+    def universeVersion(self) -> int:
+        return self._universeVersion
+
+    # Update the universe after the sector at the specified position has
+    # changed in the data store (e.g. a custom sector has been created or
+    # deleted). Rather than reloading the entire universe, only the sector at
+    # that position is reloaded, or removed if the data store no longer has a
+    # sector there. The unique codes of allegiances depend on the names all
+    # sectors in the milieu use for them so any other sectors where the
+    # unique codes have changed are also reloaded. Once the universe has been
+    # updated, sector changed listeners are notified about each sector that
+    # changed. Listeners are notified even if the milieu hasn't been loaded
+    # yet as they may hold data for it that was persisted by a previous
+    # session. An exception is raised if the sector can't be loaded, in which
+    # case the universe isn't updated.
+    def reloadSector(
+            self,
+            milieu: multiverse.Milieu,
+            sectorX: int,
+            sectorY: int
+            ) -> None:
+        index = multiverse.SectorIndex(sectorX=sectorX, sectorY=sectorY)
+        with self._lock:
+            universe = self._universe
+            if not universe:
+                return
+
+            if universe.isMilieuLoaded(milieu=milieu):
+                changedIndices = self._reloadMilieuSectors(
+                    universe=universe,
+                    milieu=milieu,
+                    index=index)
+            else:
+                # Nothing to update, the sector will be read from the data
+                # store when the milieu is loaded. The version is still
+                # updated as anything holding its own copy of the data store
+                # contents (e.g. trader worker processes) is now out of date
+                changedIndices = [index]
+                self._universeVersion += 1
+
+            # Sectors from the placeholder milieu are also shown in any
+            # other milieu that doesn't have its own sector at that position.
+            # Milieu that haven't been loaded are checked using the data
+            # store so they don't need to be loaded
+            changes = [(milieu, changedIndex) for changedIndex in changedIndices]
+            if milieu is WorldManager._PlaceholderMilieu:
+                for otherMilieu in multiverse.Milieu:
+                    if otherMilieu is milieu:
+                        continue
+                    isLoaded = universe.isMilieuLoaded(milieu=otherMilieu)
+                    for changedIndex in changedIndices:
+                        if isLoaded:
+                            hasSector = universe.sectorBySectorIndex(
+                                milieu=otherMilieu,
+                                index=changedIndex) is not None
+                        else:
+                            hasSector = multiverse.DataStore.instance().sectorAt(
+                                sectorX=changedIndex.sectorX(),
+                                sectorY=changedIndex.sectorY(),
+                                milieu=otherMilieu) is not None
+                        if not hasSector:
+                            changes.append((otherMilieu, changedIndex))
+
+        # Listeners are notified without the lock held so they're free to
+        # access the universe
+        for changedMilieu, changedIndex in changes:
+            for listener in self._liveSectorChangedListeners():
+                try:
+                    listener(changedMilieu, changedIndex)
+                except Exception as ex:
+                    logging.error('Sector changed listener failed', exc_info=ex)
+
+    # Register a listener that is called for each sector that's changed by
+    # reloadSector. Listeners are called from the thread that reloaded the
+    # sector. Bound methods are held by weak reference so registering a
+    # listener doesn't stop the object it belongs to being destroyed.
+    def addSectorChangedListener(
+            self,
+            listener: SectorChangedListener
+            ) -> None:
+        if hasattr(listener, '__self__'):
+            listenerRef = weakref.WeakMethod(listener)
+        else:
+            listenerRef = lambda: listener
+        with self._listenerLock:
+            WorldManager._sectorChangedListeners.append(listenerRef)
+
+    def removeSectorChangedListener(
+            self,
+            listener: SectorChangedListener
+            ) -> None:
+        with self._listenerLock:
+            WorldManager._sectorChangedListeners = [
+                listenerRef for listenerRef in WorldManager._sectorChangedListeners
+                if listenerRef() not in (None, listener)]
+
     def sectorNames(
             self,
             milieu: multiverse.Milieu
@@ -748,6 +902,100 @@ class WorldManager(object):
             milieu=milieu,
             hex=hex)
 
+    def mainTable(
+            self,
+            milieu: multiverse.Milieu
+            ) -> typing.Optional[multiverse.MainTable]:
+        return self._universe.mainTable(milieu=milieu)
+
+    def jumpGraph(
+            self,
+            milieu: multiverse.Milieu,
+            radius: int
+            ) -> typing.Optional[multiverse.JumpGraph]:
+        return self._universe.jumpGraph(
+            milieu=milieu,
+            radius=radius)
+
+    def worldTable(
+            self,
+            milieu: multiverse.Milieu
+            ) -> typing.Optional[multiverse.WorldTable]:
+        return self._universe.worldTable(milieu=milieu)
+
+    # Returns the landmark table for the specified milieu and jump radius. The
+    # table is loaded from the cache if possible, if not it's generated in the
+    # background and written to the cache. Generating a table can take several
+    # seconds so None is returned until it's ready, callers should fall back
+    # to a hex distance estimate in that case. None is also returned if the
+    # radius is to large for there to be a jump graph.
+    def landmarkTable(
+            self,
+            milieu: multiverse.Milieu,
+            radius: int
+            ) -> typing.Optional[multiverse.LandmarkTable]:
+        key = (milieu, radius)
+        table = self._landmarkTables.get(key)
+        if table:
+            return table
+
+        # The jump graph is fetched before taking the lock as it may need to
+        # be generated. The universe version is read first so a graph from a
+        # universe that is replaced before the lock is acquired isn't used
+        universeVersion = self._universeVersion
+        graph = self._universe.jumpGraph(milieu=milieu, radius=radius)
+        if not graph:
+            return None
+
+        with self._landmarkLock:
+            if universeVersion != self._universeVersion:
+                return None # Universe changed while getting the graph
+
+            # Recheck as another thread could have created the table between
+            # the first check and the lock being acquired
+            table = self._landmarkTables.get(key)
+            if table:
+                return table
+            if key in self._landmarkBuilds:
+                return None # Table is still being loaded or generated
+
+            token = object()
+            self._landmarkBuilds[key] = token
+
+        cacheFileName = f'landmarks_{milieu.value}_j{radius}.dat'
+        cacheData = multiverse.DataStore.instance().readCacheFile(
+            fileName=cacheFileName,
+            formatVersion=multiverse.LandmarkTable.FormatVersion)
+        if cacheData:
+            try:
+                table = multiverse.LandmarkTable.fromBytes(
+                    graph=graph,
+                    data=cacheData)
+            except Exception as ex:
+                logging.warning(
+                    f'Failed to load cached landmark table for {milieu.value} jump-{radius}',
+                    exc_info=ex)
+
+        if table:
+            with self._landmarkLock:
+                if self._landmarkBuilds.get(key) is not token:
+                    return None # Tables were cleared while loading
+                del self._landmarkBuilds[key]
+                self._landmarkTables[key] = table
+            return table
+
+        thread = threading.Thread(
+            target=self._buildLandmarkTable,
+            kwargs={
+                'key': key,
+                'graph': graph,
+                'cacheFileName': cacheFileName,
+                'token': token},
+            name=f'LandmarkTable-{milieu.value}-J{radius}',
+            daemon=True)
+        thread.start()
+        return None
+
     def yieldSectors(
             self,
             milieu: multiverse.Milieu,
@@ -887,6 +1135,475 @@ class WorldManager(object):
             searchString=searchString,
             maxResults=maxResults)
 
+    # Return the registered sector changed listeners, discarding any that
+    # have been destroyed
+    def _liveSectorChangedListeners(self) -> typing.List[SectorChangedListener]:
+        with self._listenerLock:
+            listeners = []
+            listenerRefs = []
+            for listenerRef in WorldManager._sectorChangedListeners:
+                listener = listenerRef()
+                if listener is not None:
+                    listeners.append(listener)
+                    listenerRefs.append(listenerRef)
+            WorldManager._sectorChangedListeners = listenerRefs
+        return listeners
+
+    # Reload the sector at the specified index, along with any other sectors
+    # in the milieu whose allegiance codes have changed as a result, and
+    # return the indices of the sectors that were updated. This must be
+    # called with the lock held
+    def _reloadMilieuSectors(
+            self,
+            universe: multiverse.Universe,
+            milieu: multiverse.Milieu,
+            index: multiverse.SectorIndex
+            ) -> typing.List[multiverse.SectorIndex]:
+        # The allegiance tracker needs the metadata for all sectors in the
+        # milieu, but only the changed sectors are parsed
+        allegianceTracker = _AllegianceTracker()
+        sectorMap: typing.Dict[
+            typing.Tuple[int, int], # Sector position
+            typing.Tuple[multiverse.SectorInfo, multiverse.RawMetadata]] = {}
+        for sectorInfo in multiverse.DataStore.instance().sectors(milieu=milieu):
+            canonicalName = sectorInfo.canonicalName()
+            try:
+                metadataContent = multiverse.DataStore.instance().sectorMetaData(
+                    sectorName=canonicalName,
+                    milieu=milieu)
+
+                rawMetadata = multiverse.readMetadata(
+                    content=metadataContent,
+                    format=sectorInfo.metadataFormat(),
+                    identifier=canonicalName)
+            except Exception as ex:
+                logging.error(f'Failed to load sector {canonicalName} in {milieu.value}', exc_info=ex)
+                continue
+
+            WorldManager._populateAllegiances(
+                milieu=milieu,
+                rawMetadata=rawMetadata,
+                tracker=allegianceTracker)
+            sectorMap[(sectorInfo.x(), sectorInfo.y())] = (sectorInfo, rawMetadata)
+
+        reloadIndices = [index]
+        for sector in universe.yieldSectors(milieu=milieu):
+            if sector.index() != index and not WorldManager._hasCurrentAllegiances(
+                    milieu=milieu,
+                    sector=sector,
+                    allegianceTracker=allegianceTracker):
+                reloadIndices.append(sector.index())
+
+        updatedSectors: typing.Dict[
+            multiverse.SectorIndex,
+            typing.Optional[multiverse.Sector]] = {}
+        for reloadIndex in reloadIndices:
+            sector = None
+            sectorDetails = sectorMap.get(reloadIndex.elements())
+            if sectorDetails:
+                sectorInfo, rawMetadata = sectorDetails
+                logging.debug(f'Reloading sector {sectorInfo.canonicalName()} in {milieu.value}')
+                sector = WorldManager._loadSector(
+                    milieu=milieu,
+                    canonicalName=sectorInfo.canonicalName(),
+                    sectorFormat=sectorInfo.sectorFormat(),
+                    rawMetadata=rawMetadata,
+                    isCustom=sectorInfo.isCustomSector(),
+                    allegianceTracker=allegianceTracker)
+            updatedSectors[reloadIndex] = sector
+
+        universe.updateSectors(milieu=milieu, sectors=updatedSectors)
+
+        # Tables being built for the milieu are dropped as well as built
+        # tables, as they're being built from the previous jump graph
+        with self._landmarkLock:
+            for key in list(self._landmarkTables.keys()):
+                tableMilieu, _ = key
+                if tableMilieu is milieu:
+                    del self._landmarkTables[key]
+            for key in list(self._landmarkBuilds.keys()):
+                tableMilieu, _ = key
+                if tableMilieu is milieu:
+                    del self._landmarkBuilds[key]
+            self._universeVersion += 1
+
+        return list(updatedSectors.keys())
+
+    # Replace the universe and discard anything derived from the previous
+    # universe. This must be called with the lock held
+    def _setUniverse(
+            self,
+            universe: multiverse.Universe
+            ) -> None:
+        self._universe = universe
+        # The version is updated with the landmark lock held so landmarkTable
+        # can't start building a table for the previous universe
+        with self._landmarkLock:
+            self._landmarkTables.clear()
+            self._landmarkBuilds.clear()
+            self._universeVersion += 1
+
+    def _buildLandmarkTable(
+            self,
+            key: typing.Tuple[multiverse.Milieu, int],
+            graph: multiverse.JumpGraph,
+            cacheFileName: str,
+            token: object
+            ) -> None:
+        milieu, radius = key
+        logging.debug(f'Generating landmark table for {milieu.value} jump-{radius}')
+        try:
+            table = multiverse.LandmarkTable.build(graph=graph)
+        except Exception as ex:
+            logging.error(
+                f'Failed to generate landmark table for {milieu.value} jump-{radius}',
+                exc_info=ex)
+            table = None
+
+        with self._landmarkLock:
+            if self._landmarkBuilds.get(key) is not token:
+                return # Tables were cleared while generating
+            del self._landmarkBuilds[key]
+            if not table:
+                return
+            self._landmarkTables[key] = table
+
+            # Write the cache while holding the lock so the file can't be
+            # stamped with the timestamps of a universe loaded after the
+            # table was generated
+            multiverse.DataStore.instance().writeCacheFile(
+                fileName=cacheFileName,
+                formatVersion=multiverse.LandmarkTable.FormatVersion,
+                data=table.toBytes())
+
+    # Load the processed sectors for the specified milieu, either from the
+    # sector cache or by parsing the sector files.
+    def _loadMilieuSectors(
+            self,
+            milieuList: typing.Collection[multiverse.Milieu],
+            progressCallback: typing.Optional[typing.Callable[[str, int, int], typing.Any]] = None
+            ) -> typing.List[multiverse.Sector]:
+        totalSectorCount = 0
+        for milieu in milieuList:
+            totalSectorCount += multiverse.DataStore.instance().sectorCount(milieu=milieu)
+
+        maxProgress = totalSectorCount * 2
+        currentProgress = 0
+
+        # Load the processed sectors for each milieu from the cache if
+        # possible. Only milieu that aren't cached need to be parsed
+        milieuSectors: typing.Dict[multiverse.Milieu, typing.List[multiverse.Sector]] = {}
+        for milieu in milieuList:
+            sectors = WorldManager._readCachedSectors(milieu=milieu)
+            if sectors is None:
+                continue
+            milieuSectors[milieu] = sectors
+
+            if progressCallback:
+                stage = f'Loading: {milieu.value} - Cached Sectors'
+                currentProgress += multiverse.DataStore.instance().sectorCount(milieu=milieu) * 2
+                progressCallback(stage, currentProgress, maxProgress)
+
+        loadTasks: typing.List[_SectorLoadTask] = []
+        for milieu in milieuList:
+            if milieu in milieuSectors:
+                continue # Loaded from cache
+
+            for sectorInfo in multiverse.DataStore.instance().sectors(milieu=milieu):
+                canonicalName = sectorInfo.canonicalName()
+                logging.debug(f'Loading sector {canonicalName}')
+
+                if progressCallback:
+                    stage = f'Loading: {milieu.value} - {canonicalName}'
+                    currentProgress += 1
+                    progressCallback(stage, currentProgress, maxProgress)
+
+                try:
+                    metadataContent = multiverse.DataStore.instance().sectorMetaData(
+                        sectorName=canonicalName,
+                        milieu=milieu)
+
+                    rawMetadata = multiverse.readMetadata(
+                        content=metadataContent,
+                        format=sectorInfo.metadataFormat(),
+                        identifier=canonicalName)
+
+                    loadTasks.append((
+                        milieu,
+                        canonicalName,
+                        sectorInfo.sectorFormat(),
+                        rawMetadata,
+                        sectorInfo.isCustomSector()))
+                except Exception as ex:
+                    logging.error(f'Failed to load sector {canonicalName} in {milieu.value}', exc_info=ex)
+                    continue
+
+        # Generate allegiances for all sectors before processing them. This is
+        # done so that any disambiguation that is needed can be done prior to
+        # worlds being created as the unique disambiguated name is part of their
+        # construction. The tracker isn't needed if all sectors were loaded from
+        # the cache
+        allegianceTracker = _AllegianceTracker() if loadTasks else None
+        for milieu, _, _, rawMetadata, _ in loadTasks:
+            canonicalName = rawMetadata.canonicalName()
+            logging.debug(f'Populating allegiances for sector {canonicalName}')
+            WorldManager._populateAllegiances(
+                milieu=milieu,
+                rawMetadata=rawMetadata,
+                tracker=allegianceTracker)
+
+        # Sectors are yielded in the order of the tasks no matter how they're
+        # loaded so the results are the same whether or not they're loaded
+        # in parallel
+        cacheData: typing.Dict[multiverse.Milieu, typing.Optional[typing.List[bytes]]] = {}
+        for (milieu, canonicalName, _, _, _), sector, sectorData in self._yieldLoadedSectors(
+                loadTasks=loadTasks,
+                allegianceTracker=allegianceTracker):
+            logging.debug(f'Processing sector {canonicalName}')
+
+            if progressCallback:
+                stage = f'Processing: {milieu.value} - {canonicalName}'
+                currentProgress += 1
+                progressCallback(stage, currentProgress, maxProgress)
+
+            sectors = milieuSectors.get(milieu)
+            if sectors is None:
+                sectors = []
+                milieuSectors[milieu] = sectors
+                cacheData[milieu] = []
+
+            if sector is None:
+                continue # Failed to load, the error has already been logged
+
+            logging.debug(f'Loaded {sector.worldCount()} worlds for sector {canonicalName} in {milieu.value}')
+            sectors.append(sector)
+
+            milieuCacheData = cacheData[milieu]
+            if milieuCacheData is None:
+                continue # Milieu can't be cached
+
+            if sectorData is None:
+                try:
+                    sectorData = WorldManager._serialiseSector(sector=sector)
+                except Exception as ex:
+                    logging.warning(f'Failed to serialise sector {canonicalName} in {milieu.value}', exc_info=ex)
+                    cacheData[milieu] = None
+                    continue
+            milieuCacheData.append(sectorData)
+
+        for milieu, milieuCacheData in cacheData.items():
+            if milieuCacheData is not None:
+                WorldManager._writeCachedSectors(
+                    milieu=milieu,
+                    sectorData=milieuCacheData)
+
+        # Sectors are returned in milieu order, the same order they would be
+        # in if they were all loaded from files
+        sectors = []
+        for milieu in milieuList:
+            sectors.extend(milieuSectors.get(milieu, []))
+        return sectors
+
+    # Called by the universe to load a milieu the first time it's accessed
+    # when lazy loading is enabled. This may be called from any thread, the
+    # universe makes sure only one milieu is loaded at a time. Unlike the
+    # initial load, garbage collection is left alone as other threads are
+    # running. Disabling it is process wide and freezing would also freeze
+    # whatever short lived objects those threads have at the time.
+    def _loadLazyMilieu(
+            self,
+            milieu: multiverse.Milieu
+            ) -> typing.List[multiverse.Sector]:
+        logging.info(f'Loading sectors for {milieu.value}')
+        return self._loadMilieuSectors(milieuList=[milieu])
+
+    # Load the main table for a milieu from the cache if possible, if not
+    # it's generated and written to the cache. This is called by the universe
+    # the first time the mains for a milieu are needed.
+    def _loadMainTable(
+            self,
+            milieu: multiverse.Milieu,
+            worlds: typing.Collection[multiverse.World]
+            ) -> multiverse.MainTable:
+        cacheFileName = f'mains_{milieu.value}.dat'
+        cacheData = multiverse.DataStore.instance().readCacheFile(
+            fileName=cacheFileName,
+            formatVersion=multiverse.MainTable.FormatVersion)
+        if cacheData:
+            try:
+                return multiverse.MainTable.fromBytes(
+                    worlds=worlds,
+                    data=cacheData)
+            except Exception as ex:
+                logging.warning(
+                    f'Failed to load cached main table for {milieu.value}',
+                    exc_info=ex)
+
+        logging.debug(f'Generating main table for {milieu.value}')
+        table = multiverse.MainTable.build(worlds=worlds)
+        multiverse.DataStore.instance().writeCacheFile(
+            fileName=cacheFileName,
+            formatVersion=multiverse.MainTable.FormatVersion,
+            data=table.toBytes())
+        return table
+
+    # Yield each load task along with the sector loaded for it and, if it's
+    # available, the serialised sector. The sector will be None if it couldn't
+    # be loaded. Tasks are yielded in order.
+    def _yieldLoadedSectors(
+            self,
+            loadTasks: typing.Sequence[_SectorLoadTask],
+            allegianceTracker: _AllegianceTracker
+            ) -> typing.Generator[
+                typing.Tuple[
+                    _SectorLoadTask,
+                    typing.Optional[multiverse.Sector],
+                    typing.Optional[bytes]],
+                None,
+                None]:
+        nextIndex = 0
+        if self.loadWorkerCount() > 1 and len(loadTasks) >= WorldManager._MinParallelSectorCount:
+            try:
+                for task, sector, sectorData in self._yieldParallelLoadedSectors(
+                        loadTasks=loadTasks,
+                        allegianceTracker=allegianceTracker):
+                    nextIndex += 1
+                    yield (task, sector, sectorData)
+            except concurrent.futures.process.BrokenProcessPool as ex:
+                # A worker died or the pool couldn't be started. Fall back to
+                # loading any remaining sectors in process
+                logging.warning('Sector load worker process failed, loading remaining sectors in process', exc_info=ex)
+
+        for task in loadTasks[nextIndex:]:
+            milieu, canonicalName, sectorFormat, rawMetadata, isCustom = task
+            try:
+                sector = WorldManager._loadSector(
+                    milieu=milieu,
+                    canonicalName=canonicalName,
+                    sectorFormat=sectorFormat,
+                    rawMetadata=rawMetadata,
+                    isCustom=isCustom,
+                    allegianceTracker=allegianceTracker)
+            except Exception as ex:
+                logging.error(f'Failed to load sector {canonicalName} in {milieu.value}', exc_info=ex)
+                sector = None
+            yield (task, sector, None)
+
+    def _yieldParallelLoadedSectors(
+            self,
+            loadTasks: typing.Sequence[_SectorLoadTask],
+            allegianceTracker: _AllegianceTracker
+            ) -> typing.Generator[
+                typing.Tuple[
+                    _SectorLoadTask,
+                    typing.Optional[multiverse.Sector],
+                    typing.Optional[bytes]],
+                None,
+                None]:
+        chunkSize = WorldManager._ParallelChunkSize
+        chunks = [loadTasks[index:index + chunkSize] for index in range(0, len(loadTasks), chunkSize)]
+        workerCount = min(self.loadWorkerCount(), len(chunks))
+        logging.info(f'Loading {len(loadTasks)} sectors with {workerCount} worker processes')
+
+        # The allegiance tracker is fully populated before the workers are
+        # started so each worker gets an identical copy of it. Workers only
+        # read from the tracker so the sectors they generate are the same as
+        # they would be if they were loaded in process. Workers are always
+        # spawned rather than forked as the main process may have Qt threads
+        # running
+        installDir, overlayDir, customDir, cacheDir = multiverse.DataStore.sectorDirs()
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workerCount,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_initialiseSectorLoadWorker,
+                initargs=(
+                    installDir,
+                    overlayDir,
+                    customDir,
+                    cacheDir,
+                    pickle.dumps(allegianceTracker, protocol=pickle.HIGHEST_PROTOCOL))) as executor:
+            # Results are returned in the order the chunks were submitted
+            for chunk, results in zip(chunks, executor.map(_loadSectorChunk, chunks)):
+                for task, (sectorData, error) in zip(chunk, results):
+                    sector = None
+                    if sectorData:
+                        sector = pickle.loads(sectorData)
+                    else:
+                        milieu, canonicalName, _, _, _ = task
+                        logging.error(f'Failed to load sector {canonicalName} in {milieu.value}\n{error}')
+                    yield (task, sector, sectorData)
+
+    @staticmethod
+    def _loadSector(
+            milieu: multiverse.Milieu,
+            canonicalName: str,
+            sectorFormat: multiverse.SectorFormat,
+            rawMetadata: multiverse.RawMetadata,
+            isCustom: bool,
+            allegianceTracker: _AllegianceTracker
+            ) -> multiverse.Sector:
+        sectorContent = multiverse.DataStore.instance().sectorFileData(
+            sectorName=canonicalName,
+            milieu=milieu)
+
+        rawWorlds = multiverse.readSector(
+            content=sectorContent,
+            format=sectorFormat,
+            identifier=canonicalName)
+
+        return WorldManager._processSector(
+            milieu=milieu,
+            rawMetadata=rawMetadata,
+            rawWorlds=rawWorlds,
+            allegianceTracker=allegianceTracker,
+            isCustom=isCustom)
+
+    @staticmethod
+    def _sectorCacheFileName(milieu: multiverse.Milieu) -> str:
+        return f'sectors_{milieu.value}.dat'
+
+    # Read the processed sectors for a milieu from the cache. None is returned
+    # if there is no valid cache file for the milieu.
+    @staticmethod
+    def _readCachedSectors(
+            milieu: multiverse.Milieu
+            ) -> typing.Optional[typing.List[multiverse.Sector]]:
+        data = multiverse.DataStore.instance().readCacheFile(
+            fileName=WorldManager._sectorCacheFileName(milieu=milieu),
+            formatVersion=WorldManager._SectorCacheFormatVersion)
+        if not data:
+            return None
+
+        # The cache holds a list of individually serialised sectors
+        try:
+            sectors = [pickle.loads(sectorData) for sectorData in pickle.loads(data)]
+        except Exception as ex:
+            logging.warning(f'Failed to load cached sectors for {milieu.value}', exc_info=ex)
+            return None
+
+        logging.debug(f'Loaded {len(sectors)} cached sectors for {milieu.value}')
+        return sectors
+
+    @staticmethod
+    def _writeCachedSectors(
+            milieu: multiverse.Milieu,
+            sectorData: typing.List[bytes] # Sectors serialised with _serialiseSector
+            ) -> None:
+        data = pickle.dumps(sectorData, protocol=pickle.HIGHEST_PROTOCOL)
+        multiverse.DataStore.instance().writeCacheFile(
+            fileName=WorldManager._sectorCacheFileName(milieu=milieu),
+            formatVersion=WorldManager._SectorCacheFormatVersion,
+            data=data)
+
+    @staticmethod
+    def _serialiseSector(sector: multiverse.Sector) -> bytes:
+        # Make sure the absolute position of each world has been calculated so
+        # it's stored in the cache rather than being recalculated for every
+        # world each time the cache is loaded
+        for world in sector.yieldWorlds():
+            world.hex().absolute()
+        return pickle.dumps(sector, protocol=pickle.HIGHEST_PROTOCOL)
+
     @staticmethod
     def _populateAllegiances(
             milieu: multiverse.Milieu,
@@ -913,6 +1630,29 @@ class WorldManager(object):
             sectorName=rawMetadata.canonicalName(),
             allegiances=allegianceNameMap)
 
+    # Check if the unique codes of the allegiances used by the worlds in a
+    # sector match the ones the allegiance tracker would generate
+    @staticmethod
+    def _hasCurrentAllegiances(
+            milieu: multiverse.Milieu,
+            sector: multiverse.Sector,
+            allegianceTracker: _AllegianceTracker
+            ) -> bool:
+        checked = set()
+        for world in sector.yieldWorlds():
+            allegiance = world.allegiance()
+            if not allegiance or id(allegiance) in checked:
+                continue
+            checked.add(id(allegiance))
+
+            uniqueCode = allegianceTracker.uniqueAllegianceCode(
+                milieu=milieu,
+                code=allegiance.code(),
+                sectorName=sector.name())
+            if (uniqueCode or allegiance.code()) != allegiance.uniqueCode():
+                return False
+        return True
+
     @staticmethod
     def _processSector(
             milieu: multiverse.Milieu,
@@ -953,6 +1693,10 @@ class WorldManager(object):
                 subsectorCode = subsectorCode.upper()
                 subsectorNameMap[subsectorCode] = (subsectorName, False)
 
+        # Worlds in the sector with the same allegiance code share an
+        # allegiance object
+        allegianceMap: typing.Dict[str, multiverse.Allegiance] = {}
+
         for rawWorld in rawWorlds:
             try:
                 hex = rawWorld.attribute(multiverse.WorldAttribute.Hex)
@@ -971,44 +1715,47 @@ class WorldManager(object):
                 allegianceCode = rawWorld.attribute(multiverse.WorldAttribute.Allegiance)
                 allegiance = None
                 if allegianceCode:
-                    allegiance = multiverse.Allegiance(
-                        code=allegianceCode,
-                        name=allegianceTracker.allegianceName(
-                            milieu=milieu,
-                            code=allegianceCode,
-                            sectorName=sectorName),
-                        legacyCode=allegianceTracker.legacyCode(
-                            milieu=milieu,
-                            code=allegianceCode),
-                        baseCode=allegianceTracker.baseCode(
-                            milieu=milieu,
-                            code=allegianceCode),
-                        uniqueCode=allegianceTracker.uniqueAllegianceCode(
-                            milieu=milieu,
+                    allegiance = allegianceMap.get(allegianceCode)
+                    if not allegiance:
+                        allegiance = multiverse.Allegiance(
                             code=allegianceCode,
-                            sectorName=sectorName))
+                            name=allegianceTracker.allegianceName(
+                                milieu=milieu,
+                                code=allegianceCode,
+                                sectorName=sectorName),
+                            legacyCode=allegianceTracker.legacyCode(
+                                milieu=milieu,
+                                code=allegianceCode),
+                            baseCode=allegianceTracker.baseCode(
+                                milieu=milieu,
+                                code=allegianceCode),
+                            uniqueCode=allegianceTracker.uniqueAllegianceCode(
+                                milieu=milieu,
+                                code=allegianceCode,
+                                sectorName=sectorName))
+                        allegianceMap[allegianceCode] = allegiance
 
                 zone = multiverse.parseZoneString(
                     rawWorld.attribute(multiverse.WorldAttribute.Zone))
-                uwp = multiverse.UWP(
+                uwp = multiverse.UWP.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.UWP))
-                economics = multiverse.Economics(
+                economics = multiverse.Economics.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.Economics))
-                culture = multiverse.Culture(
+                culture = multiverse.Culture.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.Culture))
-                nobilities = multiverse.Nobilities(
+                nobilities = multiverse.Nobilities.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.Nobility))
-                remarks = multiverse.Remarks(
+                remarks = multiverse.Remarks.intern(
                     string=rawWorld.attribute(multiverse.WorldAttribute.Remarks),
                     sectorName=sectorName,
                     zone=zone)
-                stellar = multiverse.Stellar(
+                stellar = multiverse.Stellar.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.Stellar))
-                pbg = multiverse.PBG(
+                pbg = multiverse.PBG.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.PBG))
                 systemWorlds = rawWorld.attribute(multiverse.WorldAttribute.SystemWorlds)
                 systemWorlds = int(systemWorlds) if systemWorlds else 1
-                bases = multiverse.Bases(
+                bases = multiverse.Bases.intern(
                     rawWorld.attribute(multiverse.WorldAttribute.Bases))
 
                 world = multiverse.World(
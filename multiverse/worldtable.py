@@ -0,0 +1,488 @@
+import multiverse
+import numpy
+import threading
+import typing
+
+# The world table is a columnar store of the attributes of the worlds in a
+# milieu. Each attribute is held as a NumPy array with one entry per world so
+# searches can evaluate a filter against every world in the milieu with a
+# handful of vector operations rather than calling into the world objects for
+# each world.
+# Numeric attributes are stored as the integer value of their ehex code, if
+# the code is unknown (e.g. '?') or not a valid ehex value UnknownValue is
+# stored in its place. Sets of enum values (trade codes, bases, nobilities)
+# are stored as bitmasks where the bit for each value is its index in the
+# enum.
+# Worlds are held in the order they're passed in, the index of a world in the
+# table is the same as its index in the columns.
+# The table also provides inverted indexes that map trade codes, bases,
+# nobilities, allegiances and remarks to posting lists of the indices of the
+# worlds that have them. Posting lists are sorted numpy arrays so they can be
+# cheaply combined to find candidate worlds without scanning the entire
+# table. They're only built the first time they're requested.
+# This object is thread safe. The columns are created when the table is
+# created and never change, derived columns and posting lists are created
+# under a lock.
+class WorldTable(object):
+    UnknownValue = numpy.iinfo(numpy.int16).min
+
+    _TradeCodeBits = {tradeCode: 1 << index for index, tradeCode in enumerate(multiverse.TradeCode)}
+    _BaseBits = {base: 1 << index for index, base in enumerate(multiverse.BaseType)}
+    _NobilityBits = {nobility: 1 << index for index, nobility in enumerate(multiverse.NobilityType)}
+
+    _EmptyPostingList = numpy.empty(0, dtype=numpy.intp)
+    _EmptyPostingList.flags.writeable = False
+
+    def __init__(
+            self,
+            worlds: typing.Iterable[multiverse.World]
+            ) -> None:
+        self._worlds = list(worlds)
+        self._lock = threading.Lock()
+        self._derivedColumns: typing.Dict[typing.Hashable, numpy.ndarray] = {}
+        self._postingLists: typing.Dict[typing.Hashable, numpy.ndarray] = {}
+        self._allegiancePostingLists: typing.Optional[typing.Dict[str, numpy.ndarray]] = None
+        self._remarkPostingLists: typing.Optional[typing.Dict[str, numpy.ndarray]] = None
+
+        # Worlds share a lot of codes so values are cached by code string
+        # to avoid repeatedly converting the same code
+        uwpCache: typing.Dict[str, typing.Tuple[int, ...]] = {}
+        economicsCache: typing.Dict[str, typing.Tuple[int, ...]] = {}
+        cultureCache: typing.Dict[str, typing.Tuple[int, ...]] = {}
+        pbgCache: typing.Dict[str, typing.Tuple[int, ...]] = {}
+        starPortCodeMap: typing.Dict[str, int] = {}
+        allegianceMap: typing.Dict[typing.Tuple[str, typing.Optional[str]], int] = {}
+
+        uwpRows = []
+        economicsRows = []
+        cultureRows = []
+        pbgRows = []
+        zones = []
+        starPortCodes = []
+        allegiances = []
+        tradeCodes = []
+        bases = []
+        nobilities = []
+        anomalies = []
+        fuelCaches = []
+        absoluteXs = []
+        absoluteYs = []
+        self._starPortCodes: typing.List[str] = []
+        self._allegiances: typing.List[multiverse.Allegiance] = []
+        for world in self._worlds:
+            uwp = world.uwp()
+            uwpString = uwp.string()
+            row = uwpCache.get(uwpString)
+            if row is None:
+                row = tuple(WorldTable._ehexValue(uwp.code(element)) for element in multiverse.UWP.Element)
+                uwpCache[uwpString] = row
+            uwpRows.append(row)
+
+            economics = world.economics()
+            economicsString = economics.string()
+            row = economicsCache.get(economicsString)
+            if row is None:
+                row = tuple(WorldTable._economicsValue(element, economics.code(element)) for element in multiverse.Economics.Element)
+                economicsCache[economicsString] = row
+            economicsRows.append(row)
+
+            culture = world.culture()
+            cultureString = culture.string()
+            row = cultureCache.get(cultureString)
+            if row is None:
+                row = tuple(WorldTable._ehexValue(culture.code(element)) for element in multiverse.Culture.Element)
+                cultureCache[cultureString] = row
+            cultureRows.append(row)
+
+            pbg = world.pbg()
+            pbgString = pbg.string()
+            row = pbgCache.get(pbgString)
+            if row is None:
+                row = tuple(WorldTable._ehexValue(pbg.code(element)) for element in multiverse.PBG.Element)
+                pbgCache[pbgString] = row
+            pbgRows.append(row)
+
+            zone = world.zone()
+            zones.append(zone.value if zone else 0)
+
+            starPortCode = uwp.code(multiverse.UWP.Element.StarPort)
+            starPortId = starPortCodeMap.get(starPortCode)
+            if starPortId is None:
+                starPortId = len(self._starPortCodes)
+                starPortCodeMap[starPortCode] = starPortId
+                self._starPortCodes.append(starPortCode)
+            starPortCodes.append(starPortId)
+
+            allegiance = world.allegiance()
+            allegianceId = -1
+            if allegiance:
+                allegianceKey = (allegiance.code(), allegiance.name())
+                allegianceId = allegianceMap.get(allegianceKey)
+                if allegianceId is None:
+                    allegianceId = len(self._allegiances)
+                    allegianceMap[allegianceKey] = allegianceId
+                    self._allegiances.append(allegiance)
+            allegiances.append(allegianceId)
+
+            tradeCodes.append(WorldTable.tradeCodeMask(world.tradeCodes()))
+            bases.append(WorldTable.baseMask(world.bases()))
+            nobilities.append(WorldTable.nobilityMask(world.nobilities()))
+            anomalies.append(world.isAnomaly())
+            fuelCaches.append(world.isFuelCache())
+
+            absoluteX, absoluteY = world.hex().absolute()
+            absoluteXs.append(absoluteX)
+            absoluteYs.append(absoluteY)
+
+        self._uwpColumns = WorldTable._createColumns(
+            rows=uwpRows,
+            elements=multiverse.UWP.Element)
+        self._economicsColumns = WorldTable._createColumns(
+            rows=economicsRows,
+            elements=multiverse.Economics.Element)
+        self._cultureColumns = WorldTable._createColumns(
+            rows=cultureRows,
+            elements=multiverse.Culture.Element)
+        self._pbgColumns = WorldTable._createColumns(
+            rows=pbgRows,
+            elements=multiverse.PBG.Element)
+        self._zoneColumn = numpy.array(zones, dtype=numpy.int8)
+        self._starPortCodeColumn = numpy.array(starPortCodes, dtype=numpy.int16)
+        self._allegianceColumn = numpy.array(allegiances, dtype=numpy.int32)
+        self._tradeCodeColumn = numpy.array(tradeCodes, dtype=numpy.uint64)
+        self._baseColumn = numpy.array(bases, dtype=numpy.uint32)
+        self._nobilityColumn = numpy.array(nobilities, dtype=numpy.uint16)
+        self._anomalyColumn = numpy.array(anomalies, dtype=numpy.bool_)
+        self._fuelCacheColumn = numpy.array(fuelCaches, dtype=numpy.bool_)
+        self._absoluteXColumn = numpy.array(absoluteXs, dtype=numpy.int32)
+        self._absoluteYColumn = numpy.array(absoluteYs, dtype=numpy.int32)
+
+    def worldCount(self) -> int:
+        return len(self._worlds)
+
+    def world(self, index: int) -> multiverse.World:
+        return self._worlds[index]
+
+    def worlds(self) -> typing.Sequence[multiverse.World]:
+        return self._worlds
+
+    def uwpColumn(self, element: multiverse.UWP.Element) -> numpy.ndarray:
+        return self._uwpColumns[element]
+
+    # Efficiency is stored as its signed integer value rather than an ehex
+    # value
+    def economicsColumn(self, element: multiverse.Economics.Element) -> numpy.ndarray:
+        return self._economicsColumns[element]
+
+    def cultureColumn(self, element: multiverse.Culture.Element) -> numpy.ndarray:
+        return self._cultureColumns[element]
+
+    def pbgColumn(self, element: multiverse.PBG.Element) -> numpy.ndarray:
+        return self._pbgColumns[element]
+
+    # Zones are stored as the ZoneType value or 0 if the world has no zone
+    def zoneColumn(self) -> numpy.ndarray:
+        return self._zoneColumn
+
+    # Star port codes are stored as an index into the list returned by
+    # starPortCodes
+    def starPortCodeColumn(self) -> numpy.ndarray:
+        return self._starPortCodeColumn
+
+    def starPortCodes(self) -> typing.Sequence[str]:
+        return self._starPortCodes
+
+    # Allegiances are stored as an index into the list returned by
+    # allegiances or -1 if the world has no allegiance. Allegiances with the
+    # same code and name share an index.
+    def allegianceColumn(self) -> numpy.ndarray:
+        return self._allegianceColumn
+
+    def allegiances(self) -> typing.Sequence[multiverse.Allegiance]:
+        return self._allegiances
+
+    def tradeCodeColumn(self) -> numpy.ndarray:
+        return self._tradeCodeColumn
+
+    def baseColumn(self) -> numpy.ndarray:
+        return self._baseColumn
+
+    def nobilityColumn(self) -> numpy.ndarray:
+        return self._nobilityColumn
+
+    def anomalyColumn(self) -> numpy.ndarray:
+        return self._anomalyColumn
+
+    def fuelCacheColumn(self) -> numpy.ndarray:
+        return self._fuelCacheColumn
+
+    def absoluteXColumn(self) -> numpy.ndarray:
+        return self._absoluteXColumn
+
+    def absoluteYColumn(self) -> numpy.ndarray:
+        return self._absoluteYColumn
+
+    # Returns a column of values calculated by calling the function for each
+    # world. The column is only calculated the first time it's requested for
+    # a given key, after that the cached column is returned. This allows
+    # code outside of multiverse to vectorise checks that depend on logic it
+    # owns without duplicating that logic here.
+    def derivedColumn(
+            self,
+            key: typing.Hashable,
+            function: typing.Callable[[multiverse.World], typing.Any],
+            dtype: typing.Any
+            ) -> numpy.ndarray:
+        column = self._derivedColumns.get(key)
+        if column is not None:
+            return column
+
+        with self._lock:
+            # Recheck as another thread could have created the column between
+            # the first check and the lock being acquired
+            column = self._derivedColumns.get(key)
+            if column is None:
+                column = numpy.fromiter(
+                    (function(world) for world in self._worlds),
+                    dtype=dtype,
+                    count=len(self._worlds))
+                self._derivedColumns[key] = column
+        return column
+
+    def tradeCodeWorlds(self, tradeCode: multiverse.TradeCode) -> numpy.ndarray:
+        return self._bitmaskPostingList(
+            key=tradeCode,
+            column=self._tradeCodeColumn,
+            bit=WorldTable._TradeCodeBits[tradeCode])
+
+    def baseWorlds(self, base: multiverse.BaseType) -> numpy.ndarray:
+        return self._bitmaskPostingList(
+            key=base,
+            column=self._baseColumn,
+            bit=WorldTable._BaseBits[base])
+
+    def nobilityWorlds(self, nobility: multiverse.NobilityType) -> numpy.ndarray:
+        return self._bitmaskPostingList(
+            key=nobility,
+            column=self._nobilityColumn,
+            bit=WorldTable._NobilityBits[nobility])
+
+    # Allegiances are indexed by their unique code
+    def allegianceWorlds(self, uniqueCode: str) -> numpy.ndarray:
+        postingLists = self._allegiancePostingLists
+        if postingLists is None:
+            with self._lock:
+                if self._allegiancePostingLists is None:
+                    self._allegiancePostingLists = self._createAllegiancePostingLists()
+                postingLists = self._allegiancePostingLists
+        return postingLists.get(uniqueCode, WorldTable._EmptyPostingList)
+
+    # Returns a posting list of the worlds within the radius of the center
+    # hex. The worlds in the rectangle that bounds the radius are found with
+    # cheap comparisons against the position columns so the hex distance
+    # only needs to be calculated for those worlds.
+    def radiusWorlds(
+            self,
+            center: typing.Tuple[int, int],
+            radius: int
+            ) -> numpy.ndarray:
+        centerX, centerY = center
+        candidates = numpy.flatnonzero(
+            (numpy.abs(self._absoluteXColumn - centerX) <= radius) &
+            (numpy.abs(self._absoluteYColumn - centerY) <= radius + 1))
+        radiusMask = multiverse.absoluteRadiusMask(
+            center=center,
+            radius=radius,
+            xs=self._absoluteXColumn[candidates],
+            ys=self._absoluteYColumn[candidates])
+        return candidates[radiusMask]
+
+    # Remarks are indexed by the individual remarks as they're split up by
+    # Remarks (e.g. 'Ag', 'O:1234' or '[Aslan]')
+    def remarkWorlds(self, remark: str) -> numpy.ndarray:
+        return self._remarkIndex().get(remark, WorldTable._EmptyPostingList)
+
+    def remarks(self) -> typing.Iterable[str]:
+        return self._remarkIndex().keys()
+
+    # Returns a table containing the subset of worlds with the specified
+    # indices. The indices must be sorted so the subset is in the same order
+    # as this table. Indices in the returned table are relative to the
+    # subset, not this table.
+    def subset(self, indices: numpy.ndarray) -> 'WorldTable':
+        table = WorldTable.__new__(WorldTable)
+        table._worlds = [self._worlds[index] for index in indices]
+        table._lock = threading.Lock()
+        with self._lock:
+            table._derivedColumns = {key: column[indices] for key, column in self._derivedColumns.items()}
+        table._postingLists = {}
+        table._allegiancePostingLists = None
+        table._remarkPostingLists = None
+
+        table._uwpColumns = {element: column[indices] for element, column in self._uwpColumns.items()}
+        table._economicsColumns = {element: column[indices] for element, column in self._economicsColumns.items()}
+        table._cultureColumns = {element: column[indices] for element, column in self._cultureColumns.items()}
+        table._pbgColumns = {element: column[indices] for element, column in self._pbgColumns.items()}
+        table._zoneColumn = self._zoneColumn[indices]
+        # The star port code and allegiance lists are shared so the indices
+        # in the subset columns remain valid
+        table._starPortCodeColumn = self._starPortCodeColumn[indices]
+        table._starPortCodes = self._starPortCodes
+        table._allegianceColumn = self._allegianceColumn[indices]
+        table._allegiances = self._allegiances
+        table._tradeCodeColumn = self._tradeCodeColumn[indices]
+        table._baseColumn = self._baseColumn[indices]
+        table._nobilityColumn = self._nobilityColumn[indices]
+        table._anomalyColumn = self._anomalyColumn[indices]
+        table._fuelCacheColumn = self._fuelCacheColumn[indices]
+        table._absoluteXColumn = self._absoluteXColumn[indices]
+        table._absoluteYColumn = self._absoluteYColumn[indices]
+        return table
+
+    # Returns the sorted indices that are in any of the posting lists
+    @staticmethod
+    def unionPostingLists(postingLists: typing.Iterable[numpy.ndarray]) -> numpy.ndarray:
+        postingLists = list(postingLists)
+        if not postingLists:
+            return WorldTable._EmptyPostingList
+        if len(postingLists) == 1:
+            return postingLists[0]
+        return numpy.unique(numpy.concatenate(postingLists))
+
+    # Returns the sorted indices that are in all of the posting lists. The
+    # shortest lists are intersected first to keep intermediate results small
+    @staticmethod
+    def intersectPostingLists(postingLists: typing.Iterable[numpy.ndarray]) -> numpy.ndarray:
+        postingLists = sorted(postingLists, key=len)
+        if not postingLists:
+            raise ValueError('Unable to intersect an empty set of posting lists')
+        result = postingLists[0]
+        for postingList in postingLists[1:]:
+            if not len(result):
+                break
+            result = numpy.intersect1d(result, postingList, assume_unique=True)
+        return result
+
+    # Returns the indices of the worlds where the mask is True, in table
+    # order. If maxResults is specified no more than that many indices are
+    # returned.
+    @staticmethod
+    def maskIndices(
+            mask: numpy.ndarray,
+            maxResults: typing.Optional[int] = None
+            ) -> numpy.ndarray:
+        indices = numpy.flatnonzero(mask)
+        if maxResults:
+            indices = indices[:maxResults]
+        return indices
+
+    @staticmethod
+    def tradeCodeMask(tradeCodes: typing.Iterable[multiverse.TradeCode]) -> int:
+        mask = 0
+        for tradeCode in tradeCodes:
+            mask |= WorldTable._TradeCodeBits[tradeCode]
+        return mask
+
+    @staticmethod
+    def baseMask(bases: typing.Iterable[multiverse.BaseType]) -> int:
+        mask = 0
+        for base in bases:
+            mask |= WorldTable._BaseBits[base]
+        return mask
+
+    @staticmethod
+    def nobilityMask(nobilities: typing.Iterable[multiverse.NobilityType]) -> int:
+        mask = 0
+        for nobility in nobilities:
+            mask |= WorldTable._NobilityBits[nobility]
+        return mask
+
+    def _bitmaskPostingList(
+            self,
+            key: typing.Hashable,
+            column: numpy.ndarray,
+            bit: int
+            ) -> numpy.ndarray:
+        postingList = self._postingLists.get(key)
+        if postingList is not None:
+            return postingList
+
+        with self._lock:
+            # Recheck as another thread could have created the posting list
+            # between the first check and the lock being acquired
+            postingList = self._postingLists.get(key)
+            if postingList is None:
+                postingList = numpy.flatnonzero(column & column.dtype.type(bit))
+                self._postingLists[key] = postingList
+        return postingList
+
+    # This must be called with the lock held
+    def _createAllegiancePostingLists(self) -> typing.Dict[str, numpy.ndarray]:
+        # A stable sort groups worlds by allegiance while keeping the worlds
+        # in each group in table order
+        order = numpy.argsort(self._allegianceColumn, kind='stable')
+        counts = numpy.bincount(self._allegianceColumn + 1, minlength=len(self._allegiances) + 1)
+        groups = numpy.split(order, numpy.cumsum(counts)[:-1])
+
+        postingLists: typing.Dict[str, typing.List[numpy.ndarray]] = {}
+        # The first group is worlds with no allegiance
+        for allegiance, group in zip(self._allegiances, groups[1:]):
+            uniqueCode = allegiance.uniqueCode()
+            if uniqueCode not in postingLists:
+                postingLists[uniqueCode] = []
+            postingLists[uniqueCode].append(group)
+        return {uniqueCode: WorldTable.unionPostingLists(groups) for uniqueCode, groups in postingLists.items()}
+
+    def _remarkIndex(self) -> typing.Dict[str, numpy.ndarray]:
+        postingLists = self._remarkPostingLists
+        if postingLists is not None:
+            return postingLists
+
+        with self._lock:
+            if self._remarkPostingLists is None:
+                indices: typing.Dict[str, typing.List[int]] = {}
+                for index, world in enumerate(self._worlds):
+                    remarks = world.remarks()
+                    if not remarks:
+                        continue
+                    for remark in remarks.remarks():
+                        worldIndices = indices.get(remark)
+                        if worldIndices is None:
+                            worldIndices = []
+                            indices[remark] = worldIndices
+                        worldIndices.append(index)
+                self._remarkPostingLists = {
+                    remark: numpy.array(worldIndices, dtype=numpy.intp) for remark, worldIndices in indices.items()}
+            return self._remarkPostingLists
+
+    @staticmethod
+    def _ehexValue(code: str) -> int:
+        return multiverse.ehexToInteger(value=code, default=WorldTable.UnknownValue)
+
+    @staticmethod
+    def _economicsValue(
+            element: multiverse.Economics.Element,
+            code: str
+            ) -> int:
+        if element != multiverse.Economics.Element.Efficiency:
+            return WorldTable._ehexValue(code)
+
+        if code == '?':
+            return WorldTable.UnknownValue
+        try:
+            return int(code)
+        except ValueError:
+            return WorldTable.UnknownValue
+
+    @staticmethod
+    def _createColumns(
+            rows: typing.Sequence[typing.Tuple[int, ...]],
+            elements: typing.Iterable[typing.Any]
+            ) -> typing.Dict[typing.Any, numpy.ndarray]:
+        elements = list(elements)
+        if rows:
+            table = numpy.array(rows, dtype=numpy.int16)
+        else:
+            table = numpy.empty((0, len(elements)), dtype=numpy.int16)
+        # Each column is copied so it's contiguous in memory
+        return {element: table[:, index].copy() for index, element in enumerate(elements)}
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import typing
+
+# Rendering needs a QApplication but no display, the offscreen platform must
+# be selected before Qt is imported
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Allow the script to be run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+import cartographer
+import gui
+import multiverse
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+# Renders a fixed set of viewports in every map style without the GUI and
+# reports the render profile of each frame as JSON so rendering performance
+# can be compared between changes. The profile for each layer includes the
+# time taken, the number of primitives drawn and render cache hits/misses. The first frame of
+# each viewport is rendered with empty render caches and is reported
+# separately from the frames that follow it. Only the installed map data is
+# used, overlay and custom sectors are ignored.
+
+# The viewports are positioned relative to sectors so they don't depend on
+# the layout of the world coordinate space
+class _Viewport(object):
+    def __init__(
+            self,
+            name: str,
+            sectorName: str,
+            subsectorCode: typing.Optional[str],
+            scale: float # Linear scale in pixels per parsec
+            ) -> None:
+        self.name = name
+        self.sectorName = sectorName
+        self.subsectorCode = subsectorCode
+        self.scale = scale
+
+_Viewports = [
+    _Viewport(name='Galaxy', sectorName='Core', subsectorCode=None, scale=1 / 32),
+    _Viewport(name='Sector', sectorName='Spinward Marches', subsectorCode=None, scale=32),
+    _Viewport(name='Subsector', sectorName='Spinward Marches', subsectorCode='C', scale=128),
+    _Viewport(name='DenseCore', sectorName='Core', subsectorCode=None, scale=16),
+    _Viewport(name='SparseRift', sectorName='Riftspan Reaches', subsectorCode=None, scale=16)
+]
+
+# These are the default map options used by the app
+_MapOptions = [
+    app.MapOption.GalacticDirections,
+    app.MapOption.SectorGrid,
+    app.MapOption.SelectedSectorNames,
+    app.MapOption.Borders,
+    app.MapOption.Routes,
+    app.MapOption.RegionNames,
+    app.MapOption.ImportantWorlds,
+    app.MapOption.FilledBorders
+]
+
+def _viewportCenter(
+        milieu: multiverse.Milieu,
+        viewport: _Viewport
+        ) -> typing.Tuple[float, float]:
+    sector = multiverse.WorldManager.instance().sectorByName(
+        milieu=milieu,
+        name=viewport.sectorName)
+    if not sector:
+        raise RuntimeError(f'Viewport {viewport.name} sector {viewport.sectorName} not found in {milieu.value}')
+
+    if viewport.subsectorCode:
+        subsector = sector.subsectorByCode(code=viewport.subsectorCode)
+        if not subsector:
+            raise RuntimeError(f'Viewport {viewport.name} subsector {viewport.subsectorCode} not found in {viewport.sectorName}')
+        left, top, width, height = subsector.index().worldBounds()
+    else:
+        left, top, width, height = sector.index().worldBounds()
+    return (left + (width / 2), top + (height / 2))
+
+def _layersToDict(
+        layers: typing.Iterable[cartographer.RenderLayerProfile]
+        ) -> typing.Dict[str, typing.Dict[str, typing.Union[int, float]]]:
+    return {
+        layer.layerId().name: {
+            'timeMs': _toMilliseconds(layer.time()),
+            'primitives': layer.primitiveCount(),
+            'cacheHits': layer.cacheHits(),
+            'cacheMisses': layer.cacheMisses()}
+        for layer in layers}
+
+def _renderFrame(
+        renderer: cartographer.RenderContext,
+        graphics: gui.MapGraphics,
+        image: QtGui.QImage
+        ) -> None:
+    painter = QtGui.QPainter()
+    painter.begin(image)
+    try:
+        graphics.setPainter(painter=painter)
+        renderer.render()
+    finally:
+        graphics.setPainter(painter=None)
+        painter.end()
+
+def _toMilliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+if __name__ == "__main__":
+    rootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(
+        description='Benchmark map rendering for a set of viewports in every map style')
+    parser.add_argument(
+        '--milieu',
+        default=multiverse.Milieu.M1105.value,
+        choices=[milieu.value for milieu in multiverse.Milieu],
+        help='Milieu to render')
+    parser.add_argument(
+        '--map-dir',
+        default=os.path.join(rootDir, 'data', 'map'),
+        help='Directory containing the installed map data')
+    parser.add_argument(
+        '--width',
+        type=int,
+        default=1024,
+        help='Width of the rendered images in pixels')
+    parser.add_argument(
+        '--height',
+        type=int,
+        default=768,
+        help='Height of the rendered images in pixels')
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=5,
+        help='Number of frames to render after the first frame of each viewport')
+    parser.add_argument(
+        '--sector-cache-budget',
+        type=int,
+        help='Sector cache memory budget in MiB (default: the render context default)')
+    parser.add_argument(
+        '--style',
+        action='append',
+        choices=[style.name for style in cartographer.MapStyle],
+        help='Style to render, can be specified multiple times (default: all styles)')
+    parser.add_argument(
+        '--viewport',
+        action='append',
+        choices=[viewport.name for viewport in _Viewports],
+        help='Viewport to render, can be specified multiple times (default: all viewports)')
+    parser.add_argument(
+        '--output-dir',
+        help='Directory to write the last frame of each viewport to as a PNG')
+    parser.add_argument(
+        '--json',
+        help='File to write the timings to (default: stdout)')
+    args = parser.parse_args()
+
+    milieu = multiverse.Milieu(args.milieu)
+    styles = [cartographer.MapStyle[name] for name in args.style] \
+        if args.style else list(cartographer.MapStyle)
+    viewports = [viewport for viewport in _Viewports if viewport.name in args.viewport] \
+        if args.viewport else _Viewports
+
+    # Only the program name is passed so Qt doesn't interpret the --style
+    # argument as its own widget style option
+    application = QtWidgets.QApplication(sys.argv[:1])
+
+    with tempfile.TemporaryDirectory() as emptyDir:
+        multiverse.DataStore.setSectorDirs(
+            installDir=args.map_dir,
+            overlayDir=os.path.join(emptyDir, 'overlay'),
+            customDir=os.path.join(emptyDir, 'custom'))
+        multiverse.WorldManager.setLazyLoading(True)
+        multiverse.WorldManager.instance().loadSectors()
+
+        # Look up the viewport centers before rendering anything so the
+        # milieu is loaded before any timings are taken
+        viewportCenters = {
+            viewport.name: _viewportCenter(milieu=milieu, viewport=viewport)
+            for viewport in viewports}
+
+        universe = multiverse.WorldManager.instance().universe()
+        graphics = gui.MapGraphics()
+        imageStore = cartographer.ImageStore(graphics=graphics)
+        vectorStore = cartographer.VectorStore(graphics=graphics)
+        labelStore = cartographer.LabelStore(universe=universe)
+        styleStore = cartographer.StyleStore()
+        options = gui.mapOptionsToRenderOptions(_MapOptions)
+
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+
+        results = []
+        for viewport in viewports:
+            centerX, centerY = viewportCenters[viewport.name]
+            for style in styles:
+                renderer = cartographer.RenderContext(
+                    universe=universe,
+                    graphics=graphics,
+                    worldCenterX=centerX,
+                    worldCenterY=centerY,
+                    scale=viewport.scale,
+                    outputPixelX=args.width,
+                    outputPixelY=args.height,
+                    milieu=milieu,
+                    style=style,
+                    options=options,
+                    imageStore=imageStore,
+                    styleStore=styleStore,
+                    vectorStore=vectorStore,
+                    labelStore=labelStore)
+                profiler = cartographer.RenderProfiler(capacity=args.frames + 1)
+                renderer.setProfiler(profiler=profiler)
+                if args.sector_cache_budget is not None:
+                    renderer.setSectorCacheMemoryBudget(
+                        memoryBudget=args.sector_cache_budget * 1024 * 1024)
+
+                image = QtGui.QImage(
+                    args.width,
+                    args.height,
+                    QtGui.QImage.Format.Format_ARGB32)
+
+                for _ in range(args.frames + 1):
+                    _renderFrame(
+                        renderer=renderer,
+                        graphics=graphics,
+                        image=image)
+                coldFrame, *frames = profiler.frames()
+                coldFrameTime = coldFrame.time()
+                frameTimes = [frame.time() for frame in frames]
+
+                if args.output_dir:
+                    image.save(
+                        os.path.join(args.output_dir, f'{viewport.name}_{style.name}.png'),
+                        'PNG')
+
+                result = {
+                    'viewport': viewport.name,
+                    'style': style.name,
+                    'scale': viewport.scale,
+                    'coldFrameMs': _toMilliseconds(coldFrameTime),
+                    'coldLayers': _layersToDict(coldFrame.layers())}
+                lastFrame = frames[-1] if frames else coldFrame
+                sectorCacheStats = lastFrame.sectorCacheStats()
+                result['sectorCache'] = {
+                    'entries': sectorCacheStats.entryCount(),
+                    'memoryUsage': sectorCacheStats.memoryUsage(),
+                    'memoryBudget': sectorCacheStats.memoryBudget(),
+                    'evictions': sectorCacheStats.evictionCount()}
+                if frameTimes:
+                    result['frameMs'] = [_toMilliseconds(frameTime) for frameTime in frameTimes]
+                    result['meanFrameMs'] = _toMilliseconds(sum(frameTimes) / len(frameTimes))
+                    result['minFrameMs'] = _toMilliseconds(min(frameTimes))
+                    result['meanLayers'] = _layersToDict(
+                        cartographer.RenderProfiler.averageLayers(frames=frames))
+                results.append(result)
+
+                print(
+                    f'{viewport.name} {style.name}: cold {coldFrameTime * 1000:.1f}ms' +
+                    (f', mean {sum(frameTimes) / len(frameTimes) * 1000:.1f}ms' if frameTimes else ''),
+                    file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'qt': QtCore.QT_VERSION_STR,
+        'pyqt': QtCore.PYQT_VERSION_STR,
+        'platform': platform.platform(),
+        'milieu': milieu.value,
+        'width': args.width,
+        'height': args.height,
+        'frames': args.frames,
+        'results': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+    exit(0)
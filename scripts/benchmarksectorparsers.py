@@ -0,0 +1,211 @@
+import argparse
+import glob
+import itertools
+import os
+import sys
+import time
+import typing
+
+# Allow the script to be run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiverse
+import multiverse.sectorparsers
+
+# Compares the speed of the sector parsers with the reference implementation
+# they replaced and checks they produce identical raw worlds. All T5 column
+# (.sec) files in the map data are parsed. There are no T5 tab files in the
+# map data so each column file is also converted to tab format to benchmark
+# the tab parser.
+
+# Column names written to the header of the generated tab files
+_T5RowColumnNames = list(multiverse.sectorparsers._T5Row_ColumnNameToAttributeMap.keys())
+
+def _referenceIsAllDashes(string: str) -> bool:
+    if not string:
+        return False
+    for c in string:
+        if c != '-':
+            return False
+    return True
+
+# The column parser before the slice plan was added. Errors are handled the
+# same way as the current parser
+def _referenceReadT5ColumnSector(
+        content: str,
+        identifier: str
+        ) -> typing.List[multiverse.RawWorld]:
+    worlds = []
+    columnNames = None
+    columnAttributes = None
+    columnWidths = None
+    for lineNumber, line in enumerate(content.splitlines()):
+        if not line or line[:1] == '#':
+            continue
+
+        if not columnNames:
+            columnNames = multiverse.sectorparsers._HeaderPattern.findall(line)
+            if len(columnNames) < len(multiverse.sectorparsers._T5Column_ColumnNameToAttributeMap):
+                columnNames = None
+                continue
+            columnAttributes = [
+                multiverse.sectorparsers._T5Column_ColumnNameToAttributeMap.get(columnName)
+                for columnName in columnNames]
+            continue
+        elif not columnWidths:
+            separators = multiverse.sectorparsers._SeparatorPattern.findall(line)
+            if len(separators) != len(columnNames):
+                raise RuntimeError(f'Separator count mismatch in {identifier}')
+            columnWidths = [len(separator) for separator in separators]
+            continue
+
+        try:
+            worldData = multiverse.RawWorld(lineNumber=lineNumber)
+            lineLength = len(line)
+            startIndex = 0
+            for attribute, width in itertools.zip_longest(columnAttributes, columnWidths):
+                if startIndex >= lineLength:
+                    raise RuntimeError('Line is to short')
+                finishIndex = startIndex + width
+                if attribute != None:
+                    data = line[startIndex:finishIndex].strip()
+                    if data and _referenceIsAllDashes(data):
+                        data = ''
+                    worldData.setAttribute(attribute=attribute, value=data)
+                startIndex = finishIndex + 1
+            worlds.append(worldData)
+        except Exception:
+            continue
+    return worlds
+
+# The tab parser before it was optimised
+def _referenceReadT5RowSector(
+        content: str,
+        identifier: str
+        ) -> typing.List[multiverse.RawWorld]:
+    worlds = []
+    columnNames = None
+    columnAttributes = None
+    for lineNumber, line in enumerate(content.splitlines()):
+        if not line or line[:1] == '#':
+            continue
+
+        if not columnNames:
+            columnNames = multiverse.sectorparsers._HeaderPattern.findall(line)
+            if len(columnNames) < len(multiverse.sectorparsers._T5Row_ColumnNameToAttributeMap):
+                columnNames = None
+                continue
+            columnAttributes = [
+                multiverse.sectorparsers._T5Row_ColumnNameToAttributeMap.get(columnName)
+                for columnName in columnNames]
+            continue
+
+        columnData = line.split('\t')
+        if len(columnData) != len(columnAttributes):
+            continue
+        worldData = multiverse.RawWorld(lineNumber=lineNumber)
+        for attribute, data in itertools.zip_longest(columnAttributes, columnData):
+            if data and _referenceIsAllDashes(data):
+                data = ''
+            worldData.setAttribute(attribute=attribute, value=data)
+        worlds.append(worldData)
+    return worlds
+
+def _convertToTabFormat(worlds: typing.Iterable[multiverse.RawWorld]) -> str:
+    lines = ['\t'.join(_T5RowColumnNames)]
+    for world in worlds:
+        values = []
+        for columnName in _T5RowColumnNames:
+            attribute = multiverse.sectorparsers._T5Row_ColumnNameToAttributeMap[columnName]
+            values.append(world.attribute(attribute) or '-')
+        lines.append('\t'.join(values))
+    return '\n'.join(lines)
+
+def _worldsMatch(
+        worlds: typing.Sequence[multiverse.RawWorld],
+        referenceWorlds: typing.Sequence[multiverse.RawWorld]
+        ) -> bool:
+    if len(worlds) != len(referenceWorlds):
+        return False
+    for world, referenceWorld in zip(worlds, referenceWorlds):
+        if world.lineNumber() != referenceWorld.lineNumber():
+            return False
+        # Compare the attributes in order so any difference in the order
+        # attributes were added is also found
+        if list(world._attributes.items()) != list(referenceWorld._attributes.items()):
+            return False
+    return True
+
+def _timeParser(
+        parser: typing.Callable[[str, str], typing.List[multiverse.RawWorld]],
+        files: typing.Sequence[typing.Tuple[str, str]], # (Identifier, content)
+        repeats: int
+        ) -> float:
+    bestTime = None
+    for _ in range(repeats):
+        startTime = time.perf_counter()
+        for identifier, content in files:
+            parser(content, identifier)
+        elapsedTime = time.perf_counter() - startTime
+        if bestTime is None or elapsedTime < bestTime:
+            bestTime = elapsedTime
+    return bestTime
+
+if __name__ == "__main__":
+    rootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(
+        description='Benchmark the sector parsers against the reference implementation')
+    parser.add_argument(
+        '--map-dir',
+        default=os.path.join(rootDir, 'data', 'map'),
+        help='Directory containing the installed map data')
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=3,
+        help='Number of times to parse the files, the fastest time is reported')
+    args = parser.parse_args()
+
+    columnFiles = []
+    for filePath in sorted(glob.glob(os.path.join(args.map_dir, 'milieu', '*', '*.sec'))):
+        with open(filePath, 'r', encoding='utf-8-sig') as file:
+            columnFiles.append((filePath, file.read()))
+    if not columnFiles:
+        print(f'No sector files found in {args.map_dir}')
+        exit(1)
+
+    mismatches = 0
+    worldCount = 0
+    tabFiles = []
+    for identifier, content in columnFiles:
+        referenceWorlds = _referenceReadT5ColumnSector(content, identifier)
+        worlds = multiverse.readT5ColumnSector(content=content, identifier=identifier)
+        if not _worldsMatch(worlds, referenceWorlds):
+            print(f'Column parser output differs for {identifier}')
+            mismatches += 1
+        worldCount += len(referenceWorlds)
+
+        tabContent = _convertToTabFormat(worlds=referenceWorlds)
+        tabFiles.append((identifier, tabContent))
+        referenceWorlds = _referenceReadT5RowSector(tabContent, identifier)
+        worlds = multiverse.readT5RowSector(content=tabContent, identifier=identifier)
+        if not _worldsMatch(worlds, referenceWorlds):
+            print(f'Tab parser output differs for {identifier}')
+            mismatches += 1
+
+    print(f'Files: {len(columnFiles)}')
+    print(f'Worlds: {worldCount}')
+
+    for formatName, files, referenceParser, currentParser in [
+            ('T5 column', columnFiles, _referenceReadT5ColumnSector, multiverse.readT5ColumnSector),
+            ('T5 tab', tabFiles, _referenceReadT5RowSector, multiverse.readT5RowSector)]:
+        referenceTime = _timeParser(referenceParser, files, args.repeats)
+        currentTime = _timeParser(currentParser, files, args.repeats)
+        print(f'{formatName}: reference {referenceTime:.3f}s, current {currentTime:.3f}s ({referenceTime / currentTime:.1f}x faster)')
+
+    if mismatches:
+        print(f'{mismatches} files produced different raw worlds')
+        exit(1)
+
+    print('Raw worlds are identical')
+    exit(0)
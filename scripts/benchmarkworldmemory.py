@@ -0,0 +1,160 @@
+import argparse
+import gc
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+
+# Reports the memory used by the worlds loaded for a milieu. The memory is
+# measured with tracemalloc so loading is considerably slower than normal.
+# Only the installed map data is loaded, overlay and custom sectors are
+# ignored and the sector cache is disabled so sectors are always parsed.
+# The code from a previous git revision can be measured with --revision, this
+# allows the memory used before and after a change to be compared using the
+# same map data.
+
+_RootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that are needed to load the universe, only these are extracted when
+# measuring a previous revision
+_RevisionPackages = ['common', 'multiverse']
+
+# Types of the objects each world holds, the number of distinct instances of
+# each type is reported to show how well values are shared between worlds
+_WorldValueGetters = [
+    ('Allegiance', lambda world: world.allegiance()),
+    ('UWP', lambda world: world.uwp()),
+    ('Economics', lambda world: world.economics()),
+    ('Culture', lambda world: world.culture()),
+    ('Nobilities', lambda world: world.nobilities()),
+    ('Remarks', lambda world: world.remarks()),
+    ('Stellar', lambda world: world.stellar()),
+    ('PBG', lambda world: world.pbg()),
+    ('Bases', lambda world: world.bases()),
+    ('HexPosition', lambda world: world.hex())
+]
+
+# Extract the packages needed to load the universe at the specified git
+# revision and run this script against them
+def _measureRevision(
+        revision: str,
+        args: argparse.Namespace
+        ) -> int:
+    archive = subprocess.run(
+        ['git', '-C', _RootDir, 'archive', '--format=tar', revision] + _RevisionPackages,
+        stdout=subprocess.PIPE,
+        check=True).stdout
+
+    with tempfile.TemporaryDirectory() as codeDir:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(path=codeDir)
+
+        print(f'Revision: {revision}', flush=True)
+        return subprocess.run([
+            sys.executable, os.path.abspath(__file__),
+            '--milieu', args.milieu,
+            '--map-dir', os.path.abspath(args.map_dir),
+            '--code-dir', codeDir]).returncode
+
+def _measureMemory(
+        milieuName: str,
+        mapDir: str
+        ) -> int:
+    import multiverse
+
+    milieu = multiverse.Milieu(milieuName)
+    with tempfile.TemporaryDirectory() as emptyDir:
+        multiverse.DataStore.setSectorDirs(
+            installDir=mapDir,
+            overlayDir=os.path.join(emptyDir, 'overlay'),
+            customDir=os.path.join(emptyDir, 'custom'))
+
+        # Older revisions don't support lazy loading, in that case every
+        # milieu is loaded up front and the memory used is reported for all
+        # the worlds that were loaded
+        isLazyLoading = hasattr(multiverse.WorldManager, 'setLazyLoading')
+        if isLazyLoading:
+            multiverse.WorldManager.setLazyLoading(True)
+        if hasattr(multiverse.WorldManager, 'setLoadWorkerCount'):
+            # Sectors must be loaded in process so allocations are traced
+            multiverse.WorldManager.setLoadWorkerCount(1)
+
+        gc.collect()
+        tracemalloc.start()
+        startTime = time.time()
+        worldManager = multiverse.WorldManager.instance()
+        worldManager.loadSectors()
+
+        # With lazy loading only one milieu is loaded up front. If it's not
+        # the milieu being measured, only memory allocated when the milieu
+        # is loaded on first use is counted
+        if isLazyLoading and not worldManager.universe().isMilieuLoaded(milieu=milieu):
+            gc.collect()
+            tracemalloc.reset_peak()
+            baseBytes, _ = tracemalloc.get_traced_memory()
+            startTime = time.time()
+        else:
+            baseBytes = 0
+
+        if isLazyLoading:
+            sectors = worldManager.sectors(milieu=milieu)
+        else:
+            sectors = []
+            for loadedMilieu in multiverse.Milieu:
+                sectors.extend(worldManager.sectors(milieu=loadedMilieu))
+        loadTime = time.time() - startTime
+        gc.collect()
+        usedBytes, peakBytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        usedBytes -= baseBytes
+        peakBytes -= baseBytes
+
+    worlds = [world for sector in sectors for world in sector.yieldWorlds()]
+    if not worlds:
+        print(f'No worlds loaded for {milieu.value}')
+        return 1
+
+    print(f'Milieu: {milieu.value}' if isLazyLoading else 'Milieu: All (lazy loading not supported)')
+    print(f'Sectors: {len(sectors)}')
+    print(f'Worlds: {len(worlds)}')
+    print(f'Load time (traced): {loadTime:.1f}s')
+    print(f'Memory used: {usedBytes / (1024 * 1024):.1f}MiB (peak {peakBytes / (1024 * 1024):.1f}MiB)')
+    print(f'Bytes per world: {usedBytes / len(worlds):.0f}')
+    print('Distinct instances:')
+    for typeName, getter in _WorldValueGetters:
+        instances = {id(value) for value in map(getter, worlds) if value is not None}
+        print(f'  {typeName}: {len(instances)}')
+
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Report the memory used per world for a milieu')
+    parser.add_argument(
+        '--milieu',
+        default='M1105',
+        help='Milieu to load')
+    parser.add_argument(
+        '--map-dir',
+        default=os.path.join(_RootDir, 'data', 'map'),
+        help='Directory containing the installed map data')
+    codeGroup = parser.add_mutually_exclusive_group()
+    codeGroup.add_argument(
+        '--revision',
+        help='Measure the code at this git revision (e.g. HEAD~1) rather than the working tree')
+    codeGroup.add_argument(
+        '--code-dir',
+        default=_RootDir,
+        help='Directory containing the code to measure')
+    args = parser.parse_args()
+
+    if args.revision:
+        exit(_measureRevision(revision=args.revision, args=args))
+
+    # Import the code being measured rather than the code the script is in
+    sys.path.insert(0, os.path.abspath(args.code_dir))
+    exit(_measureMemory(milieuName=args.milieu, mapDir=args.map_dir))
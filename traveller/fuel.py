@@ -53,8 +53,19 @@ def worldHasStarPortRefuelling(
         includeUnrefined: bool = True
         ) -> bool:
     uwp = world.uwp()
-    starPortFuelType = rules.starPortFuelType(
-        code=uwp.code(multiverse.UWP.Element.StarPort))
+    return starPortCodeHasRefuelling(
+        code=uwp.code(multiverse.UWP.Element.StarPort),
+        rules=rules,
+        includeRefined=includeRefined,
+        includeUnrefined=includeUnrefined)
+
+def starPortCodeHasRefuelling(
+        code: str,
+        rules: traveller.Rules,
+        includeRefined: bool = True,
+        includeUnrefined: bool = True
+        ) -> bool:
+    starPortFuelType = rules.starPortFuelType(code=code)
 
     if starPortFuelType is traveller.StarPortFuelType.AllTypes:
         return includeRefined or includeUnrefined